@@ -1,14 +1,20 @@
+import hmac
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.core.config import settings
 from app.core.security import decode_access_token
 from app.services.user_service import UserService
 
 security = HTTPBearer()
+internal_security = HTTPBearer(auto_error=False)
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     """Dependency to get the current authenticated user."""
-    token = credentials.credentials
+    return await authenticate_token(credentials.credentials)
 
+async def authenticate_token(token: str) -> dict:
+    """Resolve an access token to an active user, raising HTTPException otherwise."""
     payload = decode_access_token(token)
     if payload is None:
         raise HTTPException(
@@ -25,7 +31,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = await UserService.get_user_by_id(user_id)
+    user = await UserService.get_principal(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,10 +39,31 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if user.get("deleting"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Account is being deleted",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     if not user.get("is_active", False):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
 
-    return user
\ No newline at end of file
+    return user
+
+async def require_internal_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(internal_security)) -> None:
+    """Dependency for operator-only endpoints: the bearer token must be INTERNAL_API_TOKEN."""
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not available")
+
+    if credentials is None or not hmac.compare_digest(
+        credentials.credentials.encode(), settings.INTERNAL_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid internal token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -1,25 +1,26 @@
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status
 from datetime import timedelta
 from app.schemas.user import UserCreate, UserLogin, Token, UserResponse, EmailVerificationRequest
 from app.services.user_service import UserService
-from app.core.security import create_access_token
+from app.core.security import create_access_token, PasswordHasherBusy
 from app.core.config import settings
+from app.core.serialization import DocumentResponse, user_to_json
 from bson import ObjectId
 
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
-    """Register a new user and send verification email."""
+async def register(user_data: UserCreate):
+    """Register a new user and queue their verification email."""
     try:
         user = await UserService.create_user(user_data, send_email=True)
-
-        # Convert ObjectId to string and ensure is_verified is included
-        user["_id"] = str(user["_id"])
-        if "is_verified" not in user:
-            user["is_verified"] = False
-
-        return user
+        return DocumentResponse(user_to_json(user), status_code=status.HTTP_201_CREATED)
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -34,10 +35,17 @@ async def register(user_data: UserCreate, background_tasks: BackgroundTasks):
 @router.post("/login", response_model=dict)
 async def login(user_credentials: UserLogin):
     """Login user and return access token."""
-    user = await UserService.authenticate_user(
-        user_credentials.email, 
-        user_credentials.password
-    )
+    try:
+        user = await UserService.authenticate_user(
+            user_credentials.email, 
+            user_credentials.password
+        )
+    except PasswordHasherBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
     if not user:
         raise HTTPException(
@@ -0,0 +1,69 @@
+from fastapi import APIRouter
+from app.core.config import settings
+from app.core.database import db
+from app.core.db_pool import pool_monitor
+from app.core.list_cache import task_list_cache
+from app.core.rate_limit import rate_limit_store
+from app.core.security import password_hasher_stats, token_cache
+from app.services.email_outbox_service import EmailOutboxService
+from app.services.task_counter_service import version_cache
+from app.services.task_activity_service import task_activity_stats
+from app.services.task_event_service import task_events
+from app.services.task_reminder_service import task_reminder_stats
+from app.services.task_search_service import search_cache_stats
+from app.services.user_service import principal_cache
+
+router = APIRouter()
+
+@router.get("/cache")
+async def get_cache_stats():
+    """In-process cache counters for this worker."""
+    return {
+        "principal": principal_cache.stats(),
+        "token": token_cache.stats(),
+        "search": search_cache_stats(),
+        "task_list": task_list_cache.stats() if task_list_cache is not None else None,
+        "task_version": version_cache.stats()
+    }
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats():
+    """Password hashing executor load for this worker."""
+    return password_hasher_stats()
+
+@router.get("/events")
+async def get_event_stats():
+    """Live task event connections and throughput for this worker."""
+    return task_events.stats()
+
+@router.get("/email-outbox")
+async def get_email_outbox_stats():
+    """Outbox message counts by status (pending, sent, dead)."""
+    return await EmailOutboxService.get_stats()
+
+@router.get("/rate-limits")
+async def get_rate_limit_stats():
+    """Rate limit backend, tracked keys and rejected requests for this worker."""
+    return rate_limit_store.stats()
+
+@router.get("/reminders")
+async def get_reminder_stats():
+    """Due-date reminders scheduled in this worker's window."""
+    return task_reminder_stats()
+
+@router.get("/activity")
+async def get_activity_stats():
+    """Task activity events buffered, written and dropped by this worker."""
+    return task_activity_stats()
+
+@router.get("/db/pool")
+async def get_db_pool_stats():
+    """MongoDB connection pool use per server for this worker: connections checked out, checkouts waiting."""
+    return {
+        "max_pool_size": settings.DB_MAX_POOL_SIZE,
+        "min_pool_size": settings.DB_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": settings.DB_WAIT_QUEUE_TIMEOUT_MS,
+        "compressors": db.compressors,
+        "read_preference": settings.DB_READ_PREFERENCE,
+        "servers": pool_monitor.stats()
+    }
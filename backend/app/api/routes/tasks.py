@@ -1,11 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+import asyncio
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional
+from bson import ObjectId
+from app.schemas.task import TaskCreate, TaskUpdate, TaskMove, TaskResponse, TaskPage, TaskSearchPage, TaskSummary, TaskImportResult, TaskActivityPage, BulkTaskRequest, BulkTaskResponse
 from app.services.task_service import TaskService
-from app.api.deps import get_current_user
+from app.services.task_counter_service import TaskCounterService
+from app.services.task_search_service import TaskSearchService
+from app.services.task_activity_service import TaskActivityService
+from app.api.deps import get_current_user, authenticate_token
+from app.core.config import settings
+from app.core.database import read_session
+from app.core.etag import make_etag, etag_matches
+from app.core.list_cache import task_list_cache, task_list_key
+from app.core.serialization import DocumentResponse, dumps, task_to_json
+from app.core.task_files import csv_chunks, csv_records, ndjson_records
+from app.core.events import HEARTBEAT_MESSAGE, TooManySubscribers
+from app.services.task_event_service import task_events
 
 router = APIRouter()
 
+# Subprotocol of /events; the access token is offered alongside it
+TASK_EVENTS_SUBPROTOCOL = "task-events"
+
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_task(
     task_data: TaskCreate,
@@ -15,42 +33,96 @@ async def create_task(
     try:
         user_id = str(current_user["_id"])
         task = await TaskService.create_task(user_id, task_data)
+        return DocumentResponse(task_to_json(task), status_code=status.HTTP_201_CREATED)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred: {str(e)}"
+        )
 
-        # Convert ObjectIds to strings
-        task["_id"] = str(task["_id"])
-        task["user_id"] = str(task["user_id"])
-
-        return task
+@router.post("/bulk", response_model=BulkTaskResponse)
+async def bulk_tasks(
+    request: BulkTaskRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Apply a batch of create/update/move/delete operations in one request."""
+    try:
+        user_id = str(current_user["_id"])
+        results = await TaskService.bulk_write(user_id, request.operations)
+        return DocumentResponse({"results": results})
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred: {str(e)}"
         )
 
-@router.get("/", response_model=List[TaskResponse])
+@router.get("/", response_model=TaskPage)
 async def get_tasks(
-    status: Optional[str] = Query(None, description="Filter by status: pending, in-progress, completed"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status: pending, in-progress, completed"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of tasks per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    order: str = Query("created", pattern="^(created|rank)$", description="created (newest first) or rank (column order, requires status)"),
+    stream: Optional[str] = Query(None, description="Set to 'ndjson' to stream all tasks as newline-delimited JSON"),
+    if_none_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all tasks for the current user, optionally filtered by status."""
+    """Get a page of tasks for the current user, optionally filtered by status.
+
+    Responses carry an ETag derived from the user's task version, so a
+    client revalidating an unchanged page gets a 304 without the list
+    query running. Pages are cached serialized for the same version, so
+    repeated board loads skip the query and the encoding too.
+    """
     try:
         user_id = str(current_user["_id"])
 
         # Validate status if provided
-        if status and status not in ["pending", "in-progress", "completed"]:
+        if status_filter and status_filter not in ["pending", "in-progress", "completed"]:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Invalid status. Must be one of: pending, in-progress, completed"
             )
 
-        tasks = await TaskService.get_tasks(user_id, status)
+        if stream is not None:
+            if stream != "ndjson":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid stream format. Must be: ndjson"
+                )
+            return StreamingResponse(
+                _ndjson_lines(TaskService.stream_tasks(user_id, status_filter)),
+                media_type="application/x-ndjson"
+            )
+
+        # Read the version before the page, so a concurrent write can only
+        # make the ETag older than the content, never newer. On secondaries
+        # the session keeps the page from coming from a node further behind.
+        async with read_session() as session:
+            version = await TaskCounterService.get_version(user_id, session=session, reuse=True)
+            headers = None
+            cache_key = None
+            if version is not None:
+                etag = make_etag(version, status_filter, limit, cursor, order)
+                headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+                if etag_matches(if_none_match, etag):
+                    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-        # Convert ObjectIds to strings
-        for task in tasks:
-            task["_id"] = str(task["_id"])
-            task["user_id"] = str(task["user_id"])
+                if task_list_cache is not None:
+                    cache_key = task_list_key(user_id, status_filter, limit, cursor, order)
+                    body = await task_list_cache.get(cache_key, version)
+                    if body is not None:
+                        return Response(body, media_type="application/json", headers=headers)
 
-        return tasks
+            tasks, next_cursor = await TaskService.get_tasks_page(user_id, status_filter, limit, cursor, order, session=session)
+        body = dumps({"items": tasks, "next_cursor": next_cursor})
+        if cache_key is not None:
+            await task_list_cache.set(cache_key, version, body)
+        return Response(body, media_type="application/json", headers=headers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -59,6 +131,177 @@ async def get_tasks(
             detail=f"An error occurred: {str(e)}"
         )
 
+async def _ndjson_lines(tasks: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Serialize tasks one line at a time as they come off the cursor."""
+    async for task in tasks:
+        yield dumps(task) + b"\n"
+
+@router.get("/search", response_model=TaskSearchPage)
+async def search_tasks(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in task titles and descriptions"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status: pending, in-progress, completed"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of tasks per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Search the current user's tasks by title and description, most relevant first."""
+    try:
+        user_id = str(current_user["_id"])
+
+        # Validate status if provided
+        if status_filter and status_filter not in ["pending", "in-progress", "completed"]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid status. Must be one of: pending, in-progress, completed"
+            )
+
+        tasks, next_cursor = await TaskSearchService.search(user_id, q, status_filter, limit, cursor)
+        return DocumentResponse({"items": tasks, "next_cursor": next_cursor})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred: {str(e)}"
+        )
+
+# Import content types, when no ?format= is given
+IMPORT_FORMATS = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+@router.get("/export")
+async def export_tasks(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson"),
+    status_filter: Optional[str] = Query(None, alias="status", description="Filter by status: pending, in-progress, completed"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Download all of the current user's tasks, streamed straight from the database cursor."""
+    user_id = str(current_user["_id"])
+
+    # Validate status if provided
+    if status_filter and status_filter not in ["pending", "in-progress", "completed"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid status. Must be one of: pending, in-progress, completed"
+        )
+
+    tasks = TaskService.stream_tasks(user_id, status_filter)
+    filename = f"tasks-{datetime.utcnow():%Y%m%d}.{export_format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if export_format == "csv":
+        return StreamingResponse(csv_chunks(tasks), media_type="text/csv; charset=utf-8", headers=headers)
+    return StreamingResponse(_ndjson_lines(tasks), media_type="application/x-ndjson", headers=headers)
+
+@router.post("/import", response_model=TaskImportResult)
+async def import_tasks(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$", description="csv or ndjson; defaults to the Content-Type"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Create tasks from a CSV or NDJSON request body, read and inserted in batches.
+
+    CSV needs a header row; both formats take title, description, status
+    and due_date, so an export can be imported as it is. Returns the
+    number imported and the rows that failed, with their errors.
+    """
+    if import_format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        import_format = IMPORT_FORMATS.get(content_type)
+        if import_format is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Send text/csv or application/x-ndjson, or set ?format=csv|ndjson"
+            )
+
+    try:
+        user_id = str(current_user["_id"])
+        parse = csv_records if import_format == "csv" else ndjson_records
+        records = parse(request.stream(), settings.TASK_IMPORT_MAX_LINE_LENGTH)
+        return DocumentResponse(await TaskService.import_tasks(user_id, records))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred: {str(e)}"
+        )
+
+@router.get("/summary", response_model=TaskSummary)
+async def get_task_summary(current_user: dict = Depends(get_current_user)):
+    """Get per-status counts, overdue count and latest update time for the board."""
+    try:
+        user_id = str(current_user["_id"])
+        return DocumentResponse(await TaskCounterService.get_summary(user_id))
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred: {str(e)}"
+        )
+
+def _subprotocol_token(websocket: WebSocket) -> Optional[str]:
+    """Access token offered as a "bearer.<token>" subprotocol next to "task-events", if any."""
+    offered = [protocol.strip() for protocol in websocket.headers.get("sec-websocket-protocol", "").split(",")]
+    if TASK_EVENTS_SUBPROTOCOL not in offered:
+        return None
+    return next((protocol[len("bearer."):] for protocol in offered if protocol.startswith("bearer.")), None)
+
+@router.websocket("/events")
+async def task_events_socket(websocket: WebSocket):
+    """Push task deltas for the current user.
+
+    Browsers cannot set headers on a WebSocket, so the access token is
+    offered as a "bearer.<token>" subprotocol next to "task-events",
+    which keeps it out of URLs (and so out of access logs). The server
+    selects "task-events".
+    """
+    token = _subprotocol_token(websocket)
+    current_user = None
+    if token is not None:
+        try:
+            current_user = await authenticate_token(token)
+        except HTTPException:
+            pass
+    if current_user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    try:
+        subscription = task_events.subscribe(str(current_user["_id"]))
+    except TooManySubscribers:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept(subprotocol=TASK_EVENTS_SUBPROTOCOL)
+    # Reading is only needed to notice the client going away
+    receiver = asyncio.ensure_future(_discard_client_messages(websocket))
+    try:
+        while True:
+            getter = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver},
+                timeout=settings.TASK_EVENTS_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter not in done:
+                getter.cancel()
+            if receiver in done:
+                break
+
+            message = getter.result() if getter in done else HEARTBEAT_MESSAGE
+            # A client that cannot keep up is disconnected rather than buffered
+            await asyncio.wait_for(websocket.send_text(message), timeout=settings.TASK_EVENTS_SEND_TIMEOUT_SECONDS)
+    except (WebSocketDisconnect, asyncio.TimeoutError, RuntimeError):
+        pass
+    finally:
+        receiver.cancel()
+        task_events.unsubscribe(subscription)
+
+async def _discard_client_messages(websocket: WebSocket) -> None:
+    while True:
+        await websocket.receive_text()
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
@@ -75,11 +318,49 @@ async def get_task(
                 detail="Task not found"
             )
 
-        # Convert ObjectIds to strings
-        task["_id"] = str(task["_id"])
-        task["user_id"] = str(task["user_id"])
+        return DocumentResponse(task_to_json(task))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred: {str(e)}"
+        )
+
+@router.get("/{task_id}/history", response_model=TaskActivityPage)
+async def get_task_history(
+    task_id: str,
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of events per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor returned by the previous page"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get a page of a task's activity, newest first.
+
+    Events are written in the background, so the latest write may take
+    up to TASK_ACTIVITY_FLUSH_SECONDS to appear. Deleted tasks keep their
+    history until it expires.
+    """
+    try:
+        user_id = str(current_user["_id"])
+        if not ObjectId.is_valid(task_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+
+        events, next_cursor = await TaskActivityService.get_history(user_id, task_id, limit, cursor)
+        if not events and cursor is None and not await TaskService.get_task_by_id(task_id, user_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
 
-        return task
+        return DocumentResponse({"items": events, "next_cursor": next_cursor})
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -105,11 +386,46 @@ async def update_task(
                 detail="Task not found"
             )
 
-        # Convert ObjectIds to strings
-        updated_task["_id"] = str(updated_task["_id"])
-        updated_task["user_id"] = str(updated_task["user_id"])
+        return DocumentResponse(task_to_json(updated_task))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred: {str(e)}"
+        )
 
-        return updated_task
+@router.put("/{task_id}/move", response_model=TaskResponse)
+async def move_task(
+    task_id: str,
+    move: TaskMove,
+    current_user: dict = Depends(get_current_user)
+):
+    """Move a task to a column position between two neighbouring tasks."""
+    try:
+        user_id = str(current_user["_id"])
+
+        for neighbour_id in (move.prev_id, move.next_id):
+            if neighbour_id and not ObjectId.is_valid(neighbour_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid neighbour task id"
+                )
+
+        moved_task = await TaskService.move_task(task_id, user_id, move.status.value, move.prev_id, move.next_id)
+
+        if not moved_task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Task not found"
+            )
+
+        return DocumentResponse(task_to_json(moved_task))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except HTTPException:
         raise
     except Exception as e:
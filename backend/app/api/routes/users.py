@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.schemas.user import UserResponse, UserUpdate
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from app.schemas.user import UserResponse, UserUpdate, AccountDeletionJob
 from app.services.user_service import UserService
-from app.services.task_service import TaskService
+from app.services.account_deletion_service import AccountDeletionService
 from app.api.deps import get_current_user
+from app.core.etag import make_etag, etag_matches
+from app.core.serialization import DocumentResponse, user_to_json
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: dict = Depends(get_current_user)):
-    """Get current user profile."""
-    current_user["_id"] = str(current_user["_id"])
-    # Ensure is_verified is included
-    if "is_verified" not in current_user:
-        current_user["is_verified"] = False
-    return current_user
+async def get_current_user_profile(
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get current user profile. Revalidation with If-None-Match returns 304 when unchanged."""
+    etag = make_etag(current_user["_id"], current_user.get("version", 0), current_user.get("updated_at"))
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return DocumentResponse(user_to_json(current_user), headers=headers)
 
 @router.put("/me", response_model=UserResponse)
 async def update_user_profile(
@@ -31,11 +37,7 @@ async def update_user_profile(
                 detail="User not found"
             )
 
-        updated_user["_id"] = str(updated_user["_id"])
-        # Ensure is_verified is included
-        if "is_verified" not in updated_user:
-            updated_user["is_verified"] = False
-        return updated_user
+        return DocumentResponse(user_to_json(updated_user))
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -47,27 +49,41 @@ async def update_user_profile(
             detail=f"An error occurred: {str(e)}"
         )
 
-@router.delete("/me", status_code=status.HTTP_200_OK)
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
 async def delete_user_profile(current_user: dict = Depends(get_current_user)):
-    """Delete current user profile and all associated tasks."""
+    """Delete current user profile and all associated tasks.
+
+    The account is locked immediately and removed by a background job,
+    whose progress is available from /deletion-jobs/{job_id}.
+    """
     try:
         user_id = str(current_user["_id"])
+        job = await AccountDeletionService.start(user_id)
 
-        # Delete all user's tasks first
-        await TaskService.delete_all_user_tasks(user_id)
-
-        # Delete user
-        deleted = await UserService.delete_user(user_id)
-
-        if not deleted:
+        if not job:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
 
-        return {"message": "User and all associated tasks deleted successfully"}
+        return {"message": "Account deletion started", "job_id": job["_id"]}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/deletion-jobs/{job_id}", response_model=AccountDeletionJob)
+async def get_deletion_job(job_id: str):
+    """Progress of an account deletion. The random job id is the only credential, as the account is gone."""
+    job = await AccountDeletionService.get_job(job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Deletion job not found"
+        )
+
+    return job
@@ -0,0 +1,59 @@
+import asyncio
+from collections import deque
+from typing import List
+
+
+class ActivityBuffer:
+    """Bounded FIFO of events waiting to be written, oldest dropped when full.
+
+    append() never blocks, so recording an event costs the request path
+    nothing; the flusher is woken once a batch's worth has accumulated.
+    """
+
+    def __init__(self, capacity: int, batch_size: int):
+        self._events: deque = deque(maxlen=capacity)
+        self._batch_ready = asyncio.Event()
+        self.batch_size = batch_size
+        self.recorded = 0
+        self.dropped = 0
+
+    def append(self, event: dict) -> None:
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self.recorded += 1
+        if len(self._events) >= self.batch_size:
+            self._batch_ready.set()
+
+    def take(self, limit: int) -> List[dict]:
+        """Remove and return up to limit events, oldest first."""
+        return [self._events.popleft() for _ in range(min(limit, len(self._events)))]
+
+    def put_back(self, events: List[dict]) -> None:
+        """Return events that could not be written to the front, as far as capacity allows."""
+        room = self._events.maxlen - len(self._events)
+        if len(events) > room:
+            self.dropped += len(events) - room
+            events = events[len(events) - room:]
+        self._events.extendleft(reversed(events))
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep for timeout seconds, or until a full batch is buffered."""
+        if len(self._events) >= self.batch_size:
+            return
+        self._batch_ready.clear()
+        try:
+            await asyncio.wait_for(self._batch_ready.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def stats(self) -> dict:
+        return {
+            "buffered": len(self._events),
+            "capacity": self._events.maxlen,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+        }
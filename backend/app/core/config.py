@@ -1,15 +1,37 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 
 class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
     DATABASE_NAME: str
+    DB_ENSURE_INDEXES: bool = True
+    DB_VERIFY_QUERY_PLANS: bool = False
+
+    # MongoDB client (per worker process). Compressors are offered in order,
+    # e.g. "zstd,snappy,zlib"; zstd needs zstandard and snappy python-snappy.
+    # A wait queue timeout of 0 waits for a free connection indefinitely.
+    DB_MAX_POOL_SIZE: int = 100
+    DB_MIN_POOL_SIZE: int = 0
+    DB_WAIT_QUEUE_TIMEOUT_MS: int = 10000
+    DB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    # Connections opened at startup, before the worker takes traffic
+    DB_PREWARM_CONNECTIONS: int = 0
+    DB_COMPRESSORS: str = ""
+    # Where read-only endpoints (task lists, search, export) read from;
+    # max staleness of 0 leaves it unbounded (otherwise at least 90)
+    DB_READ_PREFERENCE: Literal["primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"] = "primary"
+    DB_MAX_STALENESS_SECONDS: int = 0
 
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    TOKEN_CACHE_SIZE: int = 10000
+
+    # Password hashing executor (bcrypt runs off the event loop)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
 
     # Email Verification Token
     VERIFICATION_TOKEN_SECRET: str
@@ -25,6 +47,123 @@ class Settings(BaseSettings):
     MAIL_STARTTLS: bool = False
     MAIL_SSL_TLS: bool = False
 
+    # Authenticated-principal cache (per worker process). A cached user is
+    # re-checked against its version in the database once it is REVALIDATE
+    # seconds old, so an account flagged for deletion (or changed) through
+    # another worker is rejected here within that delay (0 checks every request).
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_REVALIDATE_SECONDS: float = 5
+
+    # Board summary counters (0 disables periodic reconciliation)
+    TASK_COUNTERS_RECONCILE_INTERVAL_SECONDS: int = 86400
+
+    # Kanban ordering: columns are rebalanced once a rank grows past this length
+    TASK_RANK_MAX_LENGTH: int = 24
+
+    # Live task events (/api/tasks/events); source is "local" or "change_stream"
+    TASK_EVENTS_SOURCE: str = "local"
+    TASK_EVENTS_QUEUE_SIZE: int = 100
+    TASK_EVENTS_MAX_CONNECTIONS_PER_USER: int = 5
+    TASK_EVENTS_HEARTBEAT_SECONDS: int = 25
+    TASK_EVENTS_SEND_TIMEOUT_SECONDS: int = 10
+
+    # Email outbox dispatcher (retries back off exponentially up to the max,
+    # then the message is dead-lettered)
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: int = 5
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 120
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_OUTBOX_SENT_RETENTION_DAYS: int = 7
+
+    # Auth endpoint rate limits as "<requests>/<window seconds>", per client IP
+    # and per email. Backend is "memory" (per worker) or "mongo" (shared).
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_MEMORY_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_LOGIN_PER_IP: str = "20/60"
+    RATE_LIMIT_LOGIN_PER_EMAIL: str = "10/300"
+    RATE_LIMIT_REGISTER_PER_IP: str = "20/3600"
+    RATE_LIMIT_RESEND_PER_IP: str = "10/3600"
+    RATE_LIMIT_RESEND_PER_EMAIL: str = "3/3600"
+
+    # Account deletion: tasks and activity are removed in paced batches by a background job
+    ACCOUNT_DELETION_BATCH_SIZE: int = 500
+    ACCOUNT_DELETION_PAUSE_SECONDS: float = 0.1
+    ACCOUNT_DELETION_LEASE_SECONDS: int = 60
+    ACCOUNT_DELETION_POLL_SECONDS: int = 30
+    ACCOUNT_DELETION_JOB_RETENTION_DAYS: int = 7
+
+    # Task search: users who search at least MIN_SEARCHES times within the TTL
+    # get an in-process index of up to MAX_TASKS tasks (0 users disables it)
+    TASK_SEARCH_CACHE_USERS: int = 0
+    TASK_SEARCH_CACHE_MIN_SEARCHES: int = 3
+    TASK_SEARCH_CACHE_MAX_TASKS: int = 20000
+    TASK_SEARCH_CACHE_TTL_SECONDS: int = 600
+
+    # Due-date reminders, emailed LEAD seconds before a task is due. Each worker
+    # holds the reminders of the next WINDOW seconds (at most MAX_SCHEDULED).
+    TASK_REMINDERS_ENABLED: bool = True
+    TASK_REMINDER_LEAD_SECONDS: int = 3600
+    TASK_REMINDER_WINDOW_SECONDS: int = 21600
+    TASK_REMINDER_BATCH_SIZE: int = 200
+    TASK_REMINDER_MAX_SCHEDULED: int = 100000
+
+    # Task import: rows are validated and inserted BATCH_SIZE at a time; the
+    # report lists at most MAX_ERRORS failed rows
+    TASK_IMPORT_BATCH_SIZE: int = 500
+    TASK_IMPORT_MAX_ROWS: int = 50000
+    TASK_IMPORT_MAX_LINE_LENGTH: int = 65536
+    TASK_IMPORT_MAX_ERRORS: int = 100
+
+    # Task list cache: serialized GET /api/tasks pages, each valid while the user's
+    # task version is unchanged. Backend is "memory" (per worker, at most MAX_BYTES),
+    # "mongo" (shared by all workers, entries expire TTL seconds after being written)
+    # or "none".
+    TASK_LIST_CACHE_BACKEND: str = "memory"
+    TASK_LIST_CACHE_MAX_BYTES: int = 67108864
+    TASK_LIST_CACHE_MAX_ENTRY_BYTES: int = 1048576
+    TASK_LIST_CACHE_TTL_SECONDS: int = 3600
+    # A worker may reuse a task version it has read for this long instead of
+    # reading it again (0 reads it on every request). Its own writes invalidate it
+    # at once; writes by other workers are seen within this delay.
+    TASK_VERSION_CACHE_SECONDS: float = 0
+    TASK_VERSION_CACHE_USERS: int = 10000
+
+    # Task activity log: events are buffered per worker (at most BUFFER_SIZE, the
+    # oldest dropped when full) and written BATCH_SIZE at a time or every
+    # FLUSH_SECONDS; they expire after RETENTION_DAYS (0 keeps them)
+    TASK_ACTIVITY_ENABLED: bool = True
+    TASK_ACTIVITY_BUFFER_SIZE: int = 100000
+    TASK_ACTIVITY_BATCH_SIZE: int = 500
+    TASK_ACTIVITY_FLUSH_SECONDS: float = 1
+    TASK_ACTIVITY_RETENTION_DAYS: int = 90
+
+    # Diagnostics under /internal (per worker process); not mounted unless
+    # enabled, and every request must carry "Authorization: Bearer <token>"
+    # with INTERNAL_API_TOKEN (requests are refused while it is empty)
+    INTERNAL_ENDPOINTS_ENABLED: bool = False
+    INTERNAL_API_TOKEN: str = ""
+
+    # Prometheus metrics at /metrics (per worker process), scraped with
+    # INTERNAL_API_TOKEN as the bearer token
+    METRICS_ENABLED: bool = True
+
+    # Production server (python -m app.server). 0 workers means one per
+    # available CPU; in-flight requests get GRACEFUL_SHUTDOWN seconds on SIGTERM.
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    SERVER_PROXY_HEADERS: bool = True
+    SERVER_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    SERVER_ACCESS_LOG: bool = True
+
     # Frontend URL
     FRONTEND_URL: str = "http://localhost:5173"
 
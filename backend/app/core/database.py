@@ -1,19 +1,94 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorClientSession
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
 from app.core.config import settings
+from app.core.db_pool import pool_monitor
+from app.core.metrics import command_metrics
+from app.core.indexes import ensure_indexes, verify_query_plans
+
+logger = logging.getLogger(__name__)
+
+# Module each wire compressor needs; zstd and snappy are optional installs
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+READ_PREFERENCES = {
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
 
 class Database:
     client: AsyncIOMotorClient = None
+    compressors: List[str] = []
 
 db = Database()
 
 async def get_database():
     return db.client[settings.DATABASE_NAME]
 
+def available_compressors() -> List[str]:
+    """DB_COMPRESSORS in preference order, minus those whose module is not installed."""
+    compressors = []
+    for name in filter(None, (name.strip() for name in settings.DB_COMPRESSORS.split(","))):
+        if name not in COMPRESSOR_MODULES:
+            raise ValueError(f"Unknown wire compressor: {name}")
+        if importlib.util.find_spec(COMPRESSOR_MODULES[name]) is None:
+            logger.warning("Wire compressor %s needs the %s module, which is not installed; not offering it", name, COMPRESSOR_MODULES[name])
+            continue
+        compressors.append(name)
+    return compressors
+
+def read_preference():
+    """Read preference for read-only endpoints (DB_READ_PREFERENCE)."""
+    if settings.DB_READ_PREFERENCE == "primary":
+        return Primary()
+    return READ_PREFERENCES[settings.DB_READ_PREFERENCE](max_staleness=settings.DB_MAX_STALENESS_SECONDS or -1)
+
+def create_client() -> AsyncIOMotorClient:
+    """Client configured from the DB_* settings, which take precedence over options in DATABASE_URL."""
+    options = {}
+    db.compressors = available_compressors()
+    if db.compressors:
+        options["compressors"] = ",".join(db.compressors)
+    if settings.DB_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = settings.DB_WAIT_QUEUE_TIMEOUT_MS
+
+    return AsyncIOMotorClient(
+        settings.DATABASE_URL,
+        maxPoolSize=settings.DB_MAX_POOL_SIZE,
+        minPoolSize=settings.DB_MIN_POOL_SIZE,
+        serverSelectionTimeoutMS=settings.DB_SERVER_SELECTION_TIMEOUT_MS,
+        event_listeners=[pool_monitor, command_metrics],
+        **options
+    )
+
 async def connect_to_mongo():
-    db.client = AsyncIOMotorClient(settings.DATABASE_URL)
+    db.client = create_client()
     # Test connection
     await db.client.admin.command('ping')
 
+    database = db.client[settings.DATABASE_NAME]
+    if settings.DB_ENSURE_INDEXES:
+        await ensure_indexes(database)
+    if settings.DB_VERIFY_QUERY_PLANS:
+        await verify_query_plans(database)
+
+async def prewarm_pool(connections: int) -> int:
+    """Open up to `connections` pooled connections by running that many pings at once.
+
+    Each concurrent ping needs its own connection, so the pool grows to
+    meet them. Returns the number of connections open afterwards.
+    """
+    connections = min(connections, settings.DB_MAX_POOL_SIZE)
+    if connections > 0:
+        await asyncio.gather(*(db.client.admin.command("ping") for _ in range(connections)))
+    return sum(server["open"] for server in pool_monitor.stats().values())
+
 async def close_mongo_connection():
     if db.client:
         db.client.close()
@@ -24,4 +99,58 @@ async def get_users_collection():
 
 async def get_tasks_collection():
     database = await get_database()
-    return database.tasks
\ No newline at end of file
+    return database.tasks
+
+async def get_tasks_read_collection():
+    """tasks for read-only endpoints, which may be served by secondaries."""
+    database = await get_database()
+    if settings.DB_READ_PREFERENCE == "primary":
+        return database.tasks
+    return database.tasks.with_options(read_preference=read_preference())
+
+async def get_task_counters_collection():
+    database = await get_database()
+    return database.task_counters
+
+async def get_task_counters_read_collection():
+    database = await get_database()
+    if settings.DB_READ_PREFERENCE == "primary":
+        return database.task_counters
+    return database.task_counters.with_options(read_preference=read_preference())
+
+@asynccontextmanager
+async def read_session() -> AsyncIterator[Optional[AsyncIOMotorClientSession]]:
+    """Causally consistent session for a request's reads when they may go to secondaries.
+
+    Each read in the session sees at least what the previous one saw,
+    even on another secondary. Yields None when reads go to the primary.
+    """
+    if settings.DB_READ_PREFERENCE == "primary":
+        yield None
+        return
+    async with await db.client.start_session(causal_consistency=True) as session:
+        yield session
+
+async def get_task_list_cache_collection():
+    database = await get_database()
+    return database.task_list_cache
+
+async def get_task_activity_collection():
+    database = await get_database()
+    return database.task_activity
+
+async def get_email_outbox_collection():
+    database = await get_database()
+    return database.email_outbox
+
+async def get_rate_limits_collection():
+    database = await get_database()
+    return database.rate_limits
+
+async def get_deletion_jobs_collection():
+    database = await get_database()
+    return database.deletion_jobs
+
+async def get_job_leases_collection():
+    database = await get_database()
+    return database.job_leases
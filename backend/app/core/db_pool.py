@@ -0,0 +1,119 @@
+import threading
+import time
+from typing import Dict
+from pymongo import monitoring
+
+
+class _ServerPool:
+    __slots__ = (
+        "open", "checked_out", "wait_queue", "max_wait_queue", "checkouts",
+        "checkout_failures", "wait_seconds_total", "wait_seconds_max", "cleared",
+    )
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.wait_queue = 0
+        self.max_wait_queue = 0
+        self.checkouts = 0
+        self.checkout_failures: Dict[str, int] = {}
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.cleared = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "open": self.open,
+            "checked_out": self.checked_out,
+            "wait_queue": self.wait_queue,
+            "max_wait_queue": self.max_wait_queue,
+            "checkouts": self.checkouts,
+            "checkout_failures": dict(self.checkout_failures),
+            "wait_seconds_avg": self.wait_seconds_total / self.checkouts if self.checkouts else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+            "cleared": self.cleared,
+        }
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Connection pool gauges per server, kept up to date from pool events.
+
+    Motor runs pymongo on a thread pool and events fire on the thread
+    doing the checkout, so updates take a lock; the time a checkout spent
+    waiting is measured between its started and finished events on that
+    thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._servers: Dict[str, _ServerPool] = {}
+
+    def _pool(self, address) -> _ServerPool:
+        key = f"{address[0]}:{address[1]}"
+        pool = self._servers.get(key)
+        if pool is None:
+            pool = self._servers[key] = _ServerPool()
+        return pool
+
+    def _waited(self) -> float:
+        started = getattr(self._local, "check_out_started", None)
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event):
+        self._local.check_out_started = time.perf_counter()
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.wait_queue += 1
+            pool.max_wait_queue = max(pool.max_wait_queue, pool.wait_queue)
+
+    def connection_checked_out(self, event):
+        waited = self._waited()
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.wait_queue -= 1
+            pool.checked_out += 1
+            pool.checkouts += 1
+            pool.wait_seconds_total += waited
+            pool.wait_seconds_max = max(pool.wait_seconds_max, waited)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.wait_queue -= 1
+            pool.checkout_failures[event.reason] = pool.checkout_failures.get(event.reason, 0) + 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._pool(event.address).checked_out -= 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address).open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._pool(event.address).open -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address).cleared += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {address: pool.as_dict() for address, pool in self._servers.items()}
+
+
+pool_monitor = PoolMonitor()
@@ -1,21 +1,41 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from typing import List
+from email.message import EmailMessage
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional
 from app.core.config import settings
-from jinja2 import Template
-
-# Email configuration
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True
-)
+
+# fastapi_mail (which pulls in httpx and aiosmtplib) and jinja2 are imported
+# on first use, so workers that never send mail do not pay for them at startup
+if TYPE_CHECKING:
+    from fastapi_mail import ConnectionConfig
+    from fastapi_mail.connection import Connection
+    from jinja2 import Template
+
+
+@lru_cache(maxsize=None)
+def mail_config() -> "ConnectionConfig":
+    """SMTP connection settings, built on first use."""
+    from fastapi_mail import ConnectionConfig
+
+    return ConnectionConfig(
+        MAIL_USERNAME=settings.MAIL_USERNAME,
+        MAIL_PASSWORD=settings.MAIL_PASSWORD,
+        MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=settings.MAIL_PORT,
+        MAIL_SERVER=settings.MAIL_SERVER,
+        MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+        MAIL_STARTTLS=settings.MAIL_STARTTLS,
+        MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=True
+    )
+
+
+@lru_cache(maxsize=None)
+def _template(source: str, autoescape: bool = False) -> "Template":
+    """Compile a template once, on first use; later sends only render."""
+    from jinja2 import Template
+
+    return Template(source, autoescape=autoescape)
 
 # HTML email template
 VERIFICATION_EMAIL_TEMPLATE = """
@@ -102,23 +122,166 @@ VERIFICATION_EMAIL_TEMPLATE = """
 </html>
 """
 
-async def send_verification_email(email: List[str], username: str, token: str):
-    """Send email verification link to user."""
-    verification_url = f"{settings.FRONTEND_URL}/verify-email?token={token}"
+VERIFICATION_EMAIL_SUBJECT = "Verify Your Email - Task Management System"
+
 
-    # Render template
-    template = Template(VERIFICATION_EMAIL_TEMPLATE)
-    html_content = template.render(
+def build_verification_email(recipients: List[str], username: str, token: str) -> EmailMessage:
+    """Render the verification email for a freshly minted token."""
+    verification_url = f"{settings.FRONTEND_URL}/verify-email?token={token}"
+    html_content = _template(VERIFICATION_EMAIL_TEMPLATE).render(
         username=username,
         verification_url=verification_url
     )
 
-    message = MessageSchema(
-        subject="Verify Your Email - Task Management System",
-        recipients=email,
-        body=html_content,
-        subtype=MessageType.html
+    message = EmailMessage()
+    message["Subject"] = VERIFICATION_EMAIL_SUBJECT
+    message["From"] = f"{settings.MAIL_FROM_NAME} <{settings.MAIL_FROM}>"
+    message["To"] = ", ".join(recipients)
+    message.set_content(html_content, subtype="html")
+    return message
+
+
+# Due-date reminder, one email per user listing every task about to fall due
+REMINDER_EMAIL_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body {
+            font-family: Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        .container {
+            background-color: #f9f9f9;
+            border-radius: 10px;
+            padding: 30px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .header {
+            text-align: center;
+            color: #4F46E5;
+            margin-bottom: 30px;
+        }
+        .task {
+            background-color: #FEF3C7;
+            border-left: 4px solid #F59E0B;
+            padding: 10px 15px;
+            margin: 10px 0;
+            border-radius: 5px;
+        }
+        .button {
+            display: inline-block;
+            padding: 12px 30px;
+            background-color: #4F46E5;
+            color: white;
+            text-decoration: none;
+            border-radius: 5px;
+            margin: 20px 0;
+            font-weight: bold;
+        }
+        .footer {
+            text-align: center;
+            font-size: 12px;
+            color: #666;
+            margin-top: 30px;
+            padding-top: 20px;
+            border-top: 1px solid #ddd;
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1 class="header">🎯 Task Management System</h1>
+        <h2>Hi {{ username }},</h2>
+        <p>{{ tasks|length }} of your tasks {{ "is" if tasks|length == 1 else "are" }} due soon:</p>
+
+        {% for task in tasks %}
+        <div class="task">
+            <strong>{{ task.title }}</strong><br>
+            Due {{ task.due_date.strftime("%Y-%m-%d %H:%M") }} UTC
+        </div>
+        {% endfor %}
+
+        <div style="text-align: center;">
+            <a href="{{ board_url }}" class="button">Open Your Board</a>
+        </div>
+
+        <div class="footer">
+            <p>&copy; 2026 Task Management System. All rights reserved.</p>
+            <p>This is an automated message, please do not reply.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+def build_reminder_email(recipients: List[str], username: str, tasks: List[dict]) -> EmailMessage:
+    """Render a reminder for tasks given as {"title", "due_date"} dicts."""
+    html_content = _template(REMINDER_EMAIL_TEMPLATE, autoescape=True).render(
+        username=username,
+        tasks=tasks,
+        board_url=f"{settings.FRONTEND_URL}/dashboard"
     )
 
-    fm = FastMail(conf)
-    await fm.send_message(message)
\ No newline at end of file
+    message = EmailMessage()
+    if len(tasks) == 1:
+        # Titles may contain line breaks, which headers cannot
+        message["Subject"] = f"Reminder: {' '.join(tasks[0]['title'].split())} is due soon"
+    else:
+        message["Subject"] = f"Reminder: {len(tasks)} tasks are due soon"
+    message["From"] = f"{settings.MAIL_FROM_NAME} <{settings.MAIL_FROM}>"
+    message["To"] = ", ".join(recipients)
+    message.set_content(html_content, subtype="html")
+    return message
+
+
+class PooledMailer:
+    """A single SMTP connection reused across messages.
+
+    Connects (and logs in) on the first send and stays open until close().
+    Any failure drops the connection, so the next send reconnects.
+    """
+
+    def __init__(self, config: Optional["ConnectionConfig"] = None):
+        self._config = config
+        self._connection: Optional["Connection"] = None
+        self.connects = 0
+        self.sent = 0
+
+    async def send(self, message: EmailMessage) -> None:
+        if self._connection is None:
+            from fastapi_mail.connection import Connection
+
+            connection = Connection(self._config or mail_config())
+            await connection.__aenter__()
+            self._connection = connection
+            self.connects += 1
+
+        try:
+            await self._connection.session.send_message(message)
+        except Exception:
+            await self.close()
+            raise
+        self.sent += 1
+
+    async def close(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
+            return
+        try:
+            await connection.__aexit__(None, None, None)
+        except Exception:
+            pass  # the server already dropped us
+
+
+async def send_verification_email(email: List[str], username: str, token: str):
+    """Send a verification email right away, outside the outbox."""
+    mailer = PooledMailer()
+    try:
+        await mailer.send(build_verification_email(email, username, token))
+    finally:
+        await mailer.close()
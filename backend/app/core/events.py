@@ -0,0 +1,78 @@
+import asyncio
+import json
+from typing import Dict, List, Set
+
+# Sent instead of the backlog when a subscriber falls too far behind; the
+# client should refetch its state.
+RESYNC_MESSAGE = json.dumps({"type": "resync"})
+HEARTBEAT_MESSAGE = json.dumps({"type": "ping"})
+
+
+class TooManySubscribers(Exception):
+    """Raised when a user already has the maximum number of live connections."""
+
+
+class Subscription:
+    def __init__(self, user_id: str, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+
+class EventHub:
+    """In-process pub/sub of pre-serialized messages, fanned out per user.
+
+    Publishing never blocks: each subscriber has a bounded queue, and a
+    subscriber whose queue is full has its backlog replaced by a single
+    resync message. Fan-out per publish is bounded by the per-user
+    subscriber limit.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers_per_user: int):
+        self.queue_size = queue_size
+        self.max_subscribers_per_user = max_subscribers_per_user
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscribers = self._subscribers.setdefault(user_id, set())
+        if len(subscribers) >= self.max_subscribers_per_user:
+            raise TooManySubscribers(f"At most {self.max_subscribers_per_user} live connections per user")
+
+        subscription = Subscription(user_id, self.queue_size)
+        subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def user_ids(self) -> List[str]:
+        return list(self._subscribers)
+
+    def publish(self, user_id: str, message: str) -> None:
+        """Queue a message for every subscriber of user_id without waiting."""
+        for subscription in self._subscribers.get(user_id, ()):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(RESYNC_MESSAGE)
+                self.overflows += 1
+        self.published += 1
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._subscribers),
+            "connections": sum(len(subscribers) for subscribers in self._subscribers.values()),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
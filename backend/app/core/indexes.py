@@ -0,0 +1,252 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from app.core.pagination import keyset_filter
+
+logger = logging.getLogger(__name__)
+
+# Index specifications per collection. Every query issued by the services
+# layer must be served by one of these (see QUERY_PLAN_CHECKS below).
+INDEX_SPECS: Dict[str, List[IndexModel]] = {
+    "tasks": [
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_status_created_at_id"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_created_at_id"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("rank", ASCENDING), ("_id", ASCENDING)],
+            name="user_id_status_rank_id"
+        ),
+        IndexModel(
+            [("user_id", ASCENDING), ("status", ASCENDING), ("due_date", ASCENDING)],
+            name="user_id_status_due_date"
+        ),
+        # Reminders: tasks falling due in the scheduler's next window, across users
+        IndexModel([("due_date", ASCENDING), ("status", ASCENDING)], name="due_date_status"),
+        # Search: the user_id prefix makes every $text query per-user, and the
+        # status suffix lets status filters be applied inside the index
+        IndexModel(
+            [("user_id", ASCENDING), ("title", TEXT), ("description", TEXT), ("status", ASCENDING)],
+            name="user_id_title_description_text_status",
+            weights={"title": 3, "description": 1},
+            default_language="english"
+        ),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    "email_outbox": [
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+        # Sent messages get an expire_at; dead letters are kept until removed by hand
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    "deletion_jobs": [
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease_until"),
+        # Completed jobs get an expire_at
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    # Only used with RATE_LIMIT_BACKEND=mongo; counters are looked up by _id
+    "rate_limits": [
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    # Only used with TASK_LIST_CACHE_BACKEND=mongo; pages are looked up by _id
+    "task_list_cache": [
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+    "task_activity": [
+        # History pages per task; the user_id prefix also serves account deletion
+        IndexModel(
+            [("user_id", ASCENDING), ("task_id", ASCENDING), ("at", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_task_id_at_id"
+        ),
+        # Events get an expire_at unless TASK_ACTIVITY_RETENTION_DAYS is 0
+        IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+# Representative service queries: (collection, filter, sort).
+QUERY_PLAN_CHECKS: List[Tuple[str, dict, Optional[list]]] = [
+    ("tasks", {"user_id": ObjectId(), "status": "pending"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("tasks", {"user_id": ObjectId()}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    (
+        "tasks",
+        {"user_id": ObjectId(), **keyset_filter("created_at", datetime.utcnow(), ObjectId())},
+        [("created_at", DESCENDING), ("_id", DESCENDING)]
+    ),
+    ("tasks", {"user_id": ObjectId(), "status": "pending"}, [("rank", ASCENDING), ("_id", ASCENDING)]),
+    (
+        "tasks",
+        {"user_id": ObjectId(), "status": {"$in": ["pending", "completed"]}, "rank": {"$type": "string"}},
+        [("user_id", ASCENDING), ("status", ASCENDING), ("rank", ASCENDING), ("_id", ASCENDING)]
+    ),
+    (
+        "tasks",
+        {"user_id": ObjectId(), "status": {"$in": ["pending", "in-progress"]}, "due_date": {"$lt": datetime.utcnow()}},
+        None
+    ),
+    (
+        "tasks",
+        {"due_date": {"$gt": datetime.utcnow()}, "status": {"$in": ["pending", "in-progress"]}, "reminder_sent_at": None},
+        [("due_date", ASCENDING)]
+    ),
+    ("tasks", {"user_id": ObjectId(), "$text": {"$search": "plan check"}, "status": "pending"}, None),
+    (
+        "task_activity",
+        {"user_id": ObjectId(), "task_id": ObjectId(), **keyset_filter("at", datetime.utcnow(), ObjectId())},
+        [("at", DESCENDING), ("_id", DESCENDING)]
+    ),
+    ("task_activity", {"user_id": ObjectId()}, None),
+    ("users", {"email": "plan-check@example.com"}, None),
+    ("users", {"username": "plan_check"}, None),
+    ("email_outbox", {"status": "pending", "next_attempt_at": {"$lte": datetime.utcnow()}}, [("next_attempt_at", ASCENDING)]),
+    (
+        "deletion_jobs",
+        {"status": {"$in": ["pending", "running"]}, "lease_until": {"$lte": datetime.utcnow()}},
+        [("lease_until", ASCENDING)]
+    ),
+]
+
+# Index options that must match for an existing index to satisfy a spec.
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression", "weights", "default_language")
+
+
+class IndexConflictError(RuntimeError):
+    """An existing index clashes with one of the declared specs."""
+
+
+class QueryPlanError(RuntimeError):
+    """A service query is not covered by an index."""
+
+
+def _key_of(spec: dict) -> List[Tuple[str, object]]:
+    key = spec["key"]
+    key = list(key.items()) if isinstance(key, dict) else list(key)
+
+    # Text fields are stored as a single _fts/_ftsx pair (the fields
+    # themselves are listed in weights), so declared specs are collapsed
+    # the same way to compare with index_information()
+    if any(direction == TEXT for _, direction in key) and ("_fts", TEXT) not in key:
+        first = next(i for i, (_, direction) in enumerate(key) if direction == TEXT)
+        scalars = [(field, direction) for field, direction in key if direction != TEXT]
+        key = scalars[:first] + [("_fts", TEXT), ("_ftsx", 1)] + scalars[first:]
+    return key
+
+
+def _options_of(spec: dict) -> dict:
+    # Unset and False are the same as absent, but 0 is a real value
+    # (expireAfterSeconds=0 makes a TTL index)
+    return {
+        option: spec[option] for option in _COMPARED_OPTIONS
+        if spec.get(option) is not None and spec.get(option) is not False
+    }
+
+
+def diff_indexes(models: List[IndexModel], existing: Dict[str, dict]) -> Tuple[List[IndexModel], List[str]]:
+    """Compare declared index models with index_information() output.
+
+    Returns the models that still need to be created and a list of
+    human-readable conflicts (same key or name but different definition).
+    """
+    existing_by_key = {tuple(_key_of(info)): (name, info) for name, info in existing.items()}
+    missing: List[IndexModel] = []
+    conflicts: List[str] = []
+
+    for model in models:
+        spec = model.document
+        key = tuple(_key_of(spec))
+        name = spec["name"]
+
+        if key in existing_by_key:
+            existing_name, info = existing_by_key[key]
+            if _options_of(info) != _options_of(spec):
+                conflicts.append(
+                    f"index '{existing_name}' on {list(key)} has options {_options_of(info)}, "
+                    f"expected {_options_of(spec)}"
+                )
+            continue
+
+        if name in existing:
+            conflicts.append(
+                f"index '{name}' exists with key {_key_of(existing[name])}, expected {list(key)}"
+            )
+            continue
+
+        missing.append(model)
+
+    return missing, conflicts
+
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """Create any missing indexes and fail on definition conflicts."""
+    created: Dict[str, List[str]] = {}
+    conflicts: List[str] = []
+
+    for collection_name, models in INDEX_SPECS.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        missing, collection_conflicts = diff_indexes(models, existing)
+        conflicts.extend(f"{collection_name}: {conflict}" for conflict in collection_conflicts)
+
+        if missing:
+            created[collection_name] = await collection.create_indexes(missing)
+            logger.info("Created indexes on %s: %s", collection_name, created[collection_name])
+
+    if conflicts:
+        raise IndexConflictError("; ".join(conflicts))
+
+    return created
+
+
+def _plan_stages(plan: dict):
+    """Yield every stage name in an explain() plan tree."""
+    yield plan.get("stage")
+    if "inputStage" in plan:
+        yield from _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+    # Slot-based engine wraps the classic tree in queryPlan
+    if "queryPlan" in plan:
+        yield from _plan_stages(plan["queryPlan"])
+
+
+async def verify_query_plans(database) -> None:
+    """Explain every QUERY_PLAN_CHECKS query and fail if any uses COLLSCAN."""
+    failures: List[str] = []
+
+    for collection_name, query, sort in QUERY_PLAN_CHECKS:
+        cursor = database[collection_name].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain["queryPlanner"]["winningPlan"]
+
+        if "COLLSCAN" in set(_plan_stages(winning_plan)):
+            failures.append(f"{collection_name} {query} sort={sort}")
+
+    if failures:
+        raise QueryPlanError("Queries fall back to COLLSCAN: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    import asyncio
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core.config import settings
+
+    async def main():
+        client = AsyncIOMotorClient(settings.DATABASE_URL)
+        database = client[settings.DATABASE_NAME]
+        try:
+            print(f"Created: {await ensure_indexes(database)}")
+            await verify_query_plans(database)
+            print("All service queries are index-backed")
+        finally:
+            client.close()
+
+    asyncio.run(main())
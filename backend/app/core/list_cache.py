@@ -0,0 +1,146 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from bson import Binary
+from app.core.cache import ByteLRUCache
+from app.core.config import settings
+from app.core.database import get_task_list_cache_collection
+
+logger = logging.getLogger(__name__)
+
+
+def task_list_key(user_id: str, status: Optional[str], limit: int, cursor: Optional[str], order: str) -> str:
+    """Cache key of one GET /api/tasks page."""
+    return f"{user_id}:{status or ''}:{order}:{limit}:{cursor or ''}"
+
+
+class TaskListStore:
+    """Serialized task list pages, each valid for one version of its user's tasks.
+
+    Entries are never invalidated explicitly: a write changes the user's
+    version, so older entries stop matching and are replaced or aged out.
+    If the store fails, the request falls back to the list query.
+    """
+
+    backend = ""
+
+    def __init__(self, max_entry_bytes: int):
+        self.max_entry_bytes = max_entry_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str, version: str) -> Optional[bytes]:
+        """The cached body for this key at this version, if any."""
+        try:
+            body = await self._get(key, version)
+        except Exception:
+            logger.exception("Task list cache lookup failed")
+            self.errors += 1
+            body = None
+        if body is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return body
+
+    async def set(self, key: str, version: str, body: bytes) -> None:
+        if len(body) > self.max_entry_bytes:
+            return
+        try:
+            await self._set(key, version, body)
+        except Exception:
+            logger.exception("Task list cache store failed")
+            self.errors += 1
+
+    async def _get(self, key: str, version: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def _set(self, key: str, version: str, body: bytes) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class MemoryTaskListStore(TaskListStore):
+    """Pages held by this worker, at most max_bytes of them, least recently used dropped first."""
+
+    backend = "memory"
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        super().__init__(max_entry_bytes)
+        self._cache = ByteLRUCache(max_bytes=max_bytes, max_entry_bytes=max_entry_bytes)
+
+    async def _get(self, key: str, version: str) -> Optional[bytes]:
+        entry = self._cache.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    async def _set(self, key: str, version: str, body: bytes) -> None:
+        self._cache.set(key, (version, body), len(body))
+
+    def stats(self) -> dict:
+        cache = self._cache.stats()
+        return {
+            **super().stats(),
+            "size": cache["size"],
+            "bytes": cache["bytes"],
+            "max_bytes": cache["max_bytes"],
+            "evictions": cache["evictions"],
+        }
+
+
+class MongoTaskListStore(TaskListStore):
+    """Pages shared by all workers, one document per key in task_list_cache.
+
+    A lookup is a find_one by _id and version; documents expire through a
+    TTL index on expire_at, ttl seconds after they were last written.
+    """
+
+    backend = "mongo"
+
+    def __init__(self, get_collection, max_entry_bytes: int, ttl: int):
+        super().__init__(max_entry_bytes)
+        self._get_collection = get_collection
+        self._ttl = ttl
+
+    async def _get(self, key: str, version: str) -> Optional[bytes]:
+        collection = await self._get_collection()
+        entry = await collection.find_one({"_id": key, "version": version}, projection={"_id": 0, "body": 1})
+        return bytes(entry["body"]) if entry else None
+
+    async def _set(self, key: str, version: str, body: bytes) -> None:
+        collection = await self._get_collection()
+        await collection.replace_one(
+            {"_id": key},
+            {"version": version, "body": Binary(body), "expire_at": datetime.utcnow() + timedelta(seconds=self._ttl)},
+            upsert=True
+        )
+
+
+def _create_store() -> Optional[TaskListStore]:
+    if settings.TASK_LIST_CACHE_BACKEND == "mongo":
+        return MongoTaskListStore(
+            get_task_list_cache_collection,
+            max_entry_bytes=settings.TASK_LIST_CACHE_MAX_ENTRY_BYTES,
+            ttl=settings.TASK_LIST_CACHE_TTL_SECONDS
+        )
+    if settings.TASK_LIST_CACHE_BACKEND == "memory" and settings.TASK_LIST_CACHE_MAX_BYTES > 0:
+        return MemoryTaskListStore(
+            max_bytes=settings.TASK_LIST_CACHE_MAX_BYTES,
+            max_entry_bytes=settings.TASK_LIST_CACHE_MAX_ENTRY_BYTES
+        )
+    return None
+
+
+# None when TASK_LIST_CACHE_BACKEND is "none"
+task_list_cache = _create_store()
@@ -0,0 +1,82 @@
+from typing import List, Optional
+
+# Base-62 digits in ASCII order, so ranks compare correctly as plain strings
+# (MongoDB's default binary string comparison included).
+RANK_DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_BASE = len(RANK_DIGITS)
+
+
+def rank_between(lower: Optional[str], upper: Optional[str]) -> str:
+    """Return a rank sorting strictly between lower and upper.
+
+    None means unbounded on that side. Ranks never end in the lowest digit,
+    which guarantees there is always room for another rank below them.
+    """
+    lower = lower or ""
+    if upper is not None and lower >= upper:
+        raise ValueError(f"Rank {lower!r} is not below {upper!r}")
+
+    # Inserting at either end of a column is the common case; stepping one
+    # digit instead of halving keeps those ranks short for much longer
+    if not lower and upper is not None:
+        return _step_below(upper)
+    if lower and upper is None:
+        return _step_above(lower)
+    return _midpoint(lower, upper)
+
+
+def _step_below(upper: str) -> str:
+    digit = RANK_DIGITS.index(upper[0])
+    if digit > 1:
+        return RANK_DIGITS[digit - 1]
+    if digit == 1:
+        return upper[0] if len(upper) > 1 else RANK_DIGITS[0] + _midpoint("", None)
+    return upper[0] + _step_below(upper[1:])
+
+
+def _step_above(lower: str) -> str:
+    digit = RANK_DIGITS.index(lower[0])
+    if digit < _BASE - 1:
+        return RANK_DIGITS[digit + 1]
+    return lower[0] + (_step_above(lower[1:]) if len(lower) > 1 else _midpoint("", None))
+
+
+def _midpoint(lower: str, upper: Optional[str]) -> str:
+    if upper is not None:
+        # Keep the common prefix, padding lower with zero digits
+        n = 0
+        while n < len(upper) and (lower[n] if n < len(lower) else RANK_DIGITS[0]) == upper[n]:
+            n += 1
+        if n > 0:
+            return upper[:n] + _midpoint(lower[n:], upper[n:])
+
+    digit_lower = RANK_DIGITS.index(lower[0]) if lower else 0
+    digit_upper = RANK_DIGITS.index(upper[0]) if upper is not None else _BASE
+
+    if digit_upper - digit_lower > 1:
+        return RANK_DIGITS[(digit_lower + digit_upper) // 2]
+
+    # Adjacent digits: a shorter prefix of upper still sorts below it
+    if upper is not None and len(upper) > 1:
+        return upper[0]
+    return RANK_DIGITS[digit_lower] + _midpoint(lower[1:], None)
+
+
+def evenly_spaced_ranks(count: int) -> List[str]:
+    """Return count short, increasing ranks spread evenly over the key space."""
+    width = 1
+    # Leave at least one spare digit of room between neighbours
+    while _BASE ** width < (count + 1) * _BASE:
+        width += 1
+    step = _BASE ** width // (count + 1)
+
+    ranks = []
+    for i in range(1, count + 1):
+        value = step * i
+        digits = []
+        for _ in range(width):
+            value, remainder = divmod(value, _BASE)
+            digits.append(RANK_DIGITS[remainder])
+        # Dropping trailing zero digits keeps the order among fixed-width keys
+        ranks.append("".join(reversed(digits)).rstrip(RANK_DIGITS[0]))
+    return ranks
@@ -0,0 +1,283 @@
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from pymongo import ReturnDocument
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.database import get_rate_limits_collection
+
+logger = logging.getLogger(__name__)
+
+# Largest body accepted on endpoints with per-email rules; reading stops
+# (and the request is refused with 413) as soon as a body grows past it
+MAX_INSPECTED_BODY = 16 * 1024
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """At most `limit` requests per `window` seconds to method+path, per client IP or per email."""
+    name: str
+    method: str
+    path: str
+    key: str  # "ip" or "email"
+    limit: int
+    window: int
+
+    @classmethod
+    def parse(cls, name: str, method: str, path: str, key: str, spec: str) -> "RateLimitRule":
+        """Build a rule from a "<limit>/<window seconds>" setting such as "20/60"."""
+        limit, window = (int(part) for part in spec.split("/"))
+        return cls(name, method, path, key, limit, window)
+
+
+class RateLimitStore:
+    """Counts requests per key in fixed windows; subclasses provide hit()."""
+
+    backend = ""
+
+    def __init__(self):
+        self.limited = 0
+
+    async def hit(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        """Count a request; returns (current window count, previous window count)."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "limited": self.limited}
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Sliding-window counters for this worker, spread over independent shards.
+
+    Every operation is synchronous and the event loop is single-threaded,
+    so no locks are needed; sharding keeps the cleanup done on each write
+    bounded to a small dict. Each shard holds at most max_keys / shards
+    entries, dropping expired then least recently used ones.
+    """
+
+    backend = "memory"
+
+    def __init__(self, shards: int = 64, max_keys: int = 100000):
+        super().__init__()
+        # Entries are [window_start, count, previous count, window]
+        self._shards: List[Dict[str, list]] = [{} for _ in range(shards)]
+        self._shard_size = max(1, max_keys // shards)
+
+    async def hit(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        shard = self._shards[hash(key) % len(self._shards)]
+        window_start = int(now // window * window)
+
+        entry = shard.pop(key, None)  # re-inserted below as most recently used
+        if entry is None or entry[0] < window_start - window:
+            entry = [window_start, 0, 0, window]
+        elif entry[0] < window_start:
+            entry = [window_start, 0, entry[1], window]
+        entry[1] += 1
+        shard[key] = entry
+
+        if len(shard) > self._shard_size:
+            self._evict(shard, now)
+        return entry[1], entry[2]
+
+    def _evict(self, shard: Dict[str, list], now: float) -> None:
+        # Past two windows an entry no longer affects any estimate
+        for stale in [key for key, entry in shard.items() if entry[0] + 2 * entry[3] <= now]:
+            del shard[stale]
+        while len(shard) > self._shard_size:
+            del shard[next(iter(shard))]
+
+    def stats(self) -> dict:
+        return {**super().stats(), "keys": sum(len(shard) for shard in self._shards)}
+
+
+class MongoRateLimitStore(RateLimitStore):
+    """Sliding-window counters shared by all workers, one document per key in rate_limits.
+
+    Each hit is a single upserting find_one_and_update whose pipeline rolls
+    the window forward; documents expire through a TTL index on expire_at.
+    """
+
+    backend = "mongo"
+
+    def __init__(self, get_collection):
+        super().__init__()
+        self._get_collection = get_collection
+
+    async def hit(self, key: str, window: int, now: float) -> Tuple[int, int]:
+        collection = await self._get_collection()
+        window_start = int(now // window * window)
+        same_window = {"$eq": ["$window_start", window_start]}
+        next_window = {"$eq": ["$window_start", window_start - window]}
+
+        counter = await collection.find_one_and_update(
+            {"_id": key},
+            [{"$set": {
+                "previous": {"$cond": [same_window, "$previous", {"$cond": [next_window, "$count", 0]}]},
+                "count": {"$cond": [same_window, {"$add": ["$count", 1]}, 1]},
+                "window_start": window_start,
+                "expire_at": datetime.utcfromtimestamp(window_start + 2 * window),
+            }}],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return counter["count"], counter["previous"]
+
+
+def retry_after(rule: RateLimitRule, current: int, previous: int, elapsed: float) -> Optional[int]:
+    """Seconds until a limited client may retry, or None if the request is allowed.
+
+    The sliding-window estimate weights the previous window by how much of
+    it still overlaps the last `window` seconds.
+    """
+    window = rule.window
+    estimate = previous * (1 - elapsed / window) + current
+    if estimate <= rule.limit:
+        return None
+
+    # The retry itself adds one to the current window
+    if current >= rule.limit:
+        # Wait out this window, then for its count to decay in the next one
+        wait = (window - elapsed) + window * max(0.0, 1 - (rule.limit - 1) / current)
+    else:
+        wait = window * (1 - (rule.limit - current - 1) / previous) - elapsed
+    return max(1, math.ceil(wait))
+
+
+class RateLimitMiddleware:
+    """Reject requests over their rules with 429 and Retry-After, before any route runs.
+
+    Per-email rules read the email from the JSON body, which is buffered
+    and replayed to the app unchanged; bodies over MAX_INSPECTED_BODY are
+    refused with 413 without being read further, so they can neither
+    fill memory nor dodge the per-email limit. If the store fails,
+    requests are let through rather than locking everyone out.
+    """
+
+    def __init__(self, app: ASGIApp, rules: List[RateLimitRule], store: RateLimitStore, trust_forwarded_for: bool = False):
+        self.app = app
+        self.store = store
+        self.trust_forwarded_for = trust_forwarded_for
+        self._rules: Dict[Tuple[str, str], List[RateLimitRule]] = {}
+        for rule in rules:
+            self._rules.setdefault((rule.method, rule.path.rstrip("/")), []).append(rule)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rules = None
+        if scope["type"] == "http":
+            rules = self._rules.get((scope["method"], scope["path"].rstrip("/")))
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        email = None
+        if any(rule.key == "email" for rule in rules):
+            body = await _read_body(scope, receive, MAX_INSPECTED_BODY)
+            if body is None:
+                response = JSONResponse({"detail": "Request body too large."}, status_code=413)
+                await response(scope, receive, send)
+                return
+            email = _email_from_body(body)
+            receive = _replay(body, receive)
+
+        now = time.time()
+        wait = None
+        for rule in rules:
+            subject = self._client_ip(scope) if rule.key == "ip" else email
+            if not subject:
+                continue
+            try:
+                current, previous = await self.store.hit(f"{rule.name}:{rule.key}:{subject}", rule.window, now)
+            except Exception:
+                logger.exception("Rate limit store failed; allowing request")
+                continue
+            rule_wait = retry_after(rule, current, previous, now % rule.window)
+            if rule_wait is not None:
+                wait = max(wait or 0, rule_wait)
+
+        if wait is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.store.limited += 1
+        response = JSONResponse(
+            {"detail": "Too many requests. Please try again later."},
+            status_code=429,
+            headers={"Retry-After": str(wait)}
+        )
+        await response(scope, receive, send)
+
+    def _client_ip(self, scope: Scope) -> Optional[str]:
+        if self.trust_forwarded_for:
+            for name, value in scope["headers"]:
+                if name == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else None
+
+
+async def _read_body(scope: Scope, receive: Receive, limit: int) -> Optional[bytes]:
+    """The whole request body, or None as soon as it is known to exceed limit bytes."""
+    for name, value in scope["headers"]:
+        if name == b"content-length" and value.isdigit() and int(value) > limit:
+            return None
+
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()  # http.disconnect
+
+    return replay
+
+
+def _email_from_body(body: bytes) -> Optional[str]:
+    if not body:
+        return None
+    try:
+        email = json.loads(body).get("email")
+    except (ValueError, AttributeError):
+        return None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def auth_rate_limit_rules() -> List[RateLimitRule]:
+    """Limits for the auth endpoints that cost a bcrypt hash or an email."""
+    return [
+        RateLimitRule.parse("login", "POST", "/api/auth/login", "ip", settings.RATE_LIMIT_LOGIN_PER_IP),
+        RateLimitRule.parse("login", "POST", "/api/auth/login", "email", settings.RATE_LIMIT_LOGIN_PER_EMAIL),
+        RateLimitRule.parse("register", "POST", "/api/auth/register", "ip", settings.RATE_LIMIT_REGISTER_PER_IP),
+        RateLimitRule.parse("resend", "POST", "/api/auth/resend-verification", "ip", settings.RATE_LIMIT_RESEND_PER_IP),
+        RateLimitRule.parse("resend", "POST", "/api/auth/resend-verification", "email", settings.RATE_LIMIT_RESEND_PER_EMAIL),
+    ]
+
+
+def _create_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_BACKEND == "mongo":
+        return MongoRateLimitStore(get_rate_limits_collection)
+    return MemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MEMORY_MAX_KEYS)
+
+
+rate_limit_store = _create_store()
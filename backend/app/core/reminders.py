@@ -0,0 +1,83 @@
+import asyncio
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class ReminderSchedule:
+    """Min-heap of (fire_at, task_id) for the reminders due before `horizon`.
+
+    Cancelling or rescheduling only updates the task's entry in a dict;
+    superseded heap items are skipped when they surface and compacted
+    away once they outnumber the live ones. Entries past the horizon are
+    not kept, since the next window load will pick them up.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, str]] = []
+        self._fire_at: Dict[str, datetime] = {}
+        self._changed = asyncio.Event()
+        self.horizon: Optional[datetime] = None
+        self.fired = 0
+
+    def schedule(self, task_id: str, fire_at: datetime) -> None:
+        if self.horizon is None or fire_at > self.horizon:
+            self.cancel(task_id)
+            return
+        if self._fire_at.get(task_id) == fire_at:
+            return
+
+        head = self.next_fire_at()
+        self._fire_at[task_id] = fire_at
+        heapq.heappush(self._heap, (fire_at, task_id))
+        self._compact()
+        if head is None or fire_at < head:
+            self._changed.set()  # the scheduler is sleeping until a later time
+
+    def cancel(self, task_id: str) -> None:
+        if self._fire_at.pop(task_id, None) is not None:
+            self._compact()
+
+    def next_fire_at(self) -> Optional[datetime]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime, limit: int) -> List[str]:
+        """Remove and return up to limit task ids whose reminder time has come, earliest first."""
+        due = []
+        while len(due) < limit and self.next_fire_at() is not None and self._heap[0][0] <= now:
+            _, task_id = heapq.heappop(self._heap)
+            del self._fire_at[task_id]
+            due.append(task_id)
+        self.fired += len(due)
+        return due
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep for timeout seconds, or until an earlier reminder is scheduled."""
+        self._changed.clear()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._fire_at.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        if len(self._heap) > 2 * len(self._fire_at) + 64:
+            self._heap = [(fire_at, task_id) for task_id, fire_at in self._fire_at.items()]
+            heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._fire_at)
+
+    def stats(self) -> dict:
+        next_fire_at = self.next_fire_at()
+        return {
+            "scheduled": len(self._fire_at),
+            "heap_size": len(self._heap),
+            "next_fire_at": next_fire_at.isoformat() if next_fire_at else None,
+            "horizon": self.horizon.isoformat() if self.horizon else None,
+            "fired": self.fired,
+        }
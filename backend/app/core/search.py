@@ -0,0 +1,59 @@
+import re
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Common English words that would otherwise match most documents
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+_SUFFIXES = ("ing", "ed", "s")
+
+
+def _stem(word: str) -> str:
+    # Light suffix stripping so "release", "releases" and "released" meet
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, stemmed words of text, without stop words."""
+    return [_stem(word) for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """Term -> {document id: weight} postings over a fixed set of documents.
+
+    Scores are weighted term counts summed over query terms (any term
+    matches). They follow the same field weights as a MongoDB text index
+    but not its length normalisation, so orderings can differ slightly.
+    """
+
+    def __init__(self, documents: Iterable[dict], weights: Dict[str, float]):
+        self.documents: Dict[Hashable, dict] = {}
+        self.postings: Dict[str, Dict[Hashable, float]] = {}
+
+        for document in documents:
+            document_id = document["_id"]
+            self.documents[document_id] = document
+            for field, weight in weights.items():
+                for term in tokenize(document.get(field) or ""):
+                    postings = self.postings.setdefault(term, {})
+                    postings[document_id] = postings.get(document_id, 0) + weight
+
+    def search(self, query: str) -> List[Tuple[float, Hashable]]:
+        """(score, document id) for every matching document, best first."""
+        scores: Dict[Hashable, float] = {}
+        for term in set(tokenize(query)):
+            for document_id, weight in self.postings.get(term, {}).items():
+                scores[document_id] = scores.get(document_id, 0) + weight
+        return sorted(((score, document_id) for document_id, score in scores.items()), reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.documents)
@@ -1,8 +1,14 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import PASSWORD_HASH_SECONDS
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -15,6 +21,79 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing queue is full."""
+
+# Dedicated executor so bcrypt never blocks the event loop nor competes
+# with the default executor used by other run_in_executor callers.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+_hash_timers = {"hash": PASSWORD_HASH_SECONDS.labels("hash"), "verify": PASSWORD_HASH_SECONDS.labels("verify")}
+
+def _release_hash_slot(operation: str, start: float) -> None:
+    global _hash_pending
+    _hash_pending -= 1
+    _hash_timers[operation].observe(time.perf_counter() - start)
+
+async def _run_hash_job(operation: str, func: Callable, *args):
+    """Run a bcrypt call on the hash executor, rejecting work past the queue limit.
+
+    A job holds its slot until it has finished in the executor (or was
+    cancelled before it started), not until its caller stops waiting, so
+    requests that disconnect cannot push the backlog past the limit.
+    """
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHasherBusy("Too many concurrent password operations, try again shortly")
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    job = _get_hash_executor().submit(func, *args)
+    _hash_pending += 1
+
+    def job_done(_) -> None:
+        # Runs in the worker thread; the counter belongs to the event loop
+        try:
+            loop.call_soon_threadsafe(_release_hash_slot, operation, start)
+        except RuntimeError:
+            pass  # The loop is closed, so nothing is waiting for a slot
+
+    job.add_done_callback(job_done)
+    return await asyncio.wrap_future(job)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hash executor."""
+    return await _run_hash_job("verify", verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hash executor."""
+    return await _run_hash_job("hash", get_password_hash, password)
+
+def password_hasher_stats() -> dict:
+    """Current load of the hash executor."""
+    return {
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "max_queue": settings.PASSWORD_HASH_MAX_QUEUE,
+        "pending": _hash_pending,
+    }
+
+def shutdown_password_hasher() -> None:
+    """Stop the hash executor, waiting for running jobs."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -32,18 +111,34 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     )
     return encoded_jwt
 
+# Verified access-token payloads keyed by SHA-256 of the token. Each entry
+# expires at the token's own exp, so a hit is as good as re-verifying.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
+    """Decode and verify a JWT token, memoizing verified payloads until they expire."""
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(
             token, 
             settings.JWT_SECRET_KEY, 
             algorithms=[settings.JWT_ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
 
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        remaining = exp - time.time()
+        if remaining > 0:
+            token_cache.set(digest, payload, ttl=remaining)
+
+    return dict(payload)
+
 def create_verification_token(email: str) -> str:
     """Create email verification token."""
     expire = datetime.utcnow() + timedelta(minutes=settings.VERIFICATION_TOKEN_EXPIRE_MINUTES)
@@ -0,0 +1,71 @@
+from typing import Any, Dict, Optional, Tuple
+import orjson
+from bson import ObjectId
+from fastapi.responses import Response
+from pydantic import BaseModel
+from app.schemas.task import TaskResponse
+from app.schemas.user import UserResponse
+
+
+def _response_fields(model: type[BaseModel], **defaults) -> Tuple[Tuple[str, Any], ...]:
+    """(document key, default) for each field of a response schema."""
+    return tuple(
+        (field.alias or name, defaults.get(name, None if field.is_required() else field.default))
+        for name, field in model.model_fields.items()
+    )
+
+
+# Documents are projected onto the response schemas field by field, which
+# also keeps anything else stored on them (e.g. hashed_password) out of
+# responses
+TASK_FIELDS = _response_fields(TaskResponse)
+# Users registered before email verification existed have no is_verified
+USER_FIELDS = _response_fields(UserResponse, is_verified=False)
+
+
+# List queries ask MongoDB for exactly the response fields, so their
+# documents can be encoded as they are, without a projection pass here
+TASK_PROJECTION = {key: 1 for key, _ in TASK_FIELDS}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def task_to_json(task: dict) -> Dict[str, Any]:
+    """Project a task document onto TaskResponse without validating it."""
+    return {key: task.get(key, default) for key, default in TASK_FIELDS}
+
+
+def user_to_json(user: dict) -> Dict[str, Any]:
+    """Project a user document onto UserResponse without validating it."""
+    return {key: user.get(key, default) for key, default in USER_FIELDS}
+
+
+def dumps(content: Any) -> bytes:
+    """Encode to JSON bytes, with ObjectId as its hex string and datetimes in ISO 8601.
+
+    Documents fetched with TASK_PROJECTION can be passed as they are;
+    optional fields they lack (e.g. rank on unranked tasks) are omitted
+    rather than written as null.
+    """
+    return orjson.dumps(content, default=_default)
+
+
+class DocumentResponse(Response):
+    """JSON response for documents read from MongoDB.
+
+    Database output is trusted, so it is encoded directly with orjson
+    instead of going through response_model validation and the stdlib
+    encoder. Routes keep their response_model for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content: Any, status_code: int = 200, headers: Optional[dict] = None):
+        super().__init__(content, status_code=status_code, headers=headers)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,100 @@
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+# "import time:       365 |     141520 |     httpcore._api" (microseconds)
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+class StartupTimer:
+    """Wall-clock time of each named step of a worker's startup."""
+
+    def __init__(self):
+        self.steps: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.perf_counter() - start))
+
+
+startup_timer = StartupTimer()
+
+
+def import_times(module: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self us, cumulative us, depth) for every import made by importing
+    `module` in a fresh interpreter, as reported by -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            times.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return times
+
+
+def report_imports(module: str, top: int) -> None:
+    times = import_times(module)
+    total = next((cumulative for name, _, cumulative, _ in times if name == module), 0)
+    print(f"import {module}: {total / 1000:.1f} ms, {len(times)} modules\n")
+
+    print("Application modules (cumulative includes what they import first):")
+    app_modules = sorted(
+        ((name, self_us, cumulative) for name, self_us, cumulative, _ in times if name.split(".")[0] == module.split(".")[0]),
+        key=lambda entry: entry[2], reverse=True
+    )
+    for name, self_us, cumulative in app_modules[:top]:
+        print(f"  {name:50} self {self_us / 1000:8.1f} ms   cumulative {cumulative / 1000:8.1f} ms")
+
+    # A dependency's cost is the self time of all its modules, wherever they were imported from
+    packages: Dict[str, int] = {}
+    for name, self_us, _, _ in times:
+        package = name.split(".")[0]
+        if package != module.split(".")[0]:
+            packages[package] = packages.get(package, 0) + self_us
+    print("\nDependencies (self time of all their modules):")
+    for package, self_us in sorted(packages.items(), key=lambda entry: entry[1], reverse=True)[:top]:
+        print(f"  {package:50} {self_us / 1000:8.1f} ms")
+
+
+async def report_lifespan(app) -> None:
+    """Run the app's startup and shutdown once and print each timed step."""
+    startup_timer.steps.clear()
+    start = time.perf_counter()
+    try:
+        async with app.router.lifespan_context(app):
+            startup = time.perf_counter() - start
+            started_steps = len(startup_timer.steps)
+    except Exception as e:
+        print(f"\nStartup failed after {(time.perf_counter() - start) * 1000:.1f} ms: {e!r}")
+        for name, seconds in startup_timer.steps:
+            print(f"  {name:50} {seconds * 1000:8.1f} ms")
+        return
+    print(f"\nStartup: {startup * 1000:.1f} ms")
+    for position, (name, seconds) in enumerate(startup_timer.steps):
+        if position == started_steps:
+            print("Shutdown:")
+        print(f"  {name:50} {seconds * 1000:8.1f} ms")
+
+
+def profile_startup(module: str = "app.main", top: int = 25) -> None:
+    """Print where a cold start goes: module imports, then each lifespan step."""
+    import asyncio
+    import importlib
+
+    report_imports(module, top)
+    app = importlib.import_module(module).app
+    asyncio.run(report_lifespan(app))
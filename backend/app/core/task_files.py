@@ -0,0 +1,123 @@
+import codecs
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple, Union
+import orjson
+
+# Export columns; imports read title, description, status and due_date and ignore the rest
+CSV_COLUMNS = ["_id", "title", "description", "status", "due_date", "rank", "created_at", "updated_at"]
+
+# Rows are written out this many at a time
+CSV_ROWS_PER_CHUNK = 200
+
+
+class ImportFileError(ValueError):
+    """The upload cannot be read any further (bad encoding, missing header, oversized line)."""
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def csv_chunks(tasks: AsyncIterator[dict]) -> AsyncIterator[bytes]:
+    """Encode tasks as CSV with a header row, a chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    rows = 0
+    async for task in tasks:
+        writer.writerow([_csv_value(task.get(column)) for column in CSV_COLUMNS])
+        rows += 1
+        if rows % CSV_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def _lines(chunks: AsyncIterator[bytes], max_line_length: int) -> AsyncIterator[str]:
+    """Split a byte stream into decoded lines (keeping their endings) without reading it all."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line + "\n"
+            if len(pending) > max_line_length:
+                raise ImportFileError(f"Line longer than {max_line_length} characters")
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError as e:
+        raise ImportFileError("File is not valid UTF-8") from e
+    if pending:
+        yield pending
+
+
+# Each record is (row number, fields) or (row number, error message)
+ImportRecord = Tuple[int, Union[dict, str]]
+
+
+async def ndjson_records(chunks: AsyncIterator[bytes], max_line_length: int) -> AsyncIterator[ImportRecord]:
+    """Parse one JSON object per line; blank lines are skipped but still numbered."""
+    row = 0
+    async for line in _lines(chunks, max_line_length):
+        row += 1
+        if not line.strip():
+            continue
+        try:
+            record = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        yield row, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+async def csv_records(chunks: AsyncIterator[bytes], max_line_length: int) -> AsyncIterator[ImportRecord]:
+    """Parse CSV with a header row; rows are numbered from 1 after the header.
+
+    Lines are gathered until their quotes balance, so quoted fields may
+    span lines. Empty cells are treated as missing.
+    """
+    header: List[str] = []
+    record = ""
+    row = 0
+    async for line in _lines(chunks, max_line_length):
+        record += line
+        # Quotes inside quoted fields are doubled, so an odd count means the record continues
+        if record.count('"') % 2:
+            if len(record) > max_line_length:
+                raise ImportFileError(f"Row longer than {max_line_length} characters")
+            continue
+
+        fields = _parse_csv_record(record)
+        record = ""
+        if fields is None:
+            continue
+        if not header:
+            header = [name.strip() for name in fields]
+            continue
+
+        row += 1
+        if len(fields) > len(header):
+            yield row, f"Expected at most {len(header)} columns, got {len(fields)}"
+            continue
+        yield row, {name: value for name, value in zip(header, fields) if value != ""}
+
+    if record:
+        yield row + 1, "Unterminated quoted field"
+    if not header:
+        raise ImportFileError("CSV file has no header row")
+
+
+def _parse_csv_record(record: str) -> Optional[List[str]]:
+    """Fields of one complete record, or None for a blank line."""
+    return next(csv.reader([record]), None) or None
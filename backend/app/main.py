@@ -1,15 +1,82 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import connect_to_mongo, close_mongo_connection
-from app.api.routes import auth, users, tasks
+from app.core.database import connect_to_mongo, close_mongo_connection, prewarm_pool
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.rate_limit import RateLimitMiddleware, auth_rate_limit_rules, rate_limit_store
+from app.core.security import shutdown_password_hasher
+from app.core.startup_profile import startup_timer
+from app.services.task_counter_service import run_counter_reconciler
+from app.services.task_rank_service import run_rank_rebalancer
+from app.services.task_event_service import run_change_stream_relay
+from app.services.email_outbox_service import run_email_dispatcher
+from app.services.account_deletion_service import run_account_deleter
+from app.services.task_reminder_service import run_reminder_scheduler
+from app.services.task_activity_service import run_activity_flusher
+from app.api.deps import require_internal_token
+from app.api.routes import auth, users, tasks, internal
+
+logger = logging.getLogger(__name__)
+
+def _start_background_tasks() -> list:
+    tasks = [
+        asyncio.create_task(run_rank_rebalancer()),
+        asyncio.create_task(run_email_dispatcher()),
+        asyncio.create_task(run_account_deleter()),
+    ]
+    if settings.TASK_REMINDERS_ENABLED:
+        tasks.append(asyncio.create_task(run_reminder_scheduler()))
+    if settings.TASK_ACTIVITY_ENABLED:
+        tasks.append(asyncio.create_task(run_activity_flusher()))
+    if settings.TASK_EVENTS_SOURCE == "change_stream":
+        tasks.append(asyncio.create_task(run_change_stream_relay()))
+    if settings.TASK_COUNTERS_RECONCILE_INTERVAL_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_counter_reconciler(settings.TASK_COUNTERS_RECONCILE_INTERVAL_SECONDS)))
+    return tasks
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Connect (and pre-warm the pool) before the worker takes traffic; stop cleanly after."""
+    with startup_timer.step("connect to MongoDB and ensure indexes"):
+        await connect_to_mongo()
+    logger.info("Connected to MongoDB")
+    if settings.DB_PREWARM_CONNECTIONS > 0:
+        with startup_timer.step("pre-warm connection pool"):
+            connections = await prewarm_pool(settings.DB_PREWARM_CONNECTIONS)
+        logger.info("Pre-warmed %d MongoDB connections", connections)
+    with startup_timer.step("start background tasks"):
+        app.state.background_tasks = _start_background_tasks()
+
+    yield
+
+    with startup_timer.step("stop background tasks"):
+        for task in app.state.background_tasks:
+            task.cancel()
+        await asyncio.gather(*app.state.background_tasks, return_exceptions=True)
+    with startup_timer.step("close MongoDB connection"):
+        await close_mongo_connection()
+        shutdown_password_hasher()
+    logger.info("Closed MongoDB connection")
 
 app = FastAPI(
     title=settings.APP_NAME,
     version="1.0.0",
-    description="Task Management System API with Kanban Board"
+    description="Task Management System API with Kanban Board",
+    lifespan=lifespan
 )
 
+# Auth rate limits; added before CORS so that 429s still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=auth_rate_limit_rules(),
+        store=rate_limit_store,
+        trust_forwarded_for=settings.RATE_LIMIT_TRUST_FORWARDED_FOR
+    )
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -19,16 +86,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database Events
-@app.on_event("startup")
-async def startup_db_client():
-    await connect_to_mongo()
-    print("Connected to MongoDB")
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    await close_mongo_connection()
-    print("Closed MongoDB connection")
+# Outermost, so rate-limited and CORS preflight responses are measured too
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # Health Check
 @app.get("/", tags=["Health"])
@@ -39,11 +99,33 @@ async def root():
         "status": "healthy"
     }
 
+# Prometheus scrape endpoint; scrapers send INTERNAL_API_TOKEN as a bearer token
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_internal_token)])
+    async def metrics():
+        return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Include Routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["Tasks"])
+if settings.INTERNAL_ENDPOINTS_ENABLED:
+    app.include_router(
+        internal.router,
+        prefix="/internal",
+        tags=["Internal"],
+        dependencies=[Depends(require_internal_token)],
+        include_in_schema=False
+    )
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    import sys
+
+    if "--profile-startup" in sys.argv:
+        # Import time per module, then each startup step: python -m app.main --profile-startup
+        from app.core.startup_profile import profile_startup
+        profile_startup()
+    else:
+        # Development server; production runs python -m app.server
+        import uvicorn
+        uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
-from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Union
+from typing_extensions import Annotated
+from datetime import datetime, timezone
 from app.models.task import TaskStatus
 
 class TaskCreate(BaseModel):
@@ -29,6 +30,26 @@ class TaskUpdate(BaseModel):
             raise ValueError('Due date cannot be in the past')
         return v
 
+class TaskImport(BaseModel):
+    """One imported row. Unlike TaskCreate, due dates may be in the past."""
+    title: str = Field(..., min_length=1, max_length=200)
+    description: Optional[str] = Field(None, max_length=2000)
+    status: TaskStatus = TaskStatus.PENDING
+    due_date: Optional[datetime] = None
+
+    @field_validator('due_date')
+    @classmethod
+    def due_date_naive_utc(cls, v):
+        # Stored due dates are naive UTC, like datetime.utcnow()
+        if v and v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
+
+class TaskMove(BaseModel):
+    status: TaskStatus
+    prev_id: Optional[str] = None  # task that will sit directly above
+    next_id: Optional[str] = None  # task that will sit directly below
+
 class TaskResponse(BaseModel):
     id: str = Field(..., alias="_id")
     user_id: str
@@ -36,9 +57,97 @@ class TaskResponse(BaseModel):
     description: Optional[str] = None
     status: str
     due_date: Optional[datetime] = None
+    rank: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
     model_config = {
         "populate_by_name": True
-    }
\ No newline at end of file
+    }
+
+class TaskPage(BaseModel):
+    items: List[TaskResponse]
+    next_cursor: Optional[str] = None
+
+class TaskSearchResult(TaskResponse):
+    score: float
+
+class TaskSearchPage(BaseModel):
+    items: List[TaskSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class TaskSummary(BaseModel):
+    counts: Dict[str, int]
+    total: int
+    overdue: int
+    latest_updated_at: Optional[datetime] = None
+
+class BulkCreateOperation(BaseModel):
+    op: Literal["create"]
+    task: TaskCreate
+
+class BulkUpdateOperation(BaseModel):
+    op: Literal["update"]
+    task_id: str
+    changes: TaskUpdate
+
+class BulkMoveOperation(BaseModel):
+    op: Literal["move"]
+    task_id: str
+    status: TaskStatus
+
+class BulkDeleteOperation(BaseModel):
+    op: Literal["delete"]
+    task_id: str
+
+BulkTaskOperation = Annotated[
+    Union[BulkCreateOperation, BulkUpdateOperation, BulkMoveOperation, BulkDeleteOperation],
+    Field(discriminator="op")
+]
+
+class BulkTaskRequest(BaseModel):
+    operations: List[BulkTaskOperation] = Field(..., min_length=1, max_length=500)
+
+class BulkOperationResult(BaseModel):
+    index: int
+    op: str
+    ok: bool
+    task_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkTaskResponse(BaseModel):
+    results: List[BulkOperationResult]
+
+class TaskFieldChange(BaseModel):
+    from_: Optional[Any] = Field(None, alias="from")
+    to: Optional[Any] = None
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+class TaskActivity(BaseModel):
+    id: str = Field(..., alias="_id")
+    task_id: str
+    action: str  # created, updated, status_changed, moved or deleted
+    changes: Dict[str, TaskFieldChange]
+    at: datetime
+
+    model_config = {
+        "populate_by_name": True
+    }
+
+class TaskActivityPage(BaseModel):
+    items: List[TaskActivity]
+    next_cursor: Optional[str] = None
+
+class TaskImportError(BaseModel):
+    row: int
+    error: str
+
+class TaskImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TaskImportError]
+    errors_truncated: bool = False
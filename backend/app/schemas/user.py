@@ -58,6 +58,18 @@ class UserResponse(BaseModel):
         "populate_by_name": True
     }
 
+class AccountDeletionJob(BaseModel):
+    id: str = Field(..., alias="_id")
+    status: str
+    tasks_deleted: int
+    tasks_total: Optional[int] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    model_config = {
+        "populate_by_name": True
+    }
+
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -0,0 +1,113 @@
+"""Production server: python -m app.server [--host H] [--port P] [--workers N]
+
+Runs uvicorn with uvloop and httptools and SERVER_WORKERS processes
+(by default one per available CPU, honouring CPU affinity and cgroup
+quotas). On SIGTERM or SIGINT each worker stops accepting connections,
+lets in-flight requests finish for up to SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+then runs the lifespan shutdown, which stops the background tasks and
+closes the MongoDB client.
+
+Each worker is a separate process with its own copy of all in-process
+state, so with more than one worker:
+  - caches (principals, tokens, search indexes, task list pages and
+    versions) are per worker; each worker fills its own
+  - RATE_LIMIT_BACKEND=memory counts per worker, so a client can make
+    up to limit x workers requests; use "mongo" for shared limits
+  - TASK_EVENTS_SOURCE=local only reaches websocket clients connected
+    to the worker that made the change; use "change_stream"
+  - every worker runs the background jobs. The email dispatcher and
+    account deleter claim messages and jobs under leases, reminders are
+    claimed through reminder_sent_at, and a counter reconciler sweep only
+    starts under a lease held for the whole interval, so none of them do
+    the same work twice; the rank rebalancer only rebalances columns the
+    worker itself queued, with writes conditional on the old ranks
+  - /metrics and /internal/* report the worker that served the request
+  - each worker has its own MongoDB pool (up to DB_MAX_POOL_SIZE
+    connections) and PASSWORD_HASH_WORKERS bcrypt threads
+"""
+import argparse
+import importlib.util
+import logging
+import math
+import os
+from typing import List, Optional
+import uvicorn
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, capped by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def worker_count(requested: int) -> int:
+    return requested if requested > 0 else available_cpus()
+
+
+def _warn_about_per_worker_state(workers: int) -> None:
+    if workers <= 1:
+        return
+    if settings.RATE_LIMIT_ENABLED and settings.RATE_LIMIT_BACKEND == "memory":
+        logger.warning("RATE_LIMIT_BACKEND=memory with %d workers: each worker enforces the limits on its own", workers)
+    if settings.TASK_EVENTS_SOURCE == "local":
+        logger.warning("TASK_EVENTS_SOURCE=local with %d workers: live events only reach clients on the same worker", workers)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def run(host: str, port: int, workers: int) -> None:
+    # Both come with uvicorn[standard]; fall back to asyncio and h11 without them
+    loop = "uvloop" if _installed("uvloop") else "asyncio"
+    http = "httptools" if _installed("httptools") else "h11"
+    if loop != "uvloop" or http != "httptools":
+        logger.warning("uvloop/httptools not installed; using %s and %s", loop, http)
+
+    _warn_about_per_worker_state(workers)
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        backlog=settings.SERVER_BACKLOG,
+        timeout_keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        proxy_headers=settings.SERVER_PROXY_HEADERS,
+        forwarded_allow_ips=settings.SERVER_FORWARDED_ALLOW_IPS,
+        access_log=settings.SERVER_ACCESS_LOG,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.server", description="Run the API in production.")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 sizes to the available CPUs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+    workers = worker_count(args.workers)
+    logger.info("Starting %d worker(s) on %s:%d", workers, args.host, args.port)
+    run(args.host, args.port, workers)
+
+
+if __name__ == "__main__":
+    main()
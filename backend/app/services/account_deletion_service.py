@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from app.core.config import settings
+from app.core.database import get_deletion_jobs_collection, get_tasks_collection
+from app.services.task_activity_service import TaskActivityService
+from app.services.task_counter_service import TaskCounterService
+from app.services.task_service import TaskService
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+
+# Set when a job is started so this worker's deleter does not wait for its next poll
+_wakeup: Optional[asyncio.Event] = None
+
+
+class AccountDeletionService:
+    """Account deletion jobs, one document per job in deletion_jobs.
+
+    Deleting an account flags the user (so they are rejected at once) and
+    records a job; run_account_deleter then removes the tasks in paced
+    batches, then the user, then their activity history, also in paced
+    batches. Jobs are leased, so a job whose worker
+    died is picked up again and continues with whatever is left.
+    """
+
+    @staticmethod
+    async def start(user_id: str) -> Optional[dict]:
+        """Flag the user as deleting and queue their job. None if already deleting."""
+        deletion_jobs = await get_deletion_jobs_collection()
+        now = datetime.utcnow()
+        job = {
+            # Random, since the id is all a client needs to read the job's status
+            "_id": uuid.uuid4().hex,
+            "user_id": ObjectId(user_id),
+            "status": PENDING,
+            "tasks_deleted": 0,
+            "tasks_total": None,
+            "lease_until": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        # The job is written first: a crash in between leaves a job that
+        # deletes an unflagged user, never a flagged user nobody deletes
+        await deletion_jobs.insert_one(job)
+        if not await UserService.mark_deleting(user_id, job["_id"]):
+            await deletion_jobs.delete_one({"_id": job["_id"]})
+            return None
+
+        if _wakeup is not None:
+            _wakeup.set()
+        return job
+
+    @staticmethod
+    async def get_job(job_id: str) -> Optional[dict]:
+        deletion_jobs = await get_deletion_jobs_collection()
+        return await deletion_jobs.find_one({"_id": job_id})
+
+    @staticmethod
+    async def claim_job(lease_seconds: int) -> Optional[dict]:
+        """Lease the oldest unfinished job whose lease has run out."""
+        deletion_jobs = await get_deletion_jobs_collection()
+        now = datetime.utcnow()
+        return await deletion_jobs.find_one_and_update(
+            {"status": {"$in": [PENDING, RUNNING]}, "lease_until": {"$lte": now}},
+            {"$set": {"status": RUNNING, "lease_until": now + timedelta(seconds=lease_seconds), "updated_at": now}},
+            sort=[("lease_until", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    @staticmethod
+    async def run_job(job: dict) -> None:
+        """Delete the job's tasks batch by batch, then the user. Safe to re-run."""
+        deletion_jobs = await get_deletion_jobs_collection()
+        user_id = str(job["user_id"])
+
+        if job["tasks_total"] is None:
+            tasks_collection = await get_tasks_collection()
+            remaining = await tasks_collection.count_documents({"user_id": job["user_id"]})
+            await deletion_jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {"tasks_total": job["tasks_deleted"] + remaining}}
+            )
+
+        await AccountDeletionService._delete_tasks(job)
+        await UserService.delete_user(user_id)
+        # Workers whose principal cache predates the flag may have added a few more
+        # (for at most PRINCIPAL_CACHE_REVALIDATE_SECONDS)
+        await AccountDeletionService._delete_tasks(job)
+        await AccountDeletionService._delete_activity(job)
+        await TaskCounterService.reset(user_id)
+
+        now = datetime.utcnow()
+        await deletion_jobs.update_one(
+            {"_id": job["_id"]},
+            {"$set": {
+                "status": COMPLETED,
+                "completed_at": now,
+                "updated_at": now,
+                "expire_at": now + timedelta(days=settings.ACCOUNT_DELETION_JOB_RETENTION_DAYS),
+            }}
+        )
+        logger.info("Deleted account %s", user_id)
+
+    @staticmethod
+    async def _delete_tasks(job: dict) -> None:
+        await AccountDeletionService._delete_in_batches(job, TaskService.delete_user_tasks_batch, "tasks_deleted")
+
+    @staticmethod
+    async def _delete_activity(job: dict) -> None:
+        await AccountDeletionService._delete_in_batches(job, TaskActivityService.delete_user_activity_batch)
+
+    @staticmethod
+    async def _delete_in_batches(
+        job: dict,
+        delete_batch: Callable[[str, int], Awaitable[int]],
+        progress_field: Optional[str] = None
+    ) -> None:
+        """Call delete_batch until nothing is left, renewing the lease after each batch."""
+        deletion_jobs = await get_deletion_jobs_collection()
+        user_id = str(job["user_id"])
+
+        while True:
+            deleted = await delete_batch(user_id, settings.ACCOUNT_DELETION_BATCH_SIZE)
+            if deleted == 0:
+                return
+
+            now = datetime.utcnow()
+            update = {
+                "$set": {
+                    "lease_until": now + timedelta(seconds=settings.ACCOUNT_DELETION_LEASE_SECONDS),
+                    "updated_at": now,
+                },
+            }
+            if progress_field:
+                update["$inc"] = {progress_field: deleted}
+            await deletion_jobs.update_one({"_id": job["_id"]}, update)
+            # Spread the deletes (and their oplog entries) out over time
+            await asyncio.sleep(settings.ACCOUNT_DELETION_PAUSE_SECONDS)
+
+async def run_account_deleter() -> None:
+    """Run queued and interrupted deletion jobs one at a time."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    try:
+        while True:
+            _wakeup.clear()
+            try:
+                job = await AccountDeletionService.claim_job(settings.ACCOUNT_DELETION_LEASE_SECONDS)
+                if job is not None:
+                    await AccountDeletionService.run_job(job)
+                    continue
+            except Exception:
+                logger.exception("Account deletion failed; the job will be retried once its lease runs out")
+
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.ACCOUNT_DELETION_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _wakeup = None
@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING
+from app.core.config import settings
+from app.core.database import get_email_outbox_collection
+from app.core.email import PooledMailer, build_reminder_email, build_verification_email
+from app.core.metrics import EMAIL_SEND_SECONDS
+from app.core.security import create_verification_token
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENT = "sent"
+DEAD = "dead"
+
+# Set by enqueue so this worker's dispatcher does not wait for its next poll
+_wakeup: Optional[asyncio.Event] = None
+
+
+def _render_verification(message: dict) -> EmailMessage:
+    context = message["context"]
+    # Minted at send time, so a delayed delivery still gets the full validity window
+    token = create_verification_token(context["email"])
+    return build_verification_email(message["recipients"], context["username"], token)
+
+
+def _render_task_reminder(message: dict) -> EmailMessage:
+    context = message["context"]
+    return build_reminder_email(message["recipients"], context["username"], context["tasks"])
+
+
+RENDERERS = {
+    "verification": _render_verification,
+    "task_reminder": _render_task_reminder,
+}
+
+
+class EmailOutboxService:
+    """Durable outgoing mail, one document per message in email_outbox.
+
+    Messages are written by request handlers and delivered by
+    run_email_dispatcher. A message is pending until it is sent, or dead
+    once it fails permanently or runs out of attempts.
+    """
+
+    @staticmethod
+    async def enqueue(template: str, recipients: List[str], context: dict) -> ObjectId:
+        """Store a message for delivery and wake the dispatcher."""
+        return (await EmailOutboxService.enqueue_many(template, [(recipients, context)]))[0]
+
+    @staticmethod
+    async def enqueue_many(template: str, messages: List[Tuple[List[str], dict]]) -> List[ObjectId]:
+        """Store (recipients, context) messages with a single insert and wake the dispatcher."""
+        if template not in RENDERERS:
+            raise ValueError(f"Unknown email template: {template}")
+
+        outbox = await get_email_outbox_collection()
+        now = datetime.utcnow()
+        result = await outbox.insert_many([
+            {
+                "template": template,
+                "recipients": recipients,
+                "context": context,
+                "status": PENDING,
+                "attempts": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }
+            for recipients, context in messages
+        ])
+
+        if _wakeup is not None:
+            _wakeup.set()
+        return result.inserted_ids
+
+    @staticmethod
+    async def claim_batch(batch_size: int, lease_seconds: int) -> List[dict]:
+        """Lease up to batch_size due messages to the caller.
+
+        Claiming pushes next_attempt_at past the lease, so messages held by a
+        dispatcher that dies simply become due again.
+        """
+        outbox = await get_email_outbox_collection()
+        now = datetime.utcnow()
+        due = {"status": PENDING, "next_attempt_at": {"$lte": now}}
+
+        cursor = outbox.find(due, projection={"_id": 1}).sort("next_attempt_at", ASCENDING).limit(batch_size)
+        message_ids = [message["_id"] async for message in cursor]
+        if not message_ids:
+            return []
+
+        claim = uuid.uuid4().hex
+        await outbox.update_many(
+            {"_id": {"$in": message_ids}, **due},
+            {"$set": {"claim": claim, "next_attempt_at": now + timedelta(seconds=lease_seconds)}}
+        )
+        return await outbox.find({"_id": {"$in": message_ids}, "claim": claim}).to_list(length=batch_size)
+
+    @staticmethod
+    async def mark_sent(message_ids: List[ObjectId], claim: str) -> None:
+        outbox = await get_email_outbox_collection()
+        now = datetime.utcnow()
+        await outbox.update_many(
+            {"_id": {"$in": message_ids}, "claim": claim},
+            {
+                "$set": {
+                    "status": SENT,
+                    "sent_at": now,
+                    "expire_at": now + timedelta(days=settings.EMAIL_OUTBOX_SENT_RETENTION_DAYS),
+                },
+                "$unset": {"claim": "", "last_error": ""},
+            }
+        )
+
+    @staticmethod
+    async def mark_failed(message: dict, error: str, permanent: bool = False) -> None:
+        """Schedule a retry with exponential backoff, or dead-letter the message."""
+        outbox = await get_email_outbox_collection()
+        now = datetime.utcnow()
+        attempts = message["attempts"] + 1
+
+        if permanent or attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            update = {"status": DEAD, "dead_at": now}
+            logger.error("Dead-lettered email %s after %d attempts: %s", message["_id"], attempts, error)
+        else:
+            delay = min(
+                settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+                settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS
+            )
+            update = {"next_attempt_at": now + timedelta(seconds=delay)}
+            logger.warning("Email %s failed (attempt %d), retrying in %ss: %s", message["_id"], attempts, delay, error)
+
+        await outbox.update_one(
+            {"_id": message["_id"], "claim": message["claim"]},
+            {"$set": {**update, "attempts": attempts, "last_error": error[:500]}, "$unset": {"claim": ""}}
+        )
+
+    @staticmethod
+    async def get_stats() -> dict:
+        """Message counts per status, each served by the status index."""
+        outbox = await get_email_outbox_collection()
+        counts = {}
+        for message_status in (PENDING, SENT, DEAD):
+            counts[message_status] = await outbox.count_documents({"status": message_status})
+        return counts
+
+
+async def dispatch_batch(mailer: PooledMailer) -> int:
+    """Claim and send one batch over the mailer's connection. Returns the number claimed."""
+    messages = await EmailOutboxService.claim_batch(
+        settings.EMAIL_OUTBOX_BATCH_SIZE, settings.EMAIL_OUTBOX_LEASE_SECONDS
+    )
+    if not messages:
+        return 0
+
+    # Imported with the rest of the mail stack once there is mail to send
+    from aiosmtplib import SMTPRecipientsRefused
+    from fastapi_mail.errors import ConnectionErrors
+
+    sent_ids = []
+    for position, message in enumerate(messages):
+        start = time.perf_counter()
+        try:
+            await mailer.send(RENDERERS[message["template"]](message))
+        except SMTPRecipientsRefused as e:
+            EMAIL_SEND_SECONDS.labels(message["template"], "refused").observe(time.perf_counter() - start)
+            await EmailOutboxService.mark_failed(message, str(e), permanent=True)
+        except ConnectionErrors as e:
+            EMAIL_SEND_SECONDS.labels(message["template"], "unreachable").observe(time.perf_counter() - start)
+            # The server is unreachable; the rest of the batch would fail the same way
+            for unsent in messages[position:]:
+                await EmailOutboxService.mark_failed(unsent, str(e))
+            break
+        except Exception as e:
+            EMAIL_SEND_SECONDS.labels(message["template"], "failed").observe(time.perf_counter() - start)
+            await EmailOutboxService.mark_failed(message, str(e) or type(e).__name__)
+        else:
+            EMAIL_SEND_SECONDS.labels(message["template"], "sent").observe(time.perf_counter() - start)
+            sent_ids.append(message["_id"])
+
+    if sent_ids:
+        await EmailOutboxService.mark_sent(sent_ids, messages[0]["claim"])
+    return len(messages)
+
+
+async def run_email_dispatcher() -> None:
+    """Drain the outbox in batches, reusing one SMTP connection while there is mail to send."""
+    global _wakeup
+    _wakeup = asyncio.Event()
+    mailer = PooledMailer()
+    try:
+        while True:
+            _wakeup.clear()
+            try:
+                claimed = await dispatch_batch(mailer)
+            except Exception:
+                logger.exception("Email dispatch failed")
+                claimed = 0
+
+            if claimed >= settings.EMAIL_OUTBOX_BATCH_SIZE:
+                continue  # more may be due right away
+            if claimed == 0:
+                # Nothing to send since the last poll: release the connection
+                await mailer.close()
+
+            try:
+                await asyncio.wait_for(_wakeup.wait(), timeout=settings.EMAIL_OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _wakeup = None
+        await mailer.close()
@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import DESCENDING
+from pymongo.errors import BulkWriteError
+from app.core.activity import ActivityBuffer
+from app.core.config import settings
+from app.core.database import get_task_activity_collection
+from app.core.pagination import encode_cursor, decode_cursor, keyset_filter
+
+logger = logging.getLogger(__name__)
+
+CREATED = "created"
+UPDATED = "updated"
+STATUS_CHANGED = "status_changed"
+MOVED = "moved"
+DELETED = "deleted"
+
+# Fields whose changes are recorded; rank is not, a reorder is a MOVED event
+TRACKED_FIELDS = ("title", "description", "status", "due_date")
+
+# Newest first, with _id as tie-breaker so keyset pagination is stable
+ACTIVITY_SORT = [("at", DESCENDING), ("_id", DESCENDING)]
+
+DUPLICATE_KEY = 11000
+
+# This worker's buffer while run_activity_flusher is running
+_buffer: Optional[ActivityBuffer] = None
+written = 0
+failed_flushes = 0
+
+
+def _changes(previous: Optional[dict], task: dict) -> Dict[str, Dict[str, Any]]:
+    """{field: {"from", "to"}} for the tracked fields that differ (all set fields when created)."""
+    previous = previous or {}
+    return {
+        field: {"from": previous.get(field), "to": task.get(field)}
+        for field in TRACKED_FIELDS
+        if previous.get(field) != task.get(field)
+    }
+
+
+def record_task_activity(user_id: str, task_id: Any, action: str, previous: Optional[dict] = None, task: Optional[dict] = None) -> None:
+    """Buffer one event for a task write; it is written to task_activity in the background.
+
+    Does nothing unless this worker runs the flusher. Updates that change
+    none of the tracked fields are not recorded.
+    """
+    if _buffer is None:
+        return
+
+    changes = _changes(previous, task) if task is not None else {}
+    if action == UPDATED:
+        if not changes:
+            return
+        if "status" in changes:
+            action = STATUS_CHANGED
+    elif action == MOVED and "status" in changes:
+        action = STATUS_CHANGED
+
+    now = datetime.utcnow()
+    event = {
+        "_id": ObjectId(),
+        "user_id": ObjectId(user_id),
+        "task_id": ObjectId(task_id),
+        "action": action,
+        "changes": changes,
+        "at": now,
+    }
+    if settings.TASK_ACTIVITY_RETENTION_DAYS > 0:
+        event["expire_at"] = now + timedelta(days=settings.TASK_ACTIVITY_RETENTION_DAYS)
+    _buffer.append(event)
+
+
+class TaskActivityService:
+    """Append-only history of task writes, one document per event in task_activity.
+
+    TaskService records events into this worker's ActivityBuffer and
+    run_activity_flusher writes them with insert_many, so an event shows
+    up in the history within TASK_ACTIVITY_FLUSH_SECONDS. Events expire
+    TASK_ACTIVITY_RETENTION_DAYS after they happened.
+    """
+
+    @staticmethod
+    async def get_history(user_id: str, task_id: str, limit: int = 50, cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """One page of a task's events, newest first, and the cursor for the next page."""
+        activity_collection = await get_task_activity_collection()
+
+        query = {"user_id": ObjectId(user_id), "task_id": ObjectId(task_id)}
+        if cursor:
+            at, last_id = decode_cursor(cursor)
+            query.update(keyset_filter("at", at, last_id))
+
+        events = await activity_collection.find(
+            query, projection={"user_id": 0, "expire_at": 0}
+        ).sort(ACTIVITY_SORT).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(events) > limit:
+            events = events[:limit]
+            next_cursor = encode_cursor(events[-1]["at"], events[-1]["_id"])
+        return events, next_cursor
+
+    @staticmethod
+    async def delete_user_activity_batch(user_id: str, batch_size: int) -> int:
+        """Delete up to batch_size of a user's events (account deletion). Returns the number deleted."""
+        activity_collection = await get_task_activity_collection()
+        owner_id = ObjectId(user_id)
+
+        cursor = activity_collection.find({"user_id": owner_id}, projection={"_id": 1}).limit(batch_size)
+        event_ids = [event["_id"] async for event in cursor]
+        if not event_ids:
+            return 0
+
+        result = await activity_collection.delete_many({"_id": {"$in": event_ids}, "user_id": owner_id})
+        return result.deleted_count
+
+async def flush(buffer: ActivityBuffer) -> None:
+    """Write everything buffered, a batch at a time.
+
+    Events keep their _id across retries, so a batch that was partly
+    written before failing is retried without duplicating any event.
+    """
+    global written, failed_flushes
+    activity_collection = await get_task_activity_collection()
+
+    while len(buffer):
+        events = buffer.take(settings.TASK_ACTIVITY_BATCH_SIZE)
+        try:
+            await activity_collection.insert_many(events, ordered=False)
+        except BulkWriteError as e:
+            errors = [error for error in e.details.get("writeErrors", []) if error.get("code") != DUPLICATE_KEY]
+            written += len(events) - len(errors)
+            if errors:
+                failed_flushes += 1
+                logger.error("Dropped %d task activity events: %s", len(errors), errors[0].get("errmsg"))
+        except BaseException:
+            # Includes cancellation at shutdown, whose final flush retries them
+            buffer.put_back(events)
+            failed_flushes += 1
+            raise
+        else:
+            written += len(events)
+
+
+async def run_activity_flusher() -> None:
+    """Write buffered events once a batch has built up, or every TASK_ACTIVITY_FLUSH_SECONDS."""
+    global _buffer
+    buffer = _buffer = ActivityBuffer(settings.TASK_ACTIVITY_BUFFER_SIZE, settings.TASK_ACTIVITY_BATCH_SIZE)
+    try:
+        while True:
+            await buffer.wait(settings.TASK_ACTIVITY_FLUSH_SECONDS)
+            try:
+                await flush(buffer)
+            except Exception:
+                logger.exception("Writing task activity failed")
+                await asyncio.sleep(settings.TASK_ACTIVITY_FLUSH_SECONDS)
+    finally:
+        _buffer = None
+        # Shutting down: write what is left before the MongoDB client is closed
+        try:
+            await flush(buffer)
+        except Exception:
+            logger.exception("Writing task activity at shutdown failed; %d events lost", len(buffer))
+
+
+def task_activity_stats() -> dict:
+    return {
+        "running": _buffer is not None,
+        "written": written,
+        "failed_flushes": failed_flushes,
+        **(_buffer.stats() if _buffer is not None else {}),
+    }
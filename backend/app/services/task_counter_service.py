@@ -0,0 +1,270 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_job_leases_collection, get_task_counters_collection, get_task_counters_read_collection, get_tasks_collection
+from app.models.task import TaskStatus
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = [TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value]
+
+# Times a reconciliation is retried when the counters change while it runs
+RECONCILE_ATTEMPTS = 3
+# How long a difference between counters and tasks must persist before it is
+# repaired; longer than a task write takes between storing a task and its delta
+RECONCILE_SETTLE_SECONDS = 1
+# Name of the reconciler's lease in job_leases
+RECONCILER_LEASE = "task_counter_reconciler"
+
+# Versions this worker has read, reused for TASK_VERSION_CACHE_SECONDS
+version_cache = TTLCache(maxsize=settings.TASK_VERSION_CACHE_USERS, ttl=settings.TASK_VERSION_CACHE_SECONDS)
+# Bumped on every local change, so a version read that raced one is not kept
+_local_changes = 0
+
+def _forget_version(user_id: str) -> None:
+    global _local_changes
+    _local_changes += 1
+    version_cache.invalidate(user_id)
+
+def _marker(counters: Optional[dict]) -> Optional[tuple]:
+    return None if counters is None else (counters.get("epoch"), counters.get("version"))
+
+def _matches(counters: dict, counts: Dict[str, int], latest_updated_at: Optional[datetime]) -> bool:
+    stored = {status.value: counters.get("counts", {}).get(status.value, 0) for status in TaskStatus}
+    return stored == counts and counters.get("latest_updated_at") == latest_updated_at and "epoch" in counters
+
+class TaskCounterService:
+    """Per-user board counters, one document per user in task_counters.
+
+    Documents look like
+    {"_id": user_id, "counts": {status: n}, "latest_updated_at": dt, "epoch": id, "version": n}
+    and are maintained with $inc by TaskService mutations. Documents that
+    drifted from the tasks collection are repaired by the reconciler.
+
+    (epoch, version) changes on every mutation of the user's tasks and
+    serves as the change marker for conditional GETs. The epoch is renewed
+    whenever the document is created, so a version never repeats after a
+    reset; counters that are still correct are left alone, markers included.
+    """
+
+    @staticmethod
+    async def apply(user_id: str, deltas: Dict[str, int], updated_at: Optional[datetime] = None) -> None:
+        """Atomically apply per-status count deltas, bump the version and latest_updated_at.
+
+        A missing document is created from this write's deltas alone, with
+        a new epoch. Counting the tasks instead would also count tasks whose
+        writers have not applied their own deltas yet; counters that start
+        out wrong (tasks that predate them) are repaired by the reconciler.
+        """
+        inc = {f"counts.{status}": delta for status, delta in deltas.items() if delta}
+        inc["version"] = 1
+        update = {"$inc": inc, "$setOnInsert": {"epoch": ObjectId()}}
+        if updated_at:
+            update["$max"] = {"latest_updated_at": updated_at}
+
+        counters_collection = await get_task_counters_collection()
+        await counters_collection.update_one({"_id": ObjectId(user_id)}, update, upsert=True)
+        _forget_version(user_id)
+
+    @staticmethod
+    async def reset(user_id: str) -> None:
+        """Drop a user's counters (all of their tasks are gone)."""
+        counters_collection = await get_task_counters_collection()
+        await counters_collection.delete_one({"_id": ObjectId(user_id)})
+        _forget_version(user_id)
+
+    @staticmethod
+    async def _count(user_id: str) -> Tuple[Dict[str, int], Optional[datetime]]:
+        """Per-status counts and latest updated_at from a $group over the user's tasks."""
+        tasks_collection = await get_tasks_collection()
+
+        counts = {status.value: 0 for status in TaskStatus}
+        latest_updated_at = None
+
+        pipeline = [
+            {"$match": {"user_id": ObjectId(user_id)}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}, "latest": {"$max": "$updated_at"}}},
+        ]
+        async for group in tasks_collection.aggregate(pipeline):
+            counts[group["_id"]] = group["count"]
+            if group["latest"] and (latest_updated_at is None or group["latest"] > latest_updated_at):
+                latest_updated_at = group["latest"]
+        return counts, latest_updated_at
+
+    @staticmethod
+    async def _reconcile(user_id: str) -> Tuple[Optional[dict], bool]:
+        """Repair a user's counters if they differ from their tasks.
+
+        Returns the counters and whether they were written. Task writes
+        store the task before applying its delta, so a difference may only
+        be a delta still in flight: it is trusted only if, after
+        RECONCILE_SETTLE_SECONDS, the counters are at the same version and
+        the tasks count the same. The repair is then conditional on that
+        version, and the check is retried if anything changed. A missing
+        document is created with a new epoch; a drifted one keeps its epoch
+        and gets the next version.
+        """
+        counters_collection = await get_task_counters_collection()
+        owner_id = ObjectId(user_id)
+
+        for _ in range(RECONCILE_ATTEMPTS):
+            current = await counters_collection.find_one({"_id": owner_id})
+            counted = await TaskCounterService._count(user_id)
+            if current is not None and _matches(current, *counted):
+                return current, False
+
+            await asyncio.sleep(RECONCILE_SETTLE_SECONDS)
+            settled = await counters_collection.find_one({"_id": owner_id})
+            if _marker(settled) != _marker(current) or await TaskCounterService._count(user_id) != counted:
+                continue
+            counts, latest_updated_at = counted
+
+            if current is None:
+                counters = {
+                    "_id": owner_id,
+                    "counts": counts,
+                    "latest_updated_at": latest_updated_at,
+                    "epoch": ObjectId(),
+                    "version": 0,
+                }
+                try:
+                    await counters_collection.insert_one(counters)
+                except DuplicateKeyError:
+                    continue  # Created concurrently; check that one instead
+                _forget_version(user_id)
+                return counters, True
+
+            repair = {"$set": {"counts": counts, "latest_updated_at": latest_updated_at}, "$inc": {"version": 1}}
+            if "epoch" not in current:
+                repair["$set"]["epoch"] = ObjectId()
+            counters = await counters_collection.find_one_and_update(
+                {"_id": owner_id, "version": current.get("version")},
+                repair,
+                return_document=ReturnDocument.AFTER
+            )
+            if counters is not None:
+                _forget_version(user_id)
+                return counters, True
+
+        logger.warning("Task counters of user %s kept changing while being reconciled; left as they are", user_id)
+        return await counters_collection.find_one({"_id": owner_id}), False
+
+    @staticmethod
+    async def reconcile_user(user_id: str) -> dict:
+        """Check a user's counters against their tasks, repairing or creating them as needed."""
+        counters, _ = await TaskCounterService._reconcile(user_id)
+        return counters
+
+    @staticmethod
+    async def reconcile_all(batch_size: int = 100) -> int:
+        """Check every existing counters document. Returns the number repaired."""
+        counters_collection = await get_task_counters_collection()
+        checked = repaired = 0
+
+        async for counters in counters_collection.find({}, projection={"_id": 1}).batch_size(batch_size):
+            _, written = await TaskCounterService._reconcile(str(counters["_id"]))
+            repaired += written
+            checked += 1
+            if checked % batch_size == 0:
+                # Yield to request handlers between batches
+                await asyncio.sleep(0)
+
+        return repaired
+
+    @staticmethod
+    async def get_version(
+        user_id: str,
+        session: Optional[AsyncIOMotorClientSession] = None,
+        reuse: bool = False
+    ) -> Optional[str]:
+        """Change marker for the user's tasks, or None if no counters exist yet.
+
+        With reuse, a version this worker read within
+        TASK_VERSION_CACHE_SECONDS is returned without a query.
+        """
+        if reuse and version_cache.ttl > 0:
+            version = version_cache.get(user_id)
+            if version is not None:
+                return version
+        changes = _local_changes
+
+        counters_collection = await get_task_counters_read_collection()
+        counters = await counters_collection.find_one(
+            {"_id": ObjectId(user_id)},
+            projection={"_id": 0, "epoch": 1, "version": 1},
+            session=session
+        )
+        if counters is None or "epoch" not in counters:
+            return None
+        version = f"{counters['epoch']}-{counters['version']}"
+        if reuse and version_cache.ttl > 0 and changes == _local_changes:
+            version_cache.set(user_id, version)
+        return version
+
+    @staticmethod
+    async def get_summary(user_id: str) -> dict:
+        """Per-status counts, overdue count and latest updated_at for a user's board."""
+        counters_collection = await get_task_counters_collection()
+        tasks_collection = await get_tasks_collection()
+
+        counters = await counters_collection.find_one({"_id": ObjectId(user_id)})
+        if counters is None or any(count < 0 for count in counters.get("counts", {}).values()):
+            counters = await TaskCounterService.reconcile_user(user_id)
+
+        counts = {status.value: max(counters["counts"].get(status.value, 0), 0) for status in TaskStatus}
+
+        # Overdue depends on the clock rather than on writes, so it cannot be
+        # kept as a counter; it is counted from the (user_id, status, due_date)
+        # index, touching only the overdue tasks themselves
+        overdue = await tasks_collection.count_documents({
+            "user_id": ObjectId(user_id),
+            "status": {"$in": OPEN_STATUSES},
+            "due_date": {"$lt": datetime.utcnow()}
+        })
+
+        return {
+            "counts": counts,
+            "total": sum(counts.values()),
+            "overdue": overdue,
+            "latest_updated_at": counters.get("latest_updated_at"),
+        }
+
+
+async def claim_reconciler_lease(lease_seconds: int) -> bool:
+    """Take the reconciler's lease for lease_seconds unless another worker holds it."""
+    job_leases = await get_job_leases_collection()
+    now = datetime.utcnow()
+    try:
+        await job_leases.update_one(
+            {"_id": RECONCILER_LEASE, "lease_until": {"$lte": now}},
+            {"$set": {"lease_until": now + timedelta(seconds=lease_seconds)}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        return False  # Held: the filter missed the existing document and the upsert clashed with it
+    return True
+
+
+async def run_counter_reconciler(interval_seconds: int) -> None:
+    """Periodically check all counters and repair those that drifted.
+
+    Every worker runs this loop, but a sweep only starts under the lease,
+    which is held for a whole interval, so there is one sweep per interval
+    across all workers.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            if not await claim_reconciler_lease(interval_seconds):
+                continue
+            repaired = await TaskCounterService.reconcile_all()
+            logger.info("Reconciled task counters; %d users had drifted", repaired)
+        except Exception:
+            logger.exception("Task counter reconciliation failed")
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from typing import Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from app.core.config import settings
+from app.core.database import get_tasks_collection
+from app.core.events import EventHub, RESYNC_MESSAGE
+from app.core.serialization import TASK_PROJECTION, dumps, task_to_json
+
+logger = logging.getLogger(__name__)
+
+# Live task deltas for /api/tasks/events connections on this worker
+task_events = EventHub(
+    queue_size=settings.TASK_EVENTS_QUEUE_SIZE,
+    max_subscribers_per_user=settings.TASK_EVENTS_MAX_CONNECTIONS_PER_USER
+)
+
+CHANGE_STREAM_HISTORY_LOST = 286
+
+# Every worker receives every relayed change, so the stream is cut down on
+# the server to the operations relayed and the fields of a task response
+# (plus the owner of a deleted task); _id is the resume token and is kept.
+CHANGE_STREAM_PIPELINE = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        **{f"fullDocument.{field}": 1 for field in TASK_PROJECTION},
+        "fullDocumentBeforeChange.user_id": 1,
+    }},
+]
+
+def publish_task_event(
+    user_id: str,
+    event_type: str,
+    task: Optional[dict] = None,
+    task_id: Optional[str] = None,
+    from_change_stream: bool = False
+) -> None:
+    """Publish a task delta to the user's live connections.
+
+    Event types are task.created / task.updated (with the task),
+    task.deleted (with task_id) and tasks.changed (refetch everything).
+    When change streams are the event source, service-side publishes are
+    ignored so every change is delivered exactly once.
+    """
+    if (settings.TASK_EVENTS_SOURCE == "change_stream") != from_change_stream:
+        return
+    # Nobody listening: skip serialization entirely
+    if not task_events.has_subscribers(user_id):
+        return
+
+    event = {"type": event_type}
+    if task is not None:
+        event["task"] = task_to_json(task)
+    if task_id is not None:
+        event["task_id"] = task_id
+
+    task_events.publish(user_id, dumps(event).decode())
+
+
+async def run_change_stream_relay() -> None:
+    """Feed the hub from a change stream on tasks, so writes from any worker reach every worker.
+
+    Deletes are only relayed when the collection records pre-images
+    (changeStreamPreAndPostImages), since the delete event itself does
+    not carry the owner's user_id.
+    """
+    tasks_collection = await get_tasks_collection()
+    resume_token = None
+    backoff = 1
+
+    while True:
+        try:
+            async with tasks_collection.watch(
+                CHANGE_STREAM_PIPELINE,
+                full_document="updateLookup",
+                full_document_before_change="whenAvailable",
+                resume_after=resume_token
+            ) as stream:
+                backoff = 1
+                async for change in stream:
+                    resume_token = stream.resume_token
+                    _relay_change(change)
+        except OperationFailure as e:
+            if e.code != CHANGE_STREAM_HISTORY_LOST:
+                # Standalone server, unsupported options, missing privileges...
+                logger.error("Task change stream unavailable (%s); task events will not be relayed", e)
+                return
+            # Events were missed; start from now and let clients catch up
+            logger.warning("Task change stream history lost; resuming from the current time")
+            resume_token = None
+            _broadcast_resync()
+        except PyMongoError as e:
+            logger.warning("Task change stream failed (%s); retrying in %ss", e, backoff)
+
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, 30)
+
+
+def _relay_change(change: dict) -> None:
+    operation = change["operationType"]
+
+    if operation in ("insert", "update", "replace"):
+        task = change.get("fullDocument")
+        if task is None:  # deleted before the lookup ran
+            return
+        event_type = "task.created" if operation == "insert" else "task.updated"
+        publish_task_event(str(task["user_id"]), event_type, task=task, from_change_stream=True)
+    elif operation == "delete":
+        previous = change.get("fullDocumentBeforeChange")
+        if previous is not None:
+            publish_task_event(
+                str(previous["user_id"]), "task.deleted",
+                task_id=str(change["documentKey"]["_id"]), from_change_stream=True
+            )
+
+
+def _broadcast_resync() -> None:
+    for user_id in task_events.user_ids():
+        task_events.publish(user_id, RESYNC_MESSAGE)
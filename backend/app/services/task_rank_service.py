@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from typing import Optional, Set, Tuple
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from app.core.database import get_tasks_collection
+from app.core.ranking import evenly_spaced_ranks
+from app.services.task_counter_service import TaskCounterService
+
+logger = logging.getLogger(__name__)
+
+# Columns waiting for a rebalance, as (user_id, status)
+_pending: Set[Tuple[str, str]] = set()
+_queue: Optional[asyncio.Queue] = None
+
+class TaskRankService:
+    @staticmethod
+    def schedule_rebalance(user_id: str, status: str) -> None:
+        """Queue a column for rebalancing; repeated requests are coalesced."""
+        key = (user_id, status)
+        if _queue is None or key in _pending:
+            return
+        _pending.add(key)
+        _queue.put_nowait(key)
+
+    @staticmethod
+    async def rebalance_column(user_id: str, status: str, batch_size: int = 500) -> int:
+        """Rewrite a column's ranks as short, evenly spaced keys in their current order.
+
+        Tasks without a rank (created before ranks existed) keep their
+        newest-first order at the top of the column. Each task is only
+        rewritten if it still has the rank and status it was read with, so
+        a concurrent move is never overwritten; if any task changed, the
+        column is queued again to be rebalanced from its new order.
+        Returns the number of ranks rewritten.
+        """
+        tasks_collection = await get_tasks_collection()
+        query = {"user_id": ObjectId(user_id), "status": status}
+
+        cursor = tasks_collection.find(query, projection={"_id": 1, "rank": 1}).sort(
+            [("rank", ASCENDING), ("created_at", DESCENDING)]
+        )
+        tasks = [(task["_id"], task.get("rank")) async for task in cursor]
+        ranks = evenly_spaced_ranks(len(tasks))
+
+        requests = [
+            UpdateOne({"_id": task_id, **query, "rank": old_rank}, {"$set": {"rank": rank}})
+            for (task_id, old_rank), rank in zip(tasks, ranks)
+            if old_rank != rank
+        ]
+        rewritten = 0
+        for start in range(0, len(requests), batch_size):
+            result = await tasks_collection.bulk_write(requests[start:start + batch_size], ordered=False)
+            rewritten += result.matched_count
+
+        if rewritten:
+            # Ranks are part of the task representation
+            await TaskCounterService.apply(user_id, {})
+        if rewritten < len(requests):
+            logger.info("Column %s of user %s changed while being rebalanced; queueing it again", status, user_id)
+            TaskRankService.schedule_rebalance(user_id, status)
+
+        return rewritten
+
+    @staticmethod
+    async def backfill_ranks() -> int:
+        """Rank every column that still has unranked tasks. Returns the number of columns."""
+        tasks_collection = await get_tasks_collection()
+        pipeline = [
+            {"$match": {"rank": {"$exists": False}}},
+            {"$group": {"_id": {"user_id": "$user_id", "status": "$status"}}},
+        ]
+        columns = 0
+        async for column in tasks_collection.aggregate(pipeline, allowDiskUse=True):
+            await TaskRankService.rebalance_column(str(column["_id"]["user_id"]), column["_id"]["status"])
+            columns += 1
+        return columns
+
+
+async def run_rank_rebalancer() -> None:
+    """Rebalance queued columns one at a time."""
+    global _queue
+    _queue = asyncio.Queue()
+    try:
+        while True:
+            user_id, status = await _queue.get()
+            _pending.discard((user_id, status))
+            try:
+                count = await TaskRankService.rebalance_column(user_id, status)
+                logger.info("Rebalanced %d ranks for user %s column %s", count, user_id, status)
+            except Exception:
+                logger.exception("Rank rebalance failed for user %s column %s", user_id, status)
+    finally:
+        _queue = None
+        _pending.clear()
+
+
+if __name__ == "__main__":
+    from app.core.database import connect_to_mongo, close_mongo_connection
+
+    async def main():
+        await connect_to_mongo()
+        try:
+            print(f"Ranked {await TaskRankService.backfill_ranks()} columns")
+        finally:
+            await close_mongo_connection()
+
+    asyncio.run(main())
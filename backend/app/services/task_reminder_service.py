@@ -0,0 +1,165 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from pymongo import ASCENDING
+from bson import ObjectId
+from app.core.config import settings
+from app.core.database import get_tasks_collection, get_users_collection
+from app.core.reminders import ReminderSchedule
+from app.models.task import TaskStatus
+from app.services.email_outbox_service import EmailOutboxService
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = [TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value]
+
+# This worker's schedule while run_reminder_scheduler is running
+_schedule: Optional[ReminderSchedule] = None
+
+
+def schedule_task_reminder(task: dict) -> None:
+    """(Re)schedule a task's reminder after a write, or cancel it if none is due.
+
+    Does nothing unless this worker runs the scheduler. task must carry
+    due_date, status and reminder_sent_at as they are after the write.
+    """
+    if _schedule is None:
+        return
+
+    task_id = str(task["_id"])
+    due_date = task.get("due_date")
+    if due_date is None or task.get("status") not in OPEN_STATUSES or task.get("reminder_sent_at"):
+        _schedule.cancel(task_id)
+        return
+
+    _schedule.schedule(task_id, due_date - timedelta(seconds=settings.TASK_REMINDER_LEAD_SECONDS))
+
+
+def cancel_task_reminders(task_ids: List[str]) -> None:
+    if _schedule is None:
+        return
+    for task_id in task_ids:
+        _schedule.cancel(str(task_id))
+
+
+class TaskReminderService:
+    """Due-date reminder emails, sent TASK_REMINDER_LEAD_SECONDS before a task is due.
+
+    Each worker keeps the reminders falling in the next window in a
+    ReminderSchedule, refilled from the (due_date, status) index as the
+    window rolls forward and updated in place by task writes. A reminder
+    is claimed by setting reminder_sent_at, so only one worker sends it
+    and changing the due date re-arms it.
+    """
+
+    @staticmethod
+    async def load_window(schedule: ReminderSchedule, now: datetime) -> None:
+        """Schedule the open, unreminded tasks whose reminder falls before now + window."""
+        tasks_collection = await get_tasks_collection()
+        lead = timedelta(seconds=settings.TASK_REMINDER_LEAD_SECONDS)
+        horizon = now + timedelta(seconds=settings.TASK_REMINDER_WINDOW_SECONDS)
+        limit = settings.TASK_REMINDER_MAX_SCHEDULED
+
+        # Moved first, so writes landing during the query are kept
+        schedule.horizon = horizon
+        cursor = tasks_collection.find(
+            {"due_date": {"$gt": now, "$lte": horizon + lead}, "status": {"$in": OPEN_STATUSES}, "reminder_sent_at": None},
+            projection={"due_date": 1}
+        ).sort("due_date", ASCENDING).limit(limit)
+
+        loaded = 0
+        async for task in cursor:
+            schedule.schedule(str(task["_id"]), task["due_date"] - lead)
+            loaded += 1
+
+        if loaded == limit:
+            # Too many to hold at once; stop the window at the last one loaded
+            schedule.horizon = task["due_date"] - lead
+
+    @staticmethod
+    async def send_reminders(task_ids: List[str], now: datetime) -> int:
+        """Claim the tasks' reminders and queue one email per user. Returns the number claimed.
+
+        A task is only claimed if it is still open, unreminded and due
+        within the lead time, which filters out whatever changed since
+        it was scheduled (on this worker or any other). Reminders are
+        sent at most once: a crash after the claim loses them.
+        """
+        tasks_collection = await get_tasks_collection()
+        users_collection = await get_users_collection()
+        lead = timedelta(seconds=settings.TASK_REMINDER_LEAD_SECONDS)
+
+        claim = uuid.uuid4().hex
+        await tasks_collection.update_many(
+            {
+                "_id": {"$in": [ObjectId(task_id) for task_id in task_ids]},
+                "due_date": {"$gt": now, "$lte": now + lead},
+                "status": {"$in": OPEN_STATUSES},
+                "reminder_sent_at": None,
+            },
+            {"$set": {"reminder_sent_at": now, "reminder_claim": claim}}
+        )
+        tasks = await tasks_collection.find(
+            {"_id": {"$in": [ObjectId(task_id) for task_id in task_ids]}, "reminder_claim": claim},
+            projection={"user_id": 1, "title": 1, "due_date": 1}
+        ).sort("due_date", ASCENDING).to_list(length=len(task_ids))
+        if not tasks:
+            return 0
+
+        tasks_by_user: Dict[ObjectId, List[dict]] = {}
+        for task in tasks:
+            tasks_by_user.setdefault(task["user_id"], []).append({"title": task["title"], "due_date": task["due_date"]})
+
+        # Unverified addresses might not belong to the user
+        users = users_collection.find(
+            {"_id": {"$in": list(tasks_by_user)}, "is_verified": True, "deleting": {"$ne": True}},
+            projection={"email": 1, "username": 1}
+        )
+        messages = [
+            ([user["email"]], {"username": user["username"], "tasks": tasks_by_user[user["_id"]]})
+            async for user in users
+        ]
+        if messages:
+            await EmailOutboxService.enqueue_many("task_reminder", messages)
+
+        logger.info("Queued %d task reminders in %d emails", len(tasks), len(messages))
+        return len(tasks)
+
+
+async def run_reminder_scheduler() -> None:
+    """Sleep until the next reminder is due, then send every due reminder in batches."""
+    global _schedule
+    schedule = _schedule = ReminderSchedule()
+    # Reload halfway through each window, so the schedule always covers at least half a window ahead
+    reload_interval = timedelta(seconds=settings.TASK_REMINDER_WINDOW_SECONDS / 2)
+    next_load = datetime.utcnow()
+
+    try:
+        while True:
+            now = datetime.utcnow()
+            if now >= next_load:
+                try:
+                    await TaskReminderService.load_window(schedule, now)
+                    next_load = min(now + reload_interval, schedule.horizon)
+                except Exception:
+                    logger.exception("Loading task reminders failed")
+                    next_load = now + timedelta(seconds=60)
+
+            task_ids = schedule.pop_due(now, settings.TASK_REMINDER_BATCH_SIZE)
+            if task_ids:
+                try:
+                    await TaskReminderService.send_reminders(task_ids, now)
+                except Exception:
+                    # Unclaimed reminders are still unsent and come back with the next load
+                    logger.exception("Sending task reminders failed")
+                continue
+
+            wake_at = min(filter(None, (schedule.next_fire_at(), next_load)))
+            await schedule.wait((wake_at - datetime.utcnow()).total_seconds())
+    finally:
+        _schedule = None
+
+
+def task_reminder_stats() -> dict:
+    return {"running": _schedule is not None, **(_schedule.stats() if _schedule is not None else {})}
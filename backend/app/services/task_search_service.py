@@ -0,0 +1,133 @@
+from typing import List, Optional, Tuple
+from bson import ObjectId
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_tasks_collection, get_tasks_read_collection
+from app.core.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.core.search import InvertedIndex
+from app.core.serialization import TASK_PROJECTION
+from app.services.task_counter_service import TaskCounterService
+
+# Same weights as the text index on tasks
+SEARCH_WEIGHTS = {"title": 3, "description": 1}
+
+# Cursors remember which engine scored the results, since the two score differently
+ENGINE_TEXT_INDEX = "text"
+ENGINE_CACHE = "cache"
+
+# Searches per user within the TTL, to spot hot users
+_search_counts = TTLCache(maxsize=10000, ttl=settings.TASK_SEARCH_CACHE_TTL_SECONDS)
+# user_id -> (task version, InvertedIndex), or (version, None) when too large to cache
+_indexes = TTLCache(maxsize=max(settings.TASK_SEARCH_CACHE_USERS, 1), ttl=settings.TASK_SEARCH_CACHE_TTL_SECONDS)
+
+
+class TaskSearchService:
+    @staticmethod
+    async def search(
+        user_id: str,
+        query: str,
+        status: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Return a page of the user's tasks matching query, best match first, and the next cursor.
+
+        Served by the text index, or by an in-process inverted index for
+        users who search often (TASK_SEARCH_CACHE_USERS > 0). Each result
+        carries its relevance score.
+        """
+        after = None
+        engine = None
+        if cursor:
+            sort_value, last_id = decode_cursor(cursor)
+            if not (isinstance(sort_value, list) and len(sort_value) == 2 and sort_value[0] in (ENGINE_TEXT_INDEX, ENGINE_CACHE)):
+                raise ValueError("Invalid cursor")
+            engine, after = sort_value[0], (sort_value[1], last_id)
+
+        index = None
+        if engine != ENGINE_TEXT_INDEX and settings.TASK_SEARCH_CACHE_USERS > 0:
+            index = await TaskSearchService._cached_index(user_id, force=engine == ENGINE_CACHE)
+
+        if index is not None:
+            tasks = TaskSearchService._search_index(index, query, status, limit, after)
+            engine = ENGINE_CACHE
+        else:
+            tasks = await TaskSearchService._search_text_index(user_id, query, status, limit, after)
+            engine = ENGINE_TEXT_INDEX
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor([engine, tasks[-1]["score"]], tasks[-1]["_id"])
+        return tasks, next_cursor
+
+    @staticmethod
+    async def _search_text_index(
+        user_id: str, query: str, status: Optional[str], limit: int, after: Optional[Tuple[float, ObjectId]]
+    ) -> List[dict]:
+        tasks_collection = await get_tasks_read_collection()
+
+        match = {"user_id": ObjectId(user_id), "$text": {"$search": query}}
+        if status:
+            match["status"] = status
+
+        pipeline = [
+            {"$match": match},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        if after is not None:
+            pipeline.append({"$match": keyset_filter("score", after[0], after[1], descending=True)})
+        pipeline += [
+            {"$sort": {"score": -1, "_id": -1}},
+            {"$limit": limit + 1},
+            {"$project": {**TASK_PROJECTION, "score": 1}},
+        ]
+        return await tasks_collection.aggregate(pipeline, allowDiskUse=True).to_list(length=limit + 1)
+
+    @staticmethod
+    def _search_index(
+        index: InvertedIndex, query: str, status: Optional[str], limit: int, after: Optional[Tuple[float, ObjectId]]
+    ) -> List[dict]:
+        tasks = []
+        for score, task_id in index.search(query):
+            if after is not None and (score, task_id) >= after:
+                continue
+            task = index.documents[task_id]
+            if status and task["status"] != status:
+                continue
+            tasks.append({**task, "score": score})
+            if len(tasks) > limit:
+                break
+        return tasks
+
+    @staticmethod
+    async def _cached_index(user_id: str, force: bool = False) -> Optional[InvertedIndex]:
+        """The user's inverted index if they are hot (or force), rebuilt when their tasks change."""
+        searches = (_search_counts.get(user_id) or 0) + 1
+        _search_counts.set(user_id, searches)
+        if not force and searches < settings.TASK_SEARCH_CACHE_MIN_SEARCHES:
+            return None
+
+        version = await TaskCounterService.get_version(user_id)
+        if version is None:
+            return None
+
+        cached = _indexes.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        # Read after the version, so a concurrent write can only make the
+        # index look older than it is (and be rebuilt next time)
+        tasks_collection = await get_tasks_collection()
+        max_tasks = settings.TASK_SEARCH_CACHE_MAX_TASKS
+        tasks = await tasks_collection.find(
+            {"user_id": ObjectId(user_id)}, projection=TASK_PROJECTION
+        ).limit(max_tasks + 1).to_list(length=max_tasks + 1)
+
+        index = InvertedIndex(tasks, SEARCH_WEIGHTS) if len(tasks) <= max_tasks else None
+        _indexes.set(user_id, (version, index))
+        return index
+
+
+def search_cache_stats() -> dict:
+    return {"indexes": _indexes.stats(), "search_counts": _search_counts.stats()}
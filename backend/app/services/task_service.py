@@ -1,43 +1,215 @@
-from typing import List, Optional
+import asyncio
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple, Union
 from bson import ObjectId
-from app.core.database import get_tasks_collection
-from app.schemas.task import TaskCreate, TaskUpdate
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from pydantic import TypeAdapter, ValidationError
+from app.core.config import settings
+from app.core.database import get_tasks_collection, get_tasks_read_collection
+from app.core.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.core.ranking import rank_between
+from app.core.serialization import TASK_PROJECTION
+from app.core.task_files import ImportFileError, ImportRecord
+from app.schemas.task import TaskCreate, TaskImport, TaskUpdate, BulkTaskOperation
+from app.services.task_counter_service import TaskCounterService
+from app.services.task_rank_service import TaskRankService
+from app.services.task_event_service import publish_task_event
+from app.services.task_reminder_service import schedule_task_reminder, cancel_task_reminders
+from app.services.task_activity_service import CREATED, UPDATED, MOVED, DELETED, record_task_activity
 from app.models.task import TaskStatus
 from datetime import datetime
 
+# Newest first, with _id as tie-breaker so keyset pagination is stable
+TASK_LIST_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+# Kanban column order (fractional ranks; unranked legacy tasks sort first)
+TASK_RANK_SORT = [("rank", ASCENDING), ("_id", ASCENDING)]
+# Validates a whole batch of imported rows in one call
+TASK_IMPORT_ROWS = TypeAdapter(List[TaskImport])
+
 class TaskService:
     @staticmethod
-    async def create_task(user_id: str, task_data: TaskCreate) -> dict:
-        """Create a new task."""
-        tasks_collection = await get_tasks_collection()
-
-        task_dict = {
+    def _build_task_document(user_id: str, task_data: Union[TaskCreate, TaskImport]) -> dict:
+        """Build the document stored for a new task."""
+        now = datetime.utcnow()
+        return {
             "user_id": ObjectId(user_id),
             "title": task_data.title,
             "description": task_data.description,
             "status": task_data.status.value,
             "due_date": task_data.due_date,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": now,
+            "updated_at": now
+        }
+
+    @staticmethod
+    def _build_update(task_data: TaskUpdate) -> dict:
+        """Build the $set fields for a task update; empty if nothing was set.
+
+        An explicit null clears description or due_date, but a task always
+        has a title and a status, so a null for either counts as not set.
+        """
+        update_data = {
+            k: v for k, v in task_data.dict(exclude_unset=True).items()
+            if v is not None or k not in ("title", "status")
         }
 
+        if not update_data:
+            return update_data
+
+        # Convert status enum to string if present
+        if "status" in update_data and isinstance(update_data["status"], TaskStatus):
+            update_data["status"] = update_data["status"].value
+
+        update_data["updated_at"] = datetime.utcnow()
+        return update_data
+
+    @staticmethod
+    def _update_operators(update_data: dict) -> dict:
+        """Update document for _build_update fields; a new due date re-arms the reminder."""
+        update = {"$set": update_data}
+        if "due_date" in update_data:
+            update["$unset"] = {"reminder_sent_at": ""}
+        return update
+
+    @staticmethod
+    def _apply_update(previous: dict, update_data: dict) -> dict:
+        """The task as it is after _update_operators(update_data) was applied to previous."""
+        task = {**previous, **update_data}
+        if "due_date" in update_data:
+            task.pop("reminder_sent_at", None)
+        return task
+
+    @staticmethod
+    async def _top_rank(user_id: str, status: str) -> Optional[str]:
+        """Rank of the first ranked task in a column, if any."""
+        tasks_collection = await get_tasks_collection()
+        task = await tasks_collection.find_one(
+            {"user_id": ObjectId(user_id), "status": status, "rank": {"$type": "string"}},
+            projection={"_id": 0, "rank": 1},
+            sort=TASK_RANK_SORT
+        )
+        return task["rank"] if task else None
+
+    @staticmethod
+    async def _top_ranks(user_id: str, statuses: Set[str]) -> Dict[str, Optional[str]]:
+        """_top_rank of each of several columns, in one aggregate over the rank index."""
+        tasks_collection = await get_tasks_collection()
+        pipeline = [
+            {"$match": {"user_id": ObjectId(user_id), "status": {"$in": sorted(statuses)}, "rank": {"$type": "string"}}},
+            {"$sort": {"user_id": 1, "status": 1, "rank": 1, "_id": 1}},
+            {"$group": {"_id": "$status", "rank": {"$first": "$rank"}}},
+        ]
+        ranks = dict.fromkeys(statuses)
+        async for column in tasks_collection.aggregate(pipeline):
+            ranks[column["_id"]] = column["rank"]
+        return ranks
+
+    @staticmethod
+    def _update_pipeline(update_data: dict, rank: Optional[str] = None) -> list:
+        """Pipeline form of _update_operators that leaves an unchanged task as it was.
+
+        updated_at only moves if one of the fields actually changes, and the
+        reminder is only re-armed if the due date does. With a status, a
+        task whose status changes takes rank, the top of the new column; one
+        that stays in its column keeps its rank. Values are wrapped in
+        $literal so user text is never read as an expression.
+        """
+        fields = {field: value for field, value in update_data.items() if field != "updated_at"}
+
+        def differs(field: str) -> dict:
+            # Expressions in a $set stage see the document before the stage
+            return {"$ne": [f"${field}", {"$literal": fields[field]}]}
+
+        stage = {field: {"$literal": value} for field, value in fields.items()}
+        stage["updated_at"] = {"$cond": [{"$or": [differs(field) for field in fields]}, update_data["updated_at"], "$updated_at"]}
+        if "status" in fields:
+            stage["rank"] = {"$cond": [{"$eq": ["$status", fields["status"]]}, "$rank", rank]}
+        if "due_date" in fields:
+            stage["reminder_sent_at"] = {"$cond": [differs("due_date"), None, "$reminder_sent_at"]}
+        return [{"$set": stage}]
+
+    @staticmethod
+    async def create_task(user_id: str, task_data: TaskCreate) -> dict:
+        """Create a new task at the top of its column."""
+        tasks_collection = await get_tasks_collection()
+
+        task_dict = TaskService._build_task_document(user_id, task_data)
+        task_dict["rank"] = rank_between(None, await TaskService._top_rank(user_id, task_dict["status"]))
+
         result = await tasks_collection.insert_one(task_dict)
         task_dict["_id"] = result.inserted_id
 
+        await TaskCounterService.apply(user_id, {task_dict["status"]: 1}, task_dict["updated_at"])
+        if len(task_dict["rank"]) > settings.TASK_RANK_MAX_LENGTH:
+            TaskRankService.schedule_rebalance(user_id, task_dict["status"])
+        publish_task_event(user_id, "task.created", task=task_dict)
+        schedule_task_reminder(task_dict)
+        record_task_activity(user_id, task_dict["_id"], CREATED, task=task_dict)
+
         return task_dict
 
     @staticmethod
-    async def get_tasks(user_id: str, status: Optional[str] = None) -> List[dict]:
-        """Get all tasks for a user, optionally filtered by status."""
-        tasks_collection = await get_tasks_collection()
+    async def get_tasks_page(
+        user_id: str,
+        status: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "created",
+        session: Optional[AsyncIOMotorClientSession] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of tasks and the cursor for the next page (None on the last page).
+
+        order is "created" (newest first) or "rank" (Kanban column order,
+        which requires a status so the read is served by the rank index).
+        """
+        tasks_collection = await get_tasks_read_collection()
 
         query = {"user_id": ObjectId(user_id)}
 
         if status:
             query["status"] = status
 
-        tasks = await tasks_collection.find(query).sort("created_at", -1).to_list(length=None)
-        return tasks
+        if order == "rank":
+            if not status:
+                raise ValueError("Ordering by rank requires a status")
+            sort_field, sort = "rank", TASK_RANK_SORT
+        else:
+            sort_field, sort = "created_at", TASK_LIST_SORT
+
+        if cursor:
+            value, last_id = decode_cursor(cursor)
+            if sort_field == "rank" and value is None:
+                # Still inside the unranked tasks, which sort before all ranked ones
+                query["$or"] = [{"rank": None, "_id": {"$gt": last_id}}, {"rank": {"$type": "string"}}]
+            else:
+                query.update(keyset_filter(sort_field, value, last_id, descending=sort_field != "rank"))
+
+        # Fetch one extra document to find out whether another page exists
+        tasks = await tasks_collection.find(query, projection=TASK_PROJECTION, session=session).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(tasks) > limit:
+            tasks = tasks[:limit]
+            next_cursor = encode_cursor(tasks[-1].get(sort_field), tasks[-1]["_id"])
+
+        if sort_field == "rank" and any(task.get("rank") is None for task in tasks):
+            TaskRankService.schedule_rebalance(user_id, status)
+
+        return tasks, next_cursor
+
+    @staticmethod
+    async def stream_tasks(user_id: str, status: Optional[str] = None, batch_size: int = 500) -> AsyncIterator[dict]:
+        """Yield a user's tasks straight from the database cursor, one batch in memory at a time."""
+        tasks_collection = await get_tasks_read_collection()
+
+        query = {"user_id": ObjectId(user_id)}
+
+        if status:
+            query["status"] = status
+
+        async for task in tasks_collection.find(query, projection=TASK_PROJECTION).sort(TASK_LIST_SORT).batch_size(batch_size):
+            yield task
 
     @staticmethod
     async def get_task_by_id(task_id: str, user_id: str) -> Optional[dict]:
@@ -54,42 +226,375 @@ class TaskService:
         """Update a task."""
         tasks_collection = await get_tasks_collection()
 
-        # Check if task exists and belongs to user
-        existing_task = await TaskService.get_task_by_id(task_id, user_id)
-        if not existing_task:
+        update_data = TaskService._build_update(task_data)
+
+        if not update_data:
+            return await TaskService.get_task_by_id(task_id, user_id)
+
+        # Ownership check and update in a single round trip. The previous
+        # document is returned so status transitions can update counters;
+        # the update is applied locally to produce the updated task. A task
+        # that changes column goes to the top of it, as a new task would.
+        rank = None
+        if "status" in update_data:
+            rank = rank_between(None, await TaskService._top_rank(user_id, update_data["status"]))
+        previous = await tasks_collection.find_one_and_update(
+            {"_id": ObjectId(task_id), "user_id": ObjectId(user_id)},
+            TaskService._update_pipeline(update_data, rank),
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
             return None
 
-        update_data = {k: v for k, v in task_data.dict(exclude_unset=True).items()}
+        # Saving a task unchanged writes nothing, so there is nothing to
+        # record and the version (and with it every ETag) stays as it is
+        if all(field in previous and previous[field] == value for field, value in update_data.items() if field != "updated_at"):
+            return previous
 
-        if not update_data:
-            return existing_task
+        task = TaskService._apply_update(previous, update_data)
+        if task["status"] != previous["status"]:
+            task["rank"] = rank
+            if len(rank) > settings.TASK_RANK_MAX_LENGTH:
+                TaskRankService.schedule_rebalance(user_id, task["status"])
 
-        # Convert status enum to string if present
-        if "status" in update_data and isinstance(update_data["status"], TaskStatus):
-            update_data["status"] = update_data["status"].value
+        deltas = {}
+        if task["status"] != previous["status"]:
+            deltas = {previous["status"]: -1, task["status"]: 1}
+        await TaskCounterService.apply(user_id, deltas, update_data["updated_at"])
+        publish_task_event(user_id, "task.updated", task=task)
+        if "due_date" in update_data or "status" in update_data:
+            schedule_task_reminder(task)
+        record_task_activity(user_id, task_id, UPDATED, previous, task)
 
-        update_data["updated_at"] = datetime.utcnow()
+        return task
+
+    @staticmethod
+    async def move_task(
+        task_id: str,
+        user_id: str,
+        status: str,
+        prev_id: Optional[str] = None,
+        next_id: Optional[str] = None
+    ) -> Optional[dict]:
+        """Move a task into a column between two neighbours, updating only the moved task.
 
-        await tasks_collection.update_one(
+        Raises ValueError if a neighbour is not in the target column.
+        """
+        tasks_collection = await get_tasks_collection()
+        neighbour_ids = [neighbour_id for neighbour_id in (prev_id, next_id) if neighbour_id]
+
+        if task_id in neighbour_ids:
+            raise ValueError("A task cannot be its own neighbour")
+
+        ranks = {}
+        if neighbour_ids:
+            cursor = tasks_collection.find(
+                {"_id": {"$in": [ObjectId(neighbour_id) for neighbour_id in neighbour_ids]},
+                 "user_id": ObjectId(user_id), "status": status},
+                projection={"rank": 1}
+            )
+            ranks = {str(task["_id"]): task.get("rank") async for task in cursor}
+            if len(ranks) != len(neighbour_ids):
+                raise ValueError("Neighbour task not found in target column")
+
+        lower, upper = ranks.get(prev_id), ranks.get(next_id)
+        # Unranked neighbours or out-of-order ranks (stale client, concurrent
+        # moves) still get a valid rank; the column is then rebalanced
+        needs_rebalance = any(rank is None for rank in ranks.values())
+        try:
+            rank = rank_between(lower, upper)
+        except ValueError:
+            rank = rank_between(lower, None)
+            needs_rebalance = True
+
+        update_data = {"status": status, "rank": rank, "updated_at": datetime.utcnow()}
+        previous = await tasks_collection.find_one_and_update(
             {"_id": ObjectId(task_id), "user_id": ObjectId(user_id)},
-            {"$set": update_data}
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
         )
+        if previous is None:
+            return None
+
+        task = {**previous, **update_data}
+
+        deltas = {}
+        if task["status"] != previous["status"]:
+            deltas = {previous["status"]: -1, task["status"]: 1}
+        await TaskCounterService.apply(user_id, deltas, update_data["updated_at"])
+
+        if needs_rebalance or len(rank) > settings.TASK_RANK_MAX_LENGTH:
+            TaskRankService.schedule_rebalance(user_id, status)
+        publish_task_event(user_id, "task.updated", task=task)
+        if task["status"] != previous["status"]:
+            schedule_task_reminder(task)
+        record_task_activity(user_id, task_id, MOVED, previous, task)
+
+        return task
+
+    @staticmethod
+    async def bulk_write(user_id: str, operations: List[BulkTaskOperation]) -> List[dict]:
+        """Apply a batch of create/update/move/delete operations for a user.
+
+        Referenced tasks are checked for ownership with a single query, then
+        all valid operations run as one unordered bulk_write. Returns one
+        result per operation, in request order.
+        """
+        tasks_collection = await get_tasks_collection()
+        owner_id = ObjectId(user_id)
+
+        results = [
+            {"index": i, "op": op.op, "ok": False, "task_id": getattr(op, "task_id", None), "error": None}
+            for i, op in enumerate(operations)
+        ]
+
+        # Unordered writes give no ordering guarantee, so a task may only be
+        # touched by one operation per batch
+        referenced = set()
+        for result, op in zip(results, operations):
+            if op.op == "create":
+                continue
+            if not ObjectId.is_valid(op.task_id):
+                result["error"] = "Invalid task id"
+            elif op.task_id in referenced:
+                result["error"] = "Task is referenced by more than one operation"
+            else:
+                referenced.add(op.task_id)
+
+        # Tracked fields and reminder state of every referenced task the user owns
+        owned = {}
+        if referenced:
+            cursor = tasks_collection.find(
+                {"_id": {"$in": [ObjectId(task_id) for task_id in referenced]}, "user_id": owner_id},
+                projection={"_id": 1, "title": 1, "description": 1, "status": 1, "due_date": 1, "reminder_sent_at": 1}
+            )
+            owned = {str(task["_id"]): task async for task in cursor}
+
+        # New tasks and tasks changing column stack on top of it, later
+        # operations above earlier ones
+        entering = set()
+        for result, op in zip(results, operations):
+            if op.op == "create":
+                entering.add(op.task.status.value)
+            elif not result["error"] and op.task_id in owned and op.op != "delete":
+                status = op.status.value if op.op == "move" else getattr(op.changes.status, "value", None)
+                if status is not None and status != owned[op.task_id]["status"]:
+                    entering.add(status)
+        top_ranks = await TaskService._top_ranks(user_id, entering) if entering else {}
+
+        requests = []
+        request_positions = []
+        # Counter deltas and new status of each queued operation, by position
+        transitions = {}
+        # Reminder state after each queued operation (None once deleted), by position
+        reminders = {}
+        # (action, previous, task) of each queued operation for the activity log, by position
+        activity = {}
+        now = datetime.utcnow()
+
+        for position, (result, op) in enumerate(zip(results, operations)):
+            if result["error"]:
+                continue
 
-        return await TaskService.get_task_by_id(task_id, user_id)
+            if op.op == "create":
+                task_dict = TaskService._build_task_document(user_id, op.task)
+                task_dict["_id"] = ObjectId()
+                task_dict["rank"] = top_ranks[task_dict["status"]] = rank_between(None, top_ranks[task_dict["status"]])
+                result["task_id"] = str(task_dict["_id"])
+                requests.append(InsertOne(task_dict))
+                request_positions.append(position)
+                transitions[position] = {task_dict["status"]: 1}
+                reminders[position] = task_dict
+                activity[position] = (CREATED, None, task_dict)
+                continue
+
+            if op.task_id not in owned:
+                result["error"] = "Task not found"
+                continue
+
+            task_filter = {"_id": ObjectId(op.task_id), "user_id": owner_id}
+            previous_status = owned[op.task_id]["status"]
+            if op.op == "delete":
+                requests.append(DeleteOne(task_filter))
+                transitions[position] = {previous_status: -1}
+                reminders[position] = None
+                activity[position] = (DELETED, None, None)
+            else:
+                if op.op == "move":
+                    update_data = {"status": op.status.value, "updated_at": now}
+                else:
+                    update_data = TaskService._build_update(op.changes)
+                    if not update_data:
+                        continue
+                new_status = update_data.get("status", previous_status)
+                if new_status != previous_status:
+                    update_data["rank"] = top_ranks[new_status] = rank_between(None, top_ranks[new_status])
+                requests.append(UpdateOne(task_filter, TaskService._update_operators(update_data)))
+                transitions[position] = {previous_status: -1, new_status: 1} if new_status != previous_status else {}
+                task = TaskService._apply_update(owned[op.task_id], update_data)
+                if "due_date" in update_data or new_status != previous_status:
+                    reminders[position] = task
+                activity[position] = (MOVED if op.op == "move" else UPDATED, owned[op.task_id], task)
+            request_positions.append(position)
+
+        if requests:
+            try:
+                await tasks_collection.bulk_write(requests, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    results[request_positions[error["index"]]]["error"] = error.get("errmsg", "Write failed")
+
+        for result in results:
+            result["ok"] = result["error"] is None
+
+        deltas = {}
+        changed = touched = False
+        for position, transition in transitions.items():
+            if not results[position]["ok"]:
+                continue
+            changed = True
+            touched = touched or results[position]["op"] != "delete"
+            for task_status, delta in transition.items():
+                deltas[task_status] = deltas.get(task_status, 0) + delta
+        if changed:
+            await TaskCounterService.apply(user_id, deltas, now if touched else None)
+            publish_task_event(user_id, "tasks.changed")
+        for status, rank in top_ranks.items():
+            if rank is not None and len(rank) > settings.TASK_RANK_MAX_LENGTH:
+                TaskRankService.schedule_rebalance(user_id, status)
+
+        for position, task in reminders.items():
+            if not results[position]["ok"]:
+                continue
+            if task is None:
+                cancel_task_reminders([results[position]["task_id"]])
+            else:
+                schedule_task_reminder(task)
+        for position, (action, previous, task) in activity.items():
+            if results[position]["ok"]:
+                record_task_activity(user_id, results[position]["task_id"], action, previous, task)
+
+        return results
+
+    @staticmethod
+    async def import_tasks(user_id: str, records: AsyncIterator[ImportRecord]) -> dict:
+        """Create tasks from parsed import rows, a batch at a time, as the upload is read.
+
+        Each batch is validated in one pass and written with an unordered
+        insert_many. Imported tasks are left unranked, so they land at the
+        top of their columns, and the touched columns are then rebalanced
+        once. Returns the number imported and a per-row error report.
+        """
+        tasks_collection = await get_tasks_collection()
+        report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+        columns: Set[str] = set()
+
+        def fail(row: int, error: str) -> None:
+            report["failed"] += 1
+            if len(report["errors"]) < settings.TASK_IMPORT_MAX_ERRORS:
+                report["errors"].append({"row": row, "error": error})
+            else:
+                report["errors_truncated"] = True
+
+        async def flush(batch: List[Tuple[int, dict]]) -> None:
+            rows = TaskService._validate_import_rows(batch, fail)
+            if not rows:
+                return
+
+            documents = [TaskService._build_task_document(user_id, task) for _, task in rows]
+            inserted = [True] * len(documents)
+            try:
+                await tasks_collection.insert_many(documents, ordered=False)
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    inserted[error["index"]] = False
+                    fail(rows[error["index"]][0], error.get("errmsg", "Write failed"))
+
+            deltas: Dict[str, int] = {}
+            for document, ok in zip(documents, inserted):
+                if ok:
+                    deltas[document["status"]] = deltas.get(document["status"], 0) + 1
+                    schedule_task_reminder(document)
+                    record_task_activity(user_id, document["_id"], CREATED, task=document)
+            if deltas:
+                report["imported"] += sum(deltas.values())
+                columns.update(deltas)
+                await TaskCounterService.apply(user_id, deltas, documents[0]["updated_at"])
+
+        batch: List[Tuple[int, dict]] = []
+        row = 0
+        try:
+            async for row, record in records:
+                if report["imported"] + report["failed"] + len(batch) >= settings.TASK_IMPORT_MAX_ROWS:
+                    fail(row, f"Imports are limited to {settings.TASK_IMPORT_MAX_ROWS} rows; the rest of the file was skipped")
+                    break
+                if isinstance(record, str):
+                    fail(row, record)
+                    continue
+                batch.append((row, record))
+                if len(batch) >= settings.TASK_IMPORT_BATCH_SIZE:
+                    await flush(batch)
+                    batch = []
+        except ImportFileError as e:
+            fail(row + 1, str(e))
+        await flush(batch)
+        # Parse errors are reported as they are read, validation errors per batch
+        report["errors"].sort(key=lambda error: error["row"])
+
+        for column in columns:
+            TaskRankService.schedule_rebalance(user_id, column)
+        if columns:
+            publish_task_event(user_id, "tasks.changed")
+
+        return report
+
+    @staticmethod
+    def _validate_import_rows(batch: List[Tuple[int, dict]], fail: Callable[[int, str], None]) -> List[Tuple[int, TaskImport]]:
+        """Validate a batch of (row, fields); invalid rows are passed to fail and dropped."""
+        if not batch:
+            return []
+        try:
+            tasks = TASK_IMPORT_ROWS.validate_python([fields for _, fields in batch])
+        except ValidationError as e:
+            invalid = {}
+            for error in e.errors():
+                field = ".".join(str(part) for part in error["loc"][1:])
+                invalid.setdefault(error["loc"][0], f"{field}: {error['msg']}" if field else error["msg"])
+            for position, message in sorted(invalid.items()):
+                fail(batch[position][0], message)
+
+            batch = [entry for position, entry in enumerate(batch) if position not in invalid]
+            tasks = TASK_IMPORT_ROWS.validate_python([fields for _, fields in batch])
+        return [(row, task) for (row, _), task in zip(batch, tasks)]
 
     @staticmethod
     async def delete_task(task_id: str, user_id: str) -> bool:
         """Delete a task."""
         tasks_collection = await get_tasks_collection()
-        result = await tasks_collection.delete_one({
-            "_id": ObjectId(task_id),
-            "user_id": ObjectId(user_id)
-        })
-        return result.deleted_count > 0
+        task = await tasks_collection.find_one_and_delete(
+            {"_id": ObjectId(task_id), "user_id": ObjectId(user_id)},
+            projection={"status": 1}
+        )
+        if task is None:
+            return False
+
+        await TaskCounterService.apply(user_id, {task["status"]: -1})
+        publish_task_event(user_id, "task.deleted", task_id=task_id)
+        cancel_task_reminders([task_id])
+        record_task_activity(user_id, task_id, DELETED)
+        return True
 
     @staticmethod
-    async def delete_all_user_tasks(user_id: str) -> int:
-        """Delete all tasks for a user (called when user is deleted)."""
+    async def delete_user_tasks_batch(user_id: str, batch_size: int) -> int:
+        """Delete up to batch_size of a user's tasks (account deletion). Returns the number deleted."""
         tasks_collection = await get_tasks_collection()
-        result = await tasks_collection.delete_many({"user_id": ObjectId(user_id)})
+        owner_id = ObjectId(user_id)
+
+        cursor = tasks_collection.find({"user_id": owner_id}, projection={"_id": 1}).limit(batch_size)
+        task_ids = [task["_id"] async for task in cursor]
+        if not task_ids:
+            return 0
+
+        result = await tasks_collection.delete_many({"_id": {"$in": task_ids}, "user_id": owner_id})
+        cancel_task_reminders(task_ids)
         return result.deleted_count
\ No newline at end of file
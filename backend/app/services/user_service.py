@@ -1,33 +1,54 @@
+import logging
+import time
 from typing import Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_users_collection
-from app.core.security import get_password_hash, verify_password, create_verification_token, verify_verification_token
-from app.core.email import send_verification_email
+from app.core.security import get_password_hash_async, verify_password_async, verify_verification_token
+from app.services.email_outbox_service import EmailOutboxService
 from app.schemas.user import UserCreate, UserUpdate
 from app.models.user import UserInDB
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# Users resolved by get_current_user, keyed by user id string, as
+# [user, last checked]. Entries are invalidated explicitly on update/delete;
+# writes made by other worker processes are caught by get_principal's
+# version check every PRINCIPAL_CACHE_REVALIDATE_SECONDS.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def _duplicate_key_error(error: DuplicateKeyError) -> ValueError:
+    """Translate a unique-index violation on users into the service's ValueError."""
+    details = error.details or {}
+    fields = set(details.get("keyPattern") or details.get("keyValue") or {})
+    if not fields:
+        # Older servers only report the index name in the message
+        fields = {"email"} if "index: email" in str(error) else {"username"}
+
+    if "email" in fields:
+        return ValueError("Email already registered")
+    return ValueError("Username already taken")
+
 class UserService:
     @staticmethod
     async def create_user(user_data: UserCreate, send_email: bool = True) -> dict:
-        """Create a new user and send verification email."""
+        """Create a new user and queue their verification email."""
         users_collection = await get_users_collection()
 
-        # Check if email already exists
-        existing_user = await users_collection.find_one({"email": user_data.email})
-        if existing_user:
-            raise ValueError("Email already registered")
-
-        # Check if username already exists
-        existing_username = await users_collection.find_one({"username": user_data.username})
-        if existing_username:
-            raise ValueError("Username already taken")
+        hashed_password = await get_password_hash_async(user_data.password)
 
         # Create user document
         user_dict = {
             "email": user_data.email,
             "username": user_data.username,
-            "hashed_password": get_password_hash(user_data.password),
+            "hashed_password": hashed_password,
             "full_name": user_data.full_name,
             "is_active": True,
             "is_verified": False,
@@ -35,21 +56,24 @@ class UserService:
             "updated_at": datetime.utcnow()
         }
 
-        result = await users_collection.insert_one(user_dict)
+        # Uniqueness of email and username is enforced by their unique indexes
+        try:
+            result = await users_collection.insert_one(user_dict)
+        except DuplicateKeyError as e:
+            raise _duplicate_key_error(e) from e
         user_dict["_id"] = result.inserted_id
 
-        # Send verification email
+        # Queue verification email; the outbox dispatcher delivers it
         if send_email:
             try:
-                verification_token = create_verification_token(user_data.email)
-                await send_verification_email(
+                await EmailOutboxService.enqueue(
+                    "verification",
                     [user_data.email],
-                    user_data.username,
-                    verification_token
+                    {"email": user_data.email, "username": user_data.username}
                 )
-            except Exception as e:
+            except Exception:
                 # Log error but don't fail registration
-                print(f"Failed to send verification email: {str(e)}")
+                logger.exception("Failed to queue verification email")
 
         return user_dict
 
@@ -61,31 +85,35 @@ class UserService:
             return False
 
         users_collection = await get_users_collection()
-        result = await users_collection.update_one(
-            {"email": email},
-            {"$set": {"is_verified": True, "updated_at": datetime.utcnow()}}
+        user = await users_collection.find_one_and_update(
+            {"email": email, "is_verified": {"$ne": True}},
+            {"$set": {"is_verified": True, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            projection={"_id": 1}
         )
 
-        return result.modified_count > 0
+        if not user:
+            return False
+
+        principal_cache.invalidate(str(user["_id"]))
+        return True
 
     @staticmethod
     async def resend_verification_email(email: str) -> bool:
-        """Resend verification email to user."""
+        """Queue a new verification email for the user."""
         users_collection = await get_users_collection()
         user = await users_collection.find_one({"email": email})
 
-        if not user:
+        if not user or user.get("deleting"):
             raise ValueError("User not found")
 
         if user.get("is_verified", False):
             raise ValueError("Email already verified")
 
-        # Send new verification email
-        verification_token = create_verification_token(email)
-        await send_verification_email(
+        # Queue new verification email
+        await EmailOutboxService.enqueue(
+            "verification",
             [email],
-            user["username"],
-            verification_token
+            {"email": email, "username": user["username"]}
         )
 
         return True
@@ -96,10 +124,11 @@ class UserService:
         users_collection = await get_users_collection()
         user = await users_collection.find_one({"email": email})
 
-        if not user:
+        # Accounts being deleted cannot log in; checked first to skip the hash
+        if not user or user.get("deleting"):
             return None
 
-        if not verify_password(password, user["hashed_password"]):
+        if not await verify_password_async(password, user["hashed_password"]):
             return None
 
         return user
@@ -111,6 +140,42 @@ class UserService:
         user = await users_collection.find_one({"_id": ObjectId(user_id)})
         return user
 
+    @staticmethod
+    async def get_principal(user_id: str) -> Optional[dict]:
+        """Get user by ID for request authentication, served from principal_cache when possible.
+
+        A cached user older than PRINCIPAL_CACHE_REVALIDATE_SECONDS is kept
+        only if a projected read of its version (every write bumps it,
+        including mark_deleting) still matches; otherwise it is reloaded.
+        """
+        entry = principal_cache.get(user_id)
+        if entry is not None and time.monotonic() - entry[1] >= settings.PRINCIPAL_CACHE_REVALIDATE_SECONDS:
+            users_collection = await get_users_collection()
+            current = await users_collection.find_one(
+                {"_id": ObjectId(user_id)},
+                projection={"_id": 0, "version": 1, "deleting": 1}
+            )
+            if (
+                current is not None
+                and current.get("version") == entry[0].get("version")
+                and current.get("deleting") == entry[0].get("deleting")
+            ):
+                entry[1] = time.monotonic()
+            else:
+                entry = None
+
+        if entry is None:
+            user = await UserService.get_user_by_id(user_id)
+            if user is None:
+                principal_cache.invalidate(user_id)
+                return None
+            entry = [user, time.monotonic()]
+            principal_cache.set(user_id, entry)
+        user = entry[0]
+
+        # Callers mutate the returned document, so never hand out the cached one
+        return dict(user)
+
     @staticmethod
     async def get_user_by_email(email: str) -> Optional[dict]:
         """Get user by email."""
@@ -128,27 +193,40 @@ class UserService:
         if not update_data:
             return await UserService.get_user_by_id(user_id)
 
-        # Check if username is being updated and if it's already taken
-        if "username" in update_data:
-            existing_username = await users_collection.find_one({
-                "username": update_data["username"],
-                "_id": {"$ne": ObjectId(user_id)}
-            })
-            if existing_username:
-                raise ValueError("Username already taken")
-
         update_data["updated_at"] = datetime.utcnow()
 
-        await users_collection.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_data}
-        )
+        # A taken username surfaces as a DuplicateKeyError from the unique index
+        try:
+            user = await users_collection.find_one_and_update(
+                {"_id": ObjectId(user_id)},
+                {"$set": update_data, "$inc": {"version": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError as e:
+            raise _duplicate_key_error(e) from e
+        if user is None:
+            principal_cache.invalidate(user_id)
+        else:
+            # The updated document is current, so the next request needs no read
+            principal_cache.set(user_id, [dict(user), time.monotonic()])
+
+        return user
 
-        return await UserService.get_user_by_id(user_id)
+    @staticmethod
+    async def mark_deleting(user_id: str, job_id: str) -> bool:
+        """Flag a user as being deleted, which rejects their tokens and logins at once."""
+        users_collection = await get_users_collection()
+        result = await users_collection.update_one(
+            {"_id": ObjectId(user_id), "deleting": {"$ne": True}},
+            {"$set": {"deleting": True, "deletion_job_id": job_id, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}}
+        )
+        principal_cache.invalidate(user_id)
+        return result.modified_count > 0
 
     @staticmethod
     async def delete_user(user_id: str) -> bool:
         """Delete a user."""
         users_collection = await get_users_collection()
         result = await users_collection.delete_one({"_id": ObjectId(user_id)})
+        principal_cache.invalidate(user_id)
         return result.deleted_count > 0
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""Registration latency and outbox delivery against a local SMTP stand-in.
+
+Registers users through the real FastAPI app (MongoDB at DATABASE_URL,
+scratch database dropped afterwards), then drains the outbox with the
+dispatcher into a minimal in-process SMTP server. One address is refused
+by the server to exercise dead-lettering. Run from the backend directory:
+    python -m benchmarks.email_outbox [users]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import httpx
+from fastapi_mail import ConnectionConfig
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core import database
+from app.core.config import settings
+from app.core.email import PooledMailer
+from app.core.indexes import ensure_indexes
+from app.main import app
+from app.services.email_outbox_service import EmailOutboxService, dispatch_batch
+
+REFUSED_RECIPIENT = "bounce@example.com"
+
+
+class SMTPStandIn:
+    """Just enough SMTP (EHLO, AUTH, MAIL, RCPT, DATA) to accept messages."""
+
+    def __init__(self, refused=()):
+        self.refused = set(refused)
+        self.connections = 0
+        self.messages = []
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 stand-in ready")
+        try:
+            while line := await reader.readline():
+                command = line.decode().strip()
+                verb = command.split(" ", 1)[0].upper()
+                if verb == "EHLO":
+                    await reply("250-stand-in\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME")
+                elif verb == "AUTH":
+                    await reply("235 authenticated")
+                elif verb == "RCPT" and any(address in command for address in self.refused):
+                    await reply("550 mailbox unavailable")
+                elif verb == "DATA":
+                    await reply("354 end with <CRLF>.<CRLF>")
+                    body = []
+                    while (data := await reader.readline()) != b".\r\n":
+                        body.append(data)
+                    self.messages.append(b"".join(body))
+                    await reply("250 queued")
+                elif verb == "QUIT":
+                    await reply("221 bye")
+                    break
+                else:  # HELO, MAIL, RCPT, RSET, NOOP
+                    await reply("250 ok")
+        finally:
+            writer.close()
+
+
+async def main(users: int = 200) -> int:
+    database_name = f"{settings.DATABASE_NAME}_email_outbox"
+    database.db.client = AsyncIOMotorClient(settings.DATABASE_URL)
+    settings.DATABASE_NAME = database_name
+
+    smtp = SMTPStandIn(refused=[REFUSED_RECIPIENT])
+    port = await smtp.start()
+    mailer = PooledMailer(ConnectionConfig(
+        MAIL_USERNAME="stand-in", MAIL_PASSWORD="stand-in", MAIL_FROM=settings.MAIL_FROM,
+        MAIL_PORT=port, MAIL_SERVER="127.0.0.1", MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+        MAIL_STARTTLS=False, MAIL_SSL_TLS=False, USE_CREDENTIALS=True, VALIDATE_CERTS=False
+    ))
+
+    try:
+        await ensure_indexes(database.db.client[database_name])
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://email-outbox")
+
+        emails = [f"user{i}@example.com" for i in range(users - 1)] + [REFUSED_RECIPIENT]
+        latencies = []
+        for i, email in enumerate(emails):
+            start = time.perf_counter()
+            response = await client.post("/api/auth/register", json={
+                "email": email, "username": f"user{i}", "password": "Outbox123!", "full_name": f"User {i}"
+            })
+            latencies.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+
+        start = time.perf_counter()
+        while await dispatch_batch(mailer):
+            pass
+        drain_seconds = time.perf_counter() - start
+        await mailer.close()
+
+        stats = await EmailOutboxService.get_stats()
+    finally:
+        await smtp.stop()
+        await database.db.client.drop_database(database_name)
+        database.db.client.close()
+
+    print(f"registrations:      {users}")
+    print(f"register p50 / max: {statistics.median(latencies):.1f} / {max(latencies):.1f} ms (includes bcrypt)")
+    print(f"drained in:         {drain_seconds:.2f} s ({len(smtp.messages) / drain_seconds:.0f} messages/s)")
+    print(f"SMTP connections:   {smtp.connections}")
+    print(f"delivered:          {len(smtp.messages)}")
+    print(f"outbox:             {stats}")
+
+    expected = {"pending": 0, "sent": users - 1, "dead": 1}
+    return 0 if stats == expected and smtp.connections == 1 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)))
@@ -0,0 +1,323 @@
+"""Throughput and latency of the main endpoints under concurrent load.
+
+Drives the real FastAPI app in-process through an ASGI client, against
+either the MongoDB server at DATABASE_URL (a scratch database, dropped
+afterwards) or, with --backend memory, an in-process Motor-compatible
+stand-in (mongomock-motor, not a project dependency). The stand-in has
+no network round trips or server-side work, so its numbers measure the
+app's own overhead and are only comparable with other stand-in runs.
+
+Users and their tasks are seeded directly; each endpoint is then run
+on its own for a fixed number of requests with --concurrency requests
+in flight, spread over the users. Results (throughput and p50/p95/p99
+latency per endpoint, plus the commit and configuration) are written
+as JSON; --compare reports the change against an earlier result file
+and fails when p95 latency or throughput regressed past --threshold.
+Auth rate limits are turned off for the run. Run from the backend
+directory:
+    python -m benchmarks.load [--backend memory] [--users 20] [--tasks-per-user 200]
+    python -m benchmarks.load --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# The per-IP login limit would turn most of the login phase into 429s
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core import database
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.security import create_access_token, get_password_hash
+from app.main import app
+from app.services.task_counter_service import TaskCounterService
+
+PASSWORD = "LoadTest1!"
+STATUSES = ["pending", "in-progress", "completed"]
+ENDPOINTS = ["login", "list", "create", "update", "delete", "profile", "profile update"]
+
+# A request is made by calling this with a user and a random source
+Request = Callable[[dict, random.Random], Awaitable[httpx.Response]]
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput_rps": round((len(latencies) - errors) / seconds, 1) if seconds else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+async def run_phase(users: List[dict], requests: int, concurrency: int, request: Request, seed: int) -> dict:
+    """Make `requests` requests with `concurrency` in flight and summarize their latencies."""
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker(number: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed * 1000 + number)
+        for position in remaining:
+            user = users[position % len(users)]
+            start = time.perf_counter()
+            response = await request(user, rng)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.is_error:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(number) for number in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def seed(db, users: int, tasks_per_user: int) -> List[dict]:
+    """Insert verified users with tasks; returns each user's email, auth headers and task ids."""
+    hashed_password = get_password_hash(PASSWORD)
+    rng = random.Random(42)
+    seeded = []
+    for number in range(users):
+        now = datetime.utcnow()
+        result = await db.users.insert_one({
+            "email": f"load{number}@example.com",
+            "username": f"load{number}",
+            "hashed_password": hashed_password,
+            "full_name": f"Load User {number}",
+            "is_active": True,
+            "is_verified": True,
+            "created_at": now,
+            "updated_at": now,
+        })
+        user_id = result.inserted_id
+        task_ids = []
+        if tasks_per_user:
+            inserted = await db.tasks.insert_many([{
+                "user_id": user_id,
+                "title": f"Seeded task {position}",
+                "description": "Seeded by the load benchmark",
+                "status": rng.choice(STATUSES),
+                "due_date": None,
+                "created_at": now,
+                "updated_at": now,
+            } for position in range(tasks_per_user)])
+            task_ids = [str(task_id) for task_id in inserted.inserted_ids]
+        await TaskCounterService.reconcile_user(str(user_id))
+
+        token = create_access_token({"sub": str(user_id), "email": f"load{number}@example.com"})
+        seeded.append({
+            "email": f"load{number}@example.com",
+            "headers": {"Authorization": f"Bearer {token}"},
+            "task_ids": task_ids,
+            "created_ids": [],
+        })
+    return seeded
+
+
+async def run(args: argparse.Namespace) -> Dict[str, dict]:
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=None)
+
+    async def login(user: dict, rng: random.Random) -> httpx.Response:
+        return await client.post("/api/auth/login", json={"email": user["email"], "password": PASSWORD})
+
+    async def list_tasks(user: dict, rng: random.Random) -> httpx.Response:
+        params = {"status": rng.choice(STATUSES)} if rng.random() < 0.5 else {}
+        return await client.get("/api/tasks/", headers=user["headers"], params=params)
+
+    async def create(user: dict, rng: random.Random) -> httpx.Response:
+        response = await client.post("/api/tasks/", headers=user["headers"], json={
+            "title": f"Load task {rng.random():.6f}", "status": rng.choice(STATUSES)
+        })
+        if response.status_code == 201:
+            user["created_ids"].append(response.json()["_id"])
+        return response
+
+    async def update(user: dict, rng: random.Random) -> httpx.Response:
+        task_id = rng.choice(user["task_ids"] or user["created_ids"])
+        return await client.put(f"/api/tasks/{task_id}", headers=user["headers"], json={
+            "status": rng.choice(STATUSES), "description": f"Updated {rng.random():.6f}"
+        })
+
+    async def delete(user: dict, rng: random.Random) -> httpx.Response:
+        return await client.delete(f"/api/tasks/{user['created_ids'].pop()}", headers=user["headers"])
+
+    async def profile(user: dict, rng: random.Random) -> httpx.Response:
+        return await client.get("/api/users/me", headers=user["headers"])
+
+    async def profile_update(user: dict, rng: random.Random) -> httpx.Response:
+        return await client.put("/api/users/me", headers=user["headers"], json={"full_name": f"Load {rng.random():.6f}"})
+
+    phases: Dict[str, Request] = {
+        "login": login,
+        "list": list_tasks,
+        "create": create,
+        "update": update,
+        "delete": delete,
+        "profile": profile,
+        "profile update": profile_update,
+    }
+
+    db = database.db.client[settings.DATABASE_NAME]
+    if args.backend == "mongo":
+        await ensure_indexes(db)
+    users = await seed(db, args.users, args.tasks_per_user)
+
+    results = {}
+    try:
+        for number, name in enumerate(ENDPOINTS):
+            if name not in args.endpoints:
+                continue
+            requests = args.login_requests if name == "login" else args.requests
+            if name == "delete":
+                # Only tasks made by the create phase are deleted, each by its own request
+                owners = [
+                    {"headers": user["headers"], "created_ids": [task_id]}
+                    for user in users for task_id in user["created_ids"]
+                ]
+                if owners:
+                    requests = min(requests, len(owners))
+                    results[name] = await run_phase(owners, requests, args.concurrency, phases[name], number)
+                    print(f"{name:15} done", file=sys.stderr)
+                continue
+            if name == "update" and not any(user["task_ids"] or user["created_ids"] for user in users):
+                continue
+            await run_phase(users, min(requests, args.warmup), args.concurrency, phases[name], number)
+            results[name] = await run_phase(users, requests, args.concurrency, phases[name], number)
+            print(f"{name:15} done", file=sys.stderr)
+    finally:
+        await client.aclose()
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("-dirty" if dirty.strip() else "")
+
+
+def compare(baseline: dict, results: Dict[str, dict], threshold: float) -> bool:
+    """Print the change per endpoint; True if any endpoint regressed past the threshold."""
+    regressed = False
+    print(f"\ncompared with {baseline.get('commit') or 'unknown commit'}")
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        p95_change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"] * 100 if previous["p95_ms"] else 0.0
+        rps_change = (
+            (current["throughput_rps"] - previous["throughput_rps"]) / previous["throughput_rps"] * 100
+            if previous["throughput_rps"] else 0.0
+        )
+        worse = p95_change > threshold or -rps_change > threshold
+        regressed = regressed or worse
+        print(f"{name:15} p95 {p95_change:+7.1f}%   throughput {rps_change:+7.1f}%   {'REGRESSED' if worse else 'ok'}")
+    return regressed
+
+
+async def main(args: argparse.Namespace) -> int:
+    if args.backend == "memory":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            print("--backend memory needs mongomock-motor: pip install mongomock-motor", file=sys.stderr)
+            return 2
+        database.db.client = AsyncMongoMockClient()
+        # The stand-in has no read preferences; reads go to the one "server"
+        settings.DB_READ_PREFERENCE = "primary"
+    else:
+        database.db.client = AsyncIOMotorClient(settings.DATABASE_URL)
+    database_name = f"{settings.DATABASE_NAME}_load"
+    settings.DATABASE_NAME = database_name
+
+    try:
+        results = await run(args)
+    finally:
+        await database.db.client.drop_database(database_name)
+        database.db.client.close()
+
+    report = {
+        "commit": git_commit(),
+        "recorded_at": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "config": {
+            "backend": args.backend,
+            "users": args.users,
+            "tasks_per_user": args.tasks_per_user,
+            "requests": args.requests,
+            "login_requests": args.login_requests,
+            "concurrency": args.concurrency,
+            "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+    print(f"backend: {args.backend}   users: {args.users}   tasks/user: {args.tasks_per_user}   concurrency: {args.concurrency}")
+    for name, result in results.items():
+        print(
+            f"{name:15} {result['throughput_rps']:9.1f} req/s   p50 {result['p50_ms']:8.2f} ms   "
+            f"p95 {result['p95_ms']:8.2f} ms   p99 {result['p99_ms']:8.2f} ms   errors {result['errors']}"
+        )
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("config", {}).get("backend") != args.backend:
+            print("warning: the baseline was recorded with a different backend", file=sys.stderr)
+        if compare(baseline, results, args.threshold):
+            return 1
+    return 0
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="Endpoint throughput and latency under load.")
+    parser.add_argument("--backend", choices=["mongo", "memory"], default="mongo",
+                        help="MongoDB at DATABASE_URL, or the in-process stand-in")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per endpoint")
+    parser.add_argument("--login-requests", type=int, default=100, help="logins are bounded by bcrypt, so fewer")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests before each endpoint")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS, metavar="ENDPOINT",
+                        help=f"subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--output", default="load-results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="percent change in p95 or throughput that counts as a regression")
+    args = parser.parse_args(argv)
+    if args.users < 1 or args.concurrency < 1:
+        parser.error("--users and --concurrency must be at least 1")
+    return args
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(parse_args(sys.argv[1:]))))
@@ -0,0 +1,92 @@
+"""Cost of turning a page of task documents into a response body.
+
+Compares the previous path (stringify ids in a loop, validate through
+response_model, encode with the stdlib) against DocumentResponse encoding
+the documents as the list query returns them (projected to the response
+fields by MongoDB).
+
+Run from the backend directory:
+    python -m benchmarks.serialization [repeats]
+"""
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from app.core.serialization import DocumentResponse
+from app.main import app
+
+SIZES = (100, 1000, 10000)
+
+
+def make_tasks(count: int) -> list:
+    user_id = ObjectId()
+    now = datetime.utcnow().replace(microsecond=123000)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "title": f"Task {i}",
+            "description": "Something that needs doing, described in a sentence or two.",
+            "status": ("pending", "in-progress", "completed")[i % 3],
+            "due_date": now + timedelta(days=i % 30) if i % 2 else None,
+            "rank": f"V{i:05d}",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def list_route() -> APIRoute:
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.path == "/api/tasks/" and "GET" in route.methods:
+            return route
+    raise RuntimeError("GET /api/tasks/ route not found")
+
+
+async def previous_path(route: APIRoute, documents: list) -> bytes:
+    tasks = [dict(task) for task in documents]  # handlers mutated the documents in place
+    for task in tasks:
+        task["_id"] = str(task["_id"])
+        task["user_id"] = str(task["user_id"])
+    content = await serialize_response(
+        field=route.secure_cloned_response_field,
+        response_content={"items": tasks, "next_cursor": None},
+        is_coroutine=True,
+    )
+    return JSONResponse(content).body
+
+
+async def document_path(route: APIRoute, documents: list) -> bytes:
+    return DocumentResponse({"items": documents, "next_cursor": None}).body
+
+
+async def measure(func, route: APIRoute, documents: list, repeats: int) -> float:
+    """Return the best of repeats, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        await func(route, documents)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+async def main(repeats: int = 20):
+    route = list_route()
+    print(f"{'tasks':>7} {'previous':>12} {'document':>12} {'speedup':>9}")
+    for size in SIZES:
+        documents = make_tasks(size)
+        # Both paths must produce the same JSON document
+        assert json.loads(await previous_path(route, documents)) == json.loads(await document_path(route, documents))
+
+        previous = await measure(previous_path, route, documents, repeats)
+        document = await measure(document_path, route, documents, repeats)
+        print(f"{size:>7} {previous:>9.2f} ms {document:>9.2f} ms {previous / document:>8.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
@@ -0,0 +1,124 @@
+"""Task search latency for one user with many tasks.
+
+Loads a single user's tasks into a scratch database at DATABASE_URL
+(dropped afterwards) and compares, through the real FastAPI app:
+  - client-side filtering: paging through GET /api/tasks and matching locally
+  - GET /api/tasks/search served by the text index
+  - GET /api/tasks/search served by the in-process index, once warm
+Run from the backend directory:
+    python -m benchmarks.task_search [tasks]
+"""
+import asyncio
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+import httpx
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core import database
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.core.search import tokenize
+from app.main import app
+from app.services.task_counter_service import TaskCounterService
+
+WORDS = (
+    "invoice report deploy review budget meeting design sprint release customer "
+    "backlog migrate database refactor onboarding hiring roadmap audit security "
+    "billing analytics dashboard mobile checkout search payment vendor contract"
+).split()
+QUERIES = ["invoice", "deploy release", "security audit", "quarterly roadmap", "checkout payment vendor"]
+STATUSES = ["pending", "in-progress", "completed"]
+ROUNDS = 5
+
+
+def make_task(user_id: ObjectId, rng: random.Random) -> dict:
+    now = datetime.utcnow()
+    return {
+        "user_id": user_id,
+        "title": " ".join(rng.choices(WORDS, k=4)),
+        "description": " ".join(rng.choices(WORDS, k=20)),
+        "status": rng.choice(STATUSES),
+        "due_date": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def timed(label: str, samples: dict, call) -> None:
+    start = time.perf_counter()
+    await call()
+    samples.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+
+
+async def main(tasks: int = 100000) -> int:
+    database_name = f"{settings.DATABASE_NAME}_task_search"
+    database.db.client = AsyncIOMotorClient(settings.DATABASE_URL)
+    settings.DATABASE_NAME = database_name
+    settings.TASK_SEARCH_CACHE_MAX_TASKS = max(settings.TASK_SEARCH_CACHE_MAX_TASKS, tasks)
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://task-search", timeout=None)
+    samples = {}
+    try:
+        db = database.db.client[database_name]
+        await ensure_indexes(db)
+
+        credentials = {"email": "search@example.com", "password": "Search123!"}
+        response = await client.post("/api/auth/register", json={
+            **credentials, "username": "search", "full_name": "Search Bench"
+        })
+        response.raise_for_status()
+        user_id = ObjectId(response.json()["_id"])
+        response = await client.post("/api/auth/login", json=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        rng = random.Random(42)
+        for start in range(0, tasks, 10000):
+            await db.tasks.insert_many([make_task(user_id, rng) for _ in range(min(10000, tasks - start))])
+        await TaskCounterService.reconcile_user(str(user_id))
+
+        async def client_side(query: str) -> None:
+            terms = set(tokenize(query))
+            matches, cursor = [], None
+            while True:
+                params = {"limit": 500, **({"cursor": cursor} if cursor else {})}
+                page = (await client.get("/api/tasks/", headers=headers, params=params)).json()
+                for task in page["items"]:
+                    if terms & set(tokenize(f"{task['title']} {task.get('description') or ''}")):
+                        matches.append(task)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return
+
+        async def search(query: str) -> None:
+            response = await client.get("/api/tasks/search", headers=headers, params={"q": query})
+            response.raise_for_status()
+
+        for query in QUERIES:
+            await timed("client-side filter", samples, lambda: client_side(query))
+
+        settings.TASK_SEARCH_CACHE_USERS = 0
+        for _ in range(ROUNDS):
+            for query in QUERIES:
+                await timed("search (text index)", samples, lambda: search(query))
+
+        settings.TASK_SEARCH_CACHE_USERS = 1
+        settings.TASK_SEARCH_CACHE_MIN_SEARCHES = 1
+        await timed("search (cache build)", samples, lambda: search(QUERIES[0]))
+        for _ in range(ROUNDS):
+            for query in QUERIES:
+                await timed("search (warm cache)", samples, lambda: search(query))
+    finally:
+        await database.db.client.drop_database(database_name)
+        database.db.client.close()
+
+    print(f"tasks: {tasks}")
+    for label, values in samples.items():
+        print(f"{label:22} p50 {statistics.median(values):9.1f} ms   max {max(values):9.1f} ms   n={len(values)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)))
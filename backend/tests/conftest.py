@@ -0,0 +1,38 @@
+import os
+
+# Settings are read when app.core.config is imported; these only fill in what
+# the environment (or .env) does not set, so tests can import the app anywhere
+os.environ.setdefault("DATABASE_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DATABASE_NAME", "task_management_test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret")
+os.environ.setdefault("VERIFICATION_TOKEN_SECRET", "test-verification-secret")
+os.environ.setdefault("MAIL_USERNAME", "test")
+os.environ.setdefault("MAIL_PASSWORD", "test")
+os.environ.setdefault("MAIL_FROM", "test@example.com")
+os.environ.setdefault("MAIL_PORT", "587")
+os.environ.setdefault("MAIL_SERVER", "localhost")
+os.environ.setdefault("MAIL_FROM_NAME", "Task Management Tests")
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """Point the app at an empty in-process MongoDB stand-in (mongomock-motor).
+
+    Tests using this fixture are skipped if it is not installed.
+    """
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from app.core import database
+    from app.core.config import settings
+
+    client = mongomock_motor.AsyncMongoMockClient()
+    # Motor's with_options returns a collection; the stand-in's is not async-aware
+    monkeypatch.setattr(mongomock_motor.AsyncMongoMockCollection, "with_options", lambda self, **kwargs: self, raising=False)
+    monkeypatch.setattr(database.db, "client", client)
+    return client[settings.DATABASE_NAME]
@@ -0,0 +1,86 @@
+from app.core import cache
+from app.core.cache import ByteLRUCache, TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    entries = TTLCache(maxsize=10, ttl=60)
+
+    entries.set("a", 1)
+    entries.set("b", 2, ttl=5)
+    clock.now += 5
+    assert entries.get("a") == 1
+    assert entries.get("b") is None
+    clock.now += 55
+    assert entries.get("a") is None
+    assert len(entries) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    entries = TTLCache(maxsize=2, ttl=60)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+
+    assert entries.get("b") is None
+    assert entries.get("a") == 1 and entries.get("c") == 3
+    assert entries.stats()["evictions"] == 1
+
+
+def test_ttl_cache_of_size_zero_stores_nothing():
+    entries = TTLCache(maxsize=0, ttl=60)
+    entries.set("a", 1)
+    assert entries.get("a") is None
+
+
+def test_ttl_cache_invalidate_and_stats():
+    entries = TTLCache(maxsize=10, ttl=60)
+    entries.set("a", 1)
+    entries.invalidate("a")
+    entries.invalidate("missing")
+    assert entries.get("a") is None
+
+    entries.set("b", 2)
+    entries.get("b")
+    assert entries.stats()["hits"] == 1
+    assert entries.stats()["misses"] == 1
+    assert entries.stats()["hit_ratio"] == 0.5
+
+
+def test_byte_cache_evicts_by_total_size():
+    entries = ByteLRUCache(max_bytes=10, max_entry_bytes=8)
+    entries.set("a", "aaaa", 4)
+    entries.set("b", "bbbb", 4)
+    entries.get("a")
+    entries.set("c", "cccc", 4)
+
+    assert entries.get("b") is None
+    assert entries.get("a") == "aaaa" and entries.get("c") == "cccc"
+    assert entries.bytes == 8
+
+
+def test_byte_cache_rejects_oversized_values_and_drops_the_old_one():
+    entries = ByteLRUCache(max_bytes=10, max_entry_bytes=4)
+    entries.set("a", "aaaa", 4)
+    entries.set("a", "aaaaa", 5)
+
+    assert entries.get("a") is None
+    assert entries.bytes == 0
+    assert entries.stats()["rejected"] == 1
+
+
+def test_byte_cache_replacing_a_value_updates_its_size():
+    entries = ByteLRUCache(max_bytes=10, max_entry_bytes=10)
+    entries.set("a", "aaaa", 4)
+    entries.set("a", "aa", 2)
+    assert entries.bytes == 2 and len(entries) == 1
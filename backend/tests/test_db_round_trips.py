@@ -0,0 +1,257 @@
+"""MongoDB commands issued per API endpoint, checked against a budget.
+
+Drives the real FastAPI app in-process against the MongoDB server at
+TEST_DATABASE_URL (default DATABASE_URL), in a scratch database dropped
+afterwards, counting commands with a CommandListener. When no server
+answers, the app runs against mongomock-motor instead and every
+collection call is recorded as the command it would send, so the budgets
+are enforced either way. Counts assume a warm principal cache, i.e. the
+steady state of an authenticated session. The app's startup tasks do not
+run, so queued emails stay in the scratch outbox.
+"""
+import os
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterator
+import httpx
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+from app.core import database
+from app.core.config import settings
+from app.core.indexes import ensure_indexes
+from app.main import app
+
+pytestmark = pytest.mark.anyio
+
+# Maximum number of commands each endpoint may issue
+BUDGETS = {
+    "POST /api/auth/register": 2,
+    "POST /api/auth/login": 1,
+    "POST /api/tasks/": 3,
+    "GET /api/tasks/": 2,
+    "GET /api/tasks/ (If-None-Match)": 1,
+    "GET /api/tasks/search": 1,
+    "GET /api/tasks/summary": 2,
+    "GET /api/tasks/{id}": 1,
+    "PUT /api/tasks/{id}": 3,
+    "PUT /api/tasks/{id} (unchanged)": 2,
+    "PUT /api/tasks/{id}/move": 3,
+    "DELETE /api/tasks/{id}": 2,
+    "POST /api/tasks/bulk": 5,
+    "GET /api/users/me": 0,
+    "GET /api/users/me (If-None-Match)": 0,
+    "PUT /api/users/me": 1,
+    "DELETE /api/users/me": 2,
+}
+
+# Connection and session housekeeping is not part of an endpoint's cost
+IGNORED_COMMANDS = {"ping", "hello", "isMaster", "ismaster", "endSessions", "killCursors"}
+
+# Command sent by each collection method, for counting against the stand-in
+STAND_IN_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "aggregate": "aggregate",
+    "count_documents": "aggregate",
+    "distinct": "distinct",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+}
+
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = Counter()
+
+    def record(self, command: str, collection: str) -> None:
+        self.commands[f"{command}:{collection}"] += 1
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.record(event.command_name, event.command.get(event.command_name))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self) -> Counter:
+        commands, self.commands = self.commands, Counter()
+        return commands
+
+
+async def run_scenario(client: httpx.AsyncClient, counter: CommandCounter) -> dict:
+    results = {}
+
+    async def call(label: str, method: str, url: str, **kwargs) -> httpx.Response:
+        counter.reset()
+        response = await client.request(method, url, **kwargs)
+        if response.is_error:
+            response.raise_for_status()
+        results[label] = counter.reset()
+        return response
+
+    credentials = {"email": "roundtrips@example.com", "password": "Roundtrip1!"}
+    await call("POST /api/auth/register", "POST", "/api/auth/register", json={
+        **credentials, "username": "roundtrips", "full_name": "Round Trips"
+    })
+    response = await call("POST /api/auth/login", "POST", "/api/auth/login", json=credentials)
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Warm the principal cache so counts reflect an established session
+    await client.get("/api/users/me", headers=headers)
+
+    # The first task creates the user's board counters; later writes only $inc them
+    response = await client.post("/api/tasks/", headers=headers, json={"title": "Warm up"})
+    neighbour_id = response.json()["_id"]
+
+    response = await call("POST /api/tasks/", "POST", "/api/tasks/", headers=headers, json={"title": "Count me"})
+    task_id = response.json()["_id"]
+    response = await call("GET /api/tasks/", "GET", "/api/tasks/", headers=headers)
+    await call("GET /api/tasks/ (If-None-Match)", "GET", "/api/tasks/", headers={
+        **headers, "If-None-Match": response.headers["ETag"]
+    })
+    await call("GET /api/tasks/search", "GET", "/api/tasks/search", headers=headers, params={"q": "count"})
+    await call("GET /api/tasks/summary", "GET", "/api/tasks/summary", headers=headers)
+    await call("GET /api/tasks/{id}", "GET", f"/api/tasks/{task_id}", headers=headers)
+    await call("PUT /api/tasks/{id}", "PUT", f"/api/tasks/{task_id}", headers=headers, json={"status": "completed"})
+    await call("PUT /api/tasks/{id} (unchanged)", "PUT", f"/api/tasks/{task_id}", headers=headers, json={"status": "completed"})
+    await call("PUT /api/tasks/{id}/move", "PUT", f"/api/tasks/{task_id}/move", headers=headers, json={
+        "status": "pending", "prev_id": neighbour_id
+    })
+    await call("POST /api/tasks/bulk", "POST", "/api/tasks/bulk", headers=headers, json={"operations": [
+        {"op": "create", "task": {"title": "Bulk created"}},
+        {"op": "move", "task_id": task_id, "status": "in-progress"},
+    ]})
+    await call("DELETE /api/tasks/{id}", "DELETE", f"/api/tasks/{task_id}", headers=headers)
+    response = await call("GET /api/users/me", "GET", "/api/users/me", headers=headers)
+    await call("GET /api/users/me (If-None-Match)", "GET", "/api/users/me", headers={
+        **headers, "If-None-Match": response.headers["ETag"]
+    })
+    await call("PUT /api/users/me", "PUT", "/api/users/me", headers=headers, json={"full_name": "Renamed"})
+    await call("DELETE /api/users/me", "DELETE", "/api/users/me", headers=headers)
+
+    return results
+
+
+def _bulk_commands(requests: list, ordered: bool) -> list:
+    """Commands of a bulk write: one per run of same-type operations, or per type when unordered."""
+    commands = []
+    for request in requests:
+        name = type(request).__name__
+        command = "insert" if name.startswith("Insert") else "delete" if name.startswith("Delete") else "update"
+        if not (commands and (commands[-1] == command or (not ordered and command in commands))):
+            commands.append(command)
+    return commands
+
+
+def _without_text_search(pipeline: list) -> list:
+    """mongomock has no $text: match all of the user's tasks, with equal scores."""
+    stages = []
+    for stage in pipeline:
+        if "$text" in stage.get("$match", {}):
+            stage = {"$match": {key: value for key, value in stage["$match"].items() if key != "$text"}}
+        elif stage.get("$addFields", {}).get("score") == {"$meta": "textScore"}:
+            stage = {"$addFields": {"score": {"$literal": 1.0}}}
+        stages.append(stage)
+    return stages
+
+
+@contextmanager
+def recorded_stand_in(counter: CommandCounter) -> Iterator[object]:
+    """A mongomock-motor client whose collection calls are counted as the commands they stand for."""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection_type = mongomock_motor.AsyncMongoMockCollection
+
+    def recorded(method_name: str, command: str):
+        method = getattr(collection_type, method_name)
+        if method_name == "aggregate":
+            @wraps(method)
+            def aggregate(self, pipeline, *args, **kwargs):
+                counter.record(command, self.name)
+                return method(self, _without_text_search(pipeline), *args, **kwargs)
+            return aggregate
+        if method_name == "find":
+            @wraps(method)
+            def find(self, *args, **kwargs):
+                counter.record(command, self.name)
+                return method(self, *args, **kwargs)
+            return find
+
+        @wraps(method)
+        async def call(self, *args, **kwargs):
+            counter.record(command, self.name)
+            return await method(self, *args, **kwargs)
+        return call
+
+    original_bulk_write = collection_type.bulk_write
+
+    async def bulk_write(self, requests, ordered=True, **kwargs):
+        for command in _bulk_commands(requests, ordered):
+            counter.record(command, self.name)
+        return await original_bulk_write(self, requests, ordered=ordered, **kwargs)
+
+    with pytest.MonkeyPatch.context() as patch:
+        for method_name, command in STAND_IN_COMMANDS.items():
+            patch.setattr(collection_type, method_name, recorded(method_name, command))
+        patch.setattr(collection_type, "bulk_write", bulk_write)
+        # Motor's with_options returns a collection; the stand-in's is not async-aware
+        patch.setattr(collection_type, "with_options", lambda self, **kwargs: self, raising=False)
+        yield mongomock_motor.AsyncMongoMockClient()
+
+
+@pytest.fixture(scope="module")
+async def round_trips(anyio_backend):
+    """Commands issued by each endpoint of one scripted session."""
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(
+        os.environ.get("TEST_DATABASE_URL", settings.DATABASE_URL),
+        serverSelectionTimeoutMS=2000,
+        event_listeners=[counter]
+    )
+    try:
+        await client.admin.command("ping")
+    except PyMongoError:
+        client.close()
+        with recorded_stand_in(counter) as stand_in:
+            yield await _run_against(stand_in, counter, indexes=False)
+        return
+
+    try:
+        yield await _run_against(client, counter, indexes=True)
+    finally:
+        client.close()
+
+
+async def _run_against(client, counter: CommandCounter, indexes: bool) -> dict:
+    database_name = f"{settings.DATABASE_NAME}_roundtrips"
+    previous_client, previous_name = database.db.client, settings.DATABASE_NAME
+    database.db.client, settings.DATABASE_NAME = client, database_name
+    try:
+        await client.drop_database(database_name)
+        if indexes:
+            # mongomock does not build text indexes; no budget depends on them
+            await ensure_indexes(client[database_name])
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://roundtrips") as http:
+            return await run_scenario(http, counter)
+    finally:
+        await client.drop_database(database_name)
+        database.db.client, settings.DATABASE_NAME = previous_client, previous_name
+
+
+@pytest.mark.parametrize("endpoint", BUDGETS)
+async def test_commands_within_budget(round_trips, endpoint):
+    commands = round_trips[endpoint]
+    assert sum(commands.values()) <= BUDGETS[endpoint], dict(commands)
@@ -0,0 +1,27 @@
+import pytest
+from app.core.etag import etag_matches, make_etag
+
+
+def test_make_etag_is_weak_and_depends_on_every_part():
+    etag = make_etag("user", "epoch-3", "pending")
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert etag == make_etag("user", "epoch-3", "pending")
+    assert etag != make_etag("user", "epoch-4", "pending")
+    assert etag != make_etag("user", "epoch-3", None)
+
+
+@pytest.mark.parametrize("header", [
+    'W/"abc"',
+    '"abc"',
+    ' W/"abc" ',
+    'W/"other", W/"abc"',
+    '"other",W/"abc"',
+    "*",
+])
+def test_matching_headers(header):
+    assert etag_matches(header, 'W/"abc"')
+
+
+@pytest.mark.parametrize("header", [None, "", 'W/"abcd"', '"ab"', 'W/"other", "xyz"'])
+def test_non_matching_headers(header):
+    assert not etag_matches(header, 'W/"abc"')
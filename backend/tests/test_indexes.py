@@ -0,0 +1,37 @@
+from pymongo import ASCENDING, IndexModel
+from app.core.indexes import INDEX_SPECS, diff_indexes
+
+
+def index_information(*models: IndexModel) -> dict:
+    """index_information() output for the given models, as the server reports it."""
+    information = {"_id_": {"v": 2, "key": [("_id", 1)]}}
+    for model in models:
+        spec = dict(model.document)
+        name = spec.pop("name")
+        information[name] = {"v": 2, **spec, "key": list(spec["key"].items())}
+    return information
+
+
+def test_missing_indexes_are_returned():
+    models = INDEX_SPECS["email_outbox"]
+    missing, conflicts = diff_indexes(models, index_information())
+    assert [model.document["name"] for model in missing] == [model.document["name"] for model in models]
+    assert conflicts == []
+
+
+def test_matching_indexes_need_nothing():
+    for models in INDEX_SPECS.values():
+        assert diff_indexes(models, index_information(*models)) == ([], [])
+
+
+def test_index_without_ttl_conflicts_with_ttl_spec():
+    plain = IndexModel([("expire_at", ASCENDING)], name="expire_at_ttl")
+    missing, conflicts = diff_indexes(INDEX_SPECS["rate_limits"], index_information(plain))
+    assert missing == []
+    assert len(conflicts) == 1 and "expireAfterSeconds" in conflicts[0]
+
+
+def test_false_options_match_absent_ones():
+    model = IndexModel([("status", ASCENDING)], name="status")
+    existing = index_information(IndexModel([("status", ASCENDING)], name="status", unique=False, sparse=False))
+    assert diff_indexes([model], existing) == ([], [])
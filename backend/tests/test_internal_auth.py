@@ -0,0 +1,56 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from app.api.deps import require_internal_token
+from app.core.config import settings
+
+pytestmark = pytest.mark.anyio
+
+guarded = FastAPI()
+
+
+@guarded.get("/stats", dependencies=[Depends(require_internal_token)])
+async def stats():
+    return {"ok": True}
+
+
+async def get(app: FastAPI, path: str, **kwargs) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://internal") as client:
+        return await client.get(path, **kwargs)
+
+
+async def test_refused_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "")
+    response = await get(guarded, "/stats", headers={"Authorization": "Bearer "})
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer wrong"}, {"Authorization": "Basic s3cret"}])
+async def test_refused_without_the_token(monkeypatch, headers):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "s3cret")
+    response = await get(guarded, "/stats", headers=headers)
+    assert response.status_code == 401
+
+
+async def test_allowed_with_the_token(monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "s3cret")
+    response = await get(guarded, "/stats", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+
+
+async def test_internal_endpoints_are_not_mounted_by_default():
+    from app.main import app
+
+    assert not settings.INTERNAL_ENDPOINTS_ENABLED
+    response = await get(app, "/internal/cache")
+    assert response.status_code == 404
+
+
+async def test_metrics_require_the_token(monkeypatch):
+    from app.main import app
+
+    monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", "s3cret")
+    assert (await get(app, "/metrics")).status_code == 401
+    response = await get(app, "/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
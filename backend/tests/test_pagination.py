@@ -0,0 +1,29 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app.core.pagination import decode_cursor, encode_cursor, keyset_filter
+
+
+@pytest.mark.parametrize("value", [datetime(2024, 5, 17, 9, 30, 12, 345000), "a0V", 42, None])
+def test_cursor_round_trip(value):
+    doc_id = ObjectId()
+    assert decode_cursor(encode_cursor(value, doc_id)) == (value, doc_id)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime.utcnow(), ObjectId())
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "e30", encode_cursor("x", ObjectId())[:-4]])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_direction():
+    doc_id = ObjectId()
+    assert keyset_filter("at", 5, doc_id) == {"$or": [{"at": {"$lt": 5}}, {"at": 5, "_id": {"$lt": doc_id}}]}
+    assert keyset_filter("rank", "m", doc_id, descending=False) == {
+        "$or": [{"rank": {"$gt": "m"}}, {"rank": "m", "_id": {"$gt": doc_id}}]
+    }
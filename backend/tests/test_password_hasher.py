@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import httpx
+import pytest
+from app.core import security
+from app.core.config import settings
+from app.core.security import PasswordHasherBusy, _run_hash_job, password_hasher_stats
+from app.main import app
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def hasher(monkeypatch):
+    """A fresh executor with one worker and room for one queued job."""
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_QUEUE", 1)
+    monkeypatch.setattr(security, "_hash_executor", None)
+    release = threading.Event()
+    yield release
+    release.set()
+    security.shutdown_password_hasher()
+
+
+async def settled(pending: int) -> None:
+    for _ in range(100):
+        if password_hasher_stats()["pending"] == pending:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"pending stayed at {password_hasher_stats()['pending']}")
+
+
+async def test_jobs_past_the_queue_limit_are_rejected(hasher):
+    jobs = [asyncio.ensure_future(_run_hash_job("hash", hasher.wait)) for _ in range(2)]
+    await asyncio.sleep(0)
+    assert password_hasher_stats()["pending"] == 2
+
+    with pytest.raises(PasswordHasherBusy):
+        await _run_hash_job("hash", hasher.wait)
+
+    hasher.set()
+    assert await asyncio.gather(*jobs) == [True, True]
+    await settled(0)
+    assert await _run_hash_job("verify", lambda: "ok") == "ok"
+
+
+async def test_cancelled_caller_keeps_its_slot_until_the_job_ends(hasher):
+    running = asyncio.ensure_future(_run_hash_job("hash", hasher.wait))
+    queued = asyncio.ensure_future(_run_hash_job("hash", hasher.wait))
+    await asyncio.sleep(0)
+
+    # The client of the running job disconnects; bcrypt carries on regardless
+    running.cancel()
+    await asyncio.sleep(0.05)
+    assert password_hasher_stats()["pending"] == 2
+    with pytest.raises(PasswordHasherBusy):
+        await _run_hash_job("hash", hasher.wait)
+
+    hasher.set()
+    await queued
+    await settled(0)
+
+
+async def test_busy_hasher_answers_503_with_retry_after(monkeypatch):
+    async def busy(*args, **kwargs):
+        raise PasswordHasherBusy("Too many concurrent password operations, try again shortly")
+
+    monkeypatch.setattr(UserService, "authenticate_user", staticmethod(busy))
+    monkeypatch.setattr(UserService, "create_user", staticmethod(busy))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://hasher") as client:
+        login = await client.post("/api/auth/login", json={"email": "busy@example.com", "password": "Secret1!"})
+        register = await client.post("/api/auth/register", json={
+            "email": "busy@example.com", "password": "Secret1!", "username": "busy", "full_name": "Busy"
+        })
+
+    for response in (login, register):
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,75 @@
+import time
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from app.api.deps import authenticate_token
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.services import user_service
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService, principal_cache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def user_id(mock_db):
+    principal_cache.clear()
+    result = await mock_db.users.insert_one({"email": "a@example.com", "is_active": True, "version": 0})
+    yield str(result.inserted_id)
+    principal_cache.clear()
+
+
+def age_cache(monkeypatch, seconds: float) -> None:
+    clock = time.monotonic() + seconds
+    monkeypatch.setattr(user_service.time, "monotonic", lambda: clock)
+
+
+async def test_fresh_principal_is_served_from_cache(mock_db, user_id):
+    await UserService.get_principal(user_id)
+    # Written by another worker, which cannot invalidate this one's cache
+    await mock_db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"full_name": "Other"}, "$inc": {"version": 1}})
+
+    assert "full_name" not in await UserService.get_principal(user_id)
+
+
+async def test_deletion_by_another_worker_is_seen_after_revalidation(mock_db, user_id, monkeypatch):
+    token = create_access_token({"sub": user_id})
+    await authenticate_token(token)
+    await mock_db.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"deleting": True}, "$inc": {"version": 1}})
+
+    age_cache(monkeypatch, settings.PRINCIPAL_CACHE_REVALIDATE_SECONDS)
+    with pytest.raises(HTTPException) as error:
+        await authenticate_token(token)
+    assert error.value.detail == "Account is being deleted"
+
+
+async def test_unchanged_principal_is_kept_after_revalidation(mock_db, user_id, monkeypatch):
+    await UserService.get_principal(user_id)
+    age_cache(monkeypatch, settings.PRINCIPAL_CACHE_REVALIDATE_SECONDS)
+
+    calls = []
+    get_user_by_id = UserService.get_user_by_id
+    monkeypatch.setattr(UserService, "get_user_by_id", staticmethod(lambda *args: calls.append(args) or get_user_by_id(*args)))
+    assert (await UserService.get_principal(user_id))["email"] == "a@example.com"
+    assert calls == []
+
+
+async def test_removed_user_is_dropped_after_revalidation(mock_db, user_id, monkeypatch):
+    await UserService.get_principal(user_id)
+    await mock_db.users.delete_one({"_id": ObjectId(user_id)})
+
+    age_cache(monkeypatch, settings.PRINCIPAL_CACHE_REVALIDATE_SECONDS)
+    assert await UserService.get_principal(user_id) is None
+    assert len(principal_cache) == 0
+
+
+async def test_own_profile_update_refreshes_the_cached_principal(mock_db, user_id, monkeypatch):
+    await UserService.get_principal(user_id)
+    await UserService.update_user(user_id, UserUpdate(full_name="Renamed"))
+
+    async def fail(*args):
+        raise AssertionError("user was read again")
+
+    monkeypatch.setattr(UserService, "get_user_by_id", staticmethod(fail))
+    assert (await UserService.get_principal(user_id))["full_name"] == "Renamed"
@@ -0,0 +1,55 @@
+import pytest
+from bson import ObjectId
+from app.core.ranking import evenly_spaced_ranks
+from app.services.task_rank_service import TaskRankService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    columns = []
+    monkeypatch.setattr(TaskRankService, "schedule_rebalance", staticmethod(lambda *column: columns.append(column)))
+    return columns
+
+
+async def add_column(mock_db, user_id: ObjectId, ranks: list) -> list:
+    result = await mock_db.tasks.insert_many([
+        {"user_id": user_id, "status": "pending", "title": f"task {i}", "rank": rank}
+        for i, rank in enumerate(ranks)
+    ])
+    return result.inserted_ids
+
+
+async def ranks_of(mock_db, task_ids: list) -> list:
+    return [(await mock_db.tasks.find_one({"_id": task_id}))["rank"] for task_id in task_ids]
+
+
+async def test_rebalance_keeps_the_order(mock_db, scheduled):
+    user_id = ObjectId()
+    task_ids = await add_column(mock_db, user_id, ["000001", "000002", "zzzzy", "zzzzz"])
+
+    assert await TaskRankService.rebalance_column(str(user_id), "pending") == 4
+    assert await ranks_of(mock_db, task_ids) == evenly_spaced_ranks(4)
+    assert scheduled == []
+
+
+async def test_move_during_rebalance_is_kept_and_the_column_requeued(mock_db, scheduled, monkeypatch):
+    user_id = ObjectId()
+    task_ids = await add_column(mock_db, user_id, ["000001", "000002", "000003"])
+
+    collection_type = type(mock_db.tasks)
+    bulk_write = collection_type.bulk_write
+
+    async def bulk_write_after_a_move(self, requests, **kwargs):
+        # Another request moves the first task after the column was read
+        await self.update_one({"_id": task_ids[0]}, {"$set": {"rank": "0000035"}})
+        monkeypatch.setattr(collection_type, "bulk_write", bulk_write)
+        return await bulk_write(self, requests, **kwargs)
+
+    monkeypatch.setattr(collection_type, "bulk_write", bulk_write_after_a_move)
+
+    assert await TaskRankService.rebalance_column(str(user_id), "pending") == 2
+    ranks = await ranks_of(mock_db, task_ids)
+    assert ranks[0] == "0000035"
+    assert scheduled == [(str(user_id), "pending")]
@@ -0,0 +1,52 @@
+import random
+import pytest
+from app.core.ranking import RANK_DIGITS, evenly_spaced_ranks, rank_between
+
+
+def test_rank_between_bounds():
+    assert rank_between(None, None)
+    assert rank_between(None, "U") < "U"
+    assert rank_between("U", None) > "U"
+    middle = rank_between("A", "C")
+    assert "A" < middle < "C"
+
+
+@pytest.mark.parametrize("lower, upper", [("U", "U"), ("V", "U")])
+def test_rank_between_rejects_unordered_bounds(lower, upper):
+    with pytest.raises(ValueError):
+        rank_between(lower, upper)
+
+
+def test_adjacent_and_prefix_ranks_still_have_room():
+    for lower, upper in [("A", "B"), ("A", "A1"), ("Az", "B"), ("1", "11"), ("zz", None), (None, "01")]:
+        rank = rank_between(lower, upper)
+        assert (lower is None or lower < rank) and (upper is None or rank < upper)
+        assert not rank.endswith(RANK_DIGITS[0])
+
+
+def test_repeated_inserts_keep_a_total_order():
+    ranks = [rank_between(None, None)]
+    rng = random.Random(7)
+    for _ in range(2000):
+        position = rng.randint(0, len(ranks))
+        lower = ranks[position - 1] if position > 0 else None
+        upper = ranks[position] if position < len(ranks) else None
+        ranks.insert(position, rank_between(lower, upper))
+    assert ranks == sorted(ranks)
+    assert len(set(ranks)) == len(ranks)
+
+
+def test_inserting_at_the_top_grows_ranks_slowly():
+    rank = rank_between(None, None)
+    for _ in range(500):
+        upper, rank = rank, rank_between(None, rank)
+        assert rank < upper and len(rank) <= len(upper) + 1
+    assert len(rank) < 24
+
+
+@pytest.mark.parametrize("count", [0, 1, 2, 61, 62, 500, 5000])
+def test_evenly_spaced_ranks(count):
+    ranks = evenly_spaced_ranks(count)
+    assert len(ranks) == count
+    assert ranks == sorted(ranks) and len(set(ranks)) == count
+    assert all(rank and not rank.endswith(RANK_DIGITS[0]) for rank in ranks)
@@ -0,0 +1,106 @@
+import json
+import httpx
+import pytest
+from starlette.responses import JSONResponse
+from app.core.rate_limit import (
+    MAX_INSPECTED_BODY, MemoryRateLimitStore, RateLimitMiddleware, RateLimitRule, retry_after
+)
+
+RULE = RateLimitRule.parse("login", "POST", "/login", "ip", "10/60")
+
+
+def test_allowed_under_the_limit():
+    assert retry_after(RULE, current=10, previous=0, elapsed=30) is None
+    # Half of the previous window still overlaps: 10 * 0.5 + 5
+    assert retry_after(RULE, current=5, previous=10, elapsed=30) is None
+
+
+def test_limited_within_the_window():
+    wait = retry_after(RULE, current=11, previous=0, elapsed=20)
+    # The rest of this window, then until 11 * (1 - t / 60) + 1 <= 10 in the next
+    assert wait == 51
+
+
+def test_limited_by_the_previous_window():
+    wait = retry_after(RULE, current=5, previous=12, elapsed=10)
+    # 12 * (1 - t / 60) + 6 <= 10 from t = 40 on (rounded up, so maybe a second later)
+    assert wait in (30, 31)
+    assert retry_after(RULE, current=6, previous=12, elapsed=10 + wait) is None
+    assert retry_after(RULE, current=6, previous=12, elapsed=10 + 29) is not None
+
+
+def test_retry_after_is_at_least_one_second():
+    assert retry_after(RULE, current=11, previous=0, elapsed=59.9) >= 1
+
+
+@pytest.mark.anyio
+async def test_memory_store_rolls_windows():
+    store = MemoryRateLimitStore(shards=1, max_keys=10)
+    assert await store.hit("k", 60, 0) == (1, 0)
+    assert await store.hit("k", 60, 30) == (2, 0)
+    assert await store.hit("k", 60, 61) == (1, 2)
+    assert await store.hit("k", 60, 200) == (1, 0)
+
+
+@pytest.mark.anyio
+async def test_memory_store_is_bounded():
+    store = MemoryRateLimitStore(shards=1, max_keys=3)
+    for key in "abcde":
+        await store.hit(key, 60, 0)
+    assert store.stats()["keys"] == 3
+
+
+async def echo(scope, receive, send):
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    await JSONResponse({"received": len(body)})(scope, receive, send)
+
+
+def client(rules) -> httpx.AsyncClient:
+    app = RateLimitMiddleware(echo, rules=rules, store=MemoryRateLimitStore())
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://limits")
+
+
+EMAIL_RULE = RateLimitRule.parse("login", "POST", "/login", "email", "2/60")
+
+
+@pytest.mark.anyio
+async def test_email_rule_reads_and_replays_the_body():
+    async with client([EMAIL_RULE]) as http:
+        body = {"email": "Someone@Example.com", "password": "x"}
+        responses = [await http.post("/login", json=body) for _ in range(3)]
+        other = await http.post("/login", json={"email": "other@example.com"})
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert responses[0].json() == {"received": len(json.dumps(body))}
+    assert other.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_oversized_body_is_refused_without_reading_it_all():
+    received = 0
+
+    async def chunks():
+        nonlocal received
+        for _ in range(100):
+            received += 4096
+            yield b" " * 4096
+
+    async with client([EMAIL_RULE]) as http:
+        padded = await http.post("/login", content=chunks())
+        declared = await http.post("/login", content=b"{}", headers={"Content-Length": str(MAX_INSPECTED_BODY + 1)})
+
+    assert padded.status_code == 413
+    assert received <= MAX_INSPECTED_BODY + 4096
+    assert declared.status_code == 413
+
+
+@pytest.mark.anyio
+async def test_ip_only_rules_do_not_read_the_body():
+    async with client([RULE]) as http:
+        response = await http.post("/login", content=b" " * (MAX_INSPECTED_BODY * 2))
+    assert response.json() == {"received": MAX_INSPECTED_BODY * 2}
@@ -0,0 +1,43 @@
+import hashlib
+import time
+from datetime import timedelta
+from jose import jwt
+from app.core import cache, security
+from app.core.config import settings
+from app.core.security import create_access_token, decode_access_token, token_cache
+
+
+def setup_function():
+    token_cache.clear()
+
+
+def test_verified_token_is_memoized(monkeypatch):
+    token = create_access_token({"sub": "user-1"})
+    assert decode_access_token(token)["sub"] == "user-1"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token was verified again")
+
+    monkeypatch.setattr(security.jwt, "decode", fail)
+    payload = decode_access_token(token)
+    assert payload["sub"] == "user-1"
+
+    # Callers get their own copy of the cached payload
+    payload["sub"] = "changed"
+    assert decode_access_token(token)["sub"] == "user-1"
+
+
+def test_cached_token_expires_with_its_exp(monkeypatch):
+    token = create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=30))
+    assert decode_access_token(token) is not None
+
+    clock = time.monotonic() + 31
+    monkeypatch.setattr(cache.time, "monotonic", lambda: clock)
+    assert token_cache.get(hashlib.sha256(token.encode()).digest()) is None
+
+
+def test_invalid_tokens_are_not_cached():
+    forged = jwt.encode({"sub": "user-1", "exp": time.time() + 60}, "other-secret", algorithm=settings.JWT_ALGORITHM)
+    assert decode_access_token(forged) is None
+    assert decode_access_token("not-a-jwt") is None
+    assert len(token_cache) == 0
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from app.core.activity import ActivityBuffer
+from app.core.config import settings
+from app.services import task_activity_service
+from app.services.account_deletion_service import AccountDeletionService
+from app.services.task_activity_service import TaskActivityService, flush
+
+pytestmark = pytest.mark.anyio
+
+
+def events(count: int) -> list:
+    return [{"_id": ObjectId(), "n": n} for n in range(count)]
+
+
+def test_full_buffer_drops_the_oldest_events():
+    buffer = ActivityBuffer(capacity=3, batch_size=10)
+    for event in events(5):
+        buffer.append(event)
+
+    assert [event["n"] for event in buffer.take(10)] == [2, 3, 4]
+    assert buffer.stats() == {"buffered": 0, "capacity": 3, "recorded": 5, "dropped": 2}
+
+
+def test_put_back_keeps_the_newest_that_fit():
+    buffer = ActivityBuffer(capacity=3, batch_size=10)
+    buffer.append({"n": "new"})
+    buffer.put_back(events(3))
+
+    assert [event["n"] for event in buffer.take(10)] == [1, 2, "new"]
+    assert buffer.dropped == 1
+
+
+async def test_wait_returns_once_a_batch_is_buffered():
+    buffer = ActivityBuffer(capacity=10, batch_size=2)
+    for event in events(2):
+        buffer.append(event)
+    # Would sleep for an hour without a full batch
+    await buffer.wait(3600)
+
+
+async def test_flush_writes_in_batches(mock_db, monkeypatch):
+    monkeypatch.setattr(settings, "TASK_ACTIVITY_BATCH_SIZE", 2)
+    collection_type = type(mock_db.task_activity)
+    insert_many = collection_type.insert_many
+    batches = []
+
+    async def record_batches(self, documents, **kwargs):
+        batches.append(len(documents))
+        return await insert_many(self, documents, **kwargs)
+
+    monkeypatch.setattr(collection_type, "insert_many", record_batches)
+    buffer = ActivityBuffer(capacity=10, batch_size=2)
+    for event in events(5):
+        buffer.append(event)
+
+    await flush(buffer)
+
+    assert batches == [2, 2, 1]
+    assert len(buffer) == 0
+    assert await mock_db.task_activity.count_documents({}) == 5
+
+
+async def test_flush_skips_events_already_written(mock_db):
+    buffer = ActivityBuffer(capacity=10, batch_size=10)
+    batch = events(3)
+    await mock_db.task_activity.insert_one(dict(batch[0]))
+    for event in batch:
+        buffer.append(event)
+    failed_flushes = task_activity_service.failed_flushes
+
+    await flush(buffer)
+
+    assert await mock_db.task_activity.count_documents({}) == 3
+    assert task_activity_service.failed_flushes == failed_flushes
+
+
+async def test_failed_flush_puts_the_batch_back(mock_db, monkeypatch):
+    async def fail(self, documents, **kwargs):
+        raise RuntimeError("connection lost")
+
+    monkeypatch.setattr(type(mock_db.task_activity), "insert_many", fail)
+    buffer = ActivityBuffer(capacity=10, batch_size=10)
+    for event in events(3):
+        buffer.append(event)
+
+    with pytest.raises(RuntimeError):
+        await flush(buffer)
+    assert [event["n"] for event in buffer.take(10)] == [0, 1, 2]
+
+
+async def test_history_pages_walk_every_event_newest_first(mock_db):
+    user_id, task_id = ObjectId(), ObjectId()
+    start = datetime(2030, 1, 1)
+    # Two events share a timestamp, so the _id tie-breaker decides their order
+    times = [start, start + timedelta(seconds=1), start + timedelta(seconds=1), start + timedelta(seconds=2), start + timedelta(seconds=3)]
+    await mock_db.task_activity.insert_many([
+        {"_id": ObjectId(), "user_id": user_id, "task_id": task_id, "action": "updated", "at": at} for at in times
+    ])
+    await mock_db.task_activity.insert_one({"_id": ObjectId(), "user_id": user_id, "task_id": ObjectId(), "at": start})
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await TaskActivityService.get_history(str(user_id), str(task_id), limit=2, cursor=cursor)
+        assert len(page) <= 2
+        assert all("user_id" not in event for event in page)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert len({event["_id"] for event in seen}) == 5
+    assert [(event["at"], event["_id"]) for event in seen] == sorted(
+        [(event["at"], event["_id"]) for event in seen], reverse=True
+    )
+
+
+async def test_account_deletion_removes_activity_in_batches(mock_db, monkeypatch):
+    monkeypatch.setattr(settings, "ACCOUNT_DELETION_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "ACCOUNT_DELETION_PAUSE_SECONDS", 0)
+    user_id, other_id = ObjectId(), ObjectId()
+    await mock_db.task_activity.insert_many([{"user_id": user_id} for _ in range(5)] + [{"user_id": other_id}])
+    job = {"_id": "job", "user_id": user_id, "lease_until": datetime.utcnow()}
+    await mock_db.deletion_jobs.insert_one(dict(job))
+
+    deletes = []
+    delete_batch = TaskActivityService.delete_user_activity_batch
+
+    async def record_deletes(owner: str, batch_size: int) -> int:
+        deleted = await delete_batch(owner, batch_size)
+        deletes.append(deleted)
+        return deleted
+
+    monkeypatch.setattr(TaskActivityService, "delete_user_activity_batch", staticmethod(record_deletes))
+    await AccountDeletionService._delete_activity(job)
+
+    assert deletes == [2, 2, 1, 0]
+    assert await mock_db.task_activity.count_documents({}) == 1
+    renewed = await mock_db.deletion_jobs.find_one({"_id": "job"})
+    assert renewed["lease_until"] > job["lease_until"]
@@ -0,0 +1,137 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from app.services import task_counter_service
+from app.services.task_counter_service import TaskCounterService
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def no_settle_delay(monkeypatch):
+    # Still yields to the event loop, where in-flight writes land
+    monkeypatch.setattr(task_counter_service, "RECONCILE_SETTLE_SECONDS", 0)
+
+
+async def add_tasks(mock_db, user_id: ObjectId, *statuses: str) -> None:
+    await mock_db.tasks.insert_many([{"user_id": user_id, "status": status, "updated_at": None} for status in statuses])
+
+
+async def test_missing_counters_are_created(mock_db):
+    user_id = ObjectId()
+    await add_tasks(mock_db, user_id, "pending", "pending", "completed")
+
+    counters = await TaskCounterService.reconcile_user(str(user_id))
+    assert counters["counts"] == {"pending": 2, "in-progress": 0, "completed": 1}
+    assert counters["version"] == 0
+
+
+async def test_correct_counters_are_left_alone(mock_db):
+    user_id = ObjectId()
+    await add_tasks(mock_db, user_id, "pending")
+    await TaskCounterService.apply(str(user_id), {"pending": 1})
+    await add_tasks(mock_db, user_id, "completed")
+    await TaskCounterService.apply(str(user_id), {"completed": 1})
+    before = await TaskCounterService.get_version(str(user_id))
+
+    assert await TaskCounterService.reconcile_all() == 0
+    assert await TaskCounterService.get_version(str(user_id)) == before
+
+
+async def test_drifted_counters_get_the_next_version(mock_db):
+    user_id = ObjectId()
+    await add_tasks(mock_db, user_id, "pending")
+    created = await TaskCounterService.reconcile_user(str(user_id))
+    await mock_db.task_counters.update_one({"_id": user_id}, {"$set": {"counts.pending": 5}})
+
+    assert await TaskCounterService.reconcile_all() == 1
+    repaired = await mock_db.task_counters.find_one({"_id": user_id})
+    assert repaired["counts"]["pending"] == 1
+    assert repaired["epoch"] == created["epoch"]
+    assert repaired["version"] == created["version"] + 1
+
+
+async def test_change_during_reconciliation_is_not_overwritten(mock_db, monkeypatch):
+    user_id = ObjectId()
+    await add_tasks(mock_db, user_id, "pending")
+    await TaskCounterService.reconcile_user(str(user_id))
+    await mock_db.task_counters.update_one({"_id": user_id}, {"$set": {"counts.pending": 5}})
+
+    count = TaskCounterService._count
+    calls = 0
+
+    async def count_while_a_task_is_added(owner: str):
+        nonlocal calls
+        calls += 1
+        result = await count(owner)
+        if calls == 1:
+            # A task write lands after the count: the tasks and the $inc both happen
+            await add_tasks(mock_db, user_id, "completed")
+            await TaskCounterService.apply(owner, {"completed": 1})
+        return result
+
+    monkeypatch.setattr(TaskCounterService, "_count", staticmethod(count_while_a_task_is_added))
+    counters = await TaskCounterService.reconcile_user(str(user_id))
+
+    assert calls == 3
+    assert counters["counts"] == {"pending": 1, "in-progress": 0, "completed": 1}
+
+
+async def test_gives_up_when_counters_keep_changing(mock_db, monkeypatch):
+    user_id = ObjectId()
+    await add_tasks(mock_db, user_id, "pending")
+    await TaskCounterService.reconcile_user(str(user_id))
+    await mock_db.task_counters.update_one({"_id": user_id}, {"$set": {"counts.pending": 5}})
+
+    count = TaskCounterService._count
+
+    async def count_during_writes(owner: str):
+        result = await count(owner)
+        await TaskCounterService.apply(owner, {})
+        return result
+
+    monkeypatch.setattr(TaskCounterService, "_count", staticmethod(count_during_writes))
+    counters = await TaskCounterService.reconcile_user(str(user_id))
+
+    assert counters["counts"]["pending"] == 5
+    assert counters["version"] == task_counter_service.RECONCILE_ATTEMPTS
+
+
+async def test_concurrent_first_writes_each_apply_their_own_delta(mock_db):
+    user_id = ObjectId()
+    # Three creates have stored their tasks; none has applied its delta yet
+    await add_tasks(mock_db, user_id, "pending", "pending", "pending")
+
+    await asyncio.gather(*(TaskCounterService.apply(str(user_id), {"pending": 1}) for _ in range(3)))
+
+    counters = await mock_db.task_counters.find_one({"_id": user_id})
+    assert counters["counts"] == {"pending": 3}
+    assert counters["version"] == 3
+    assert await TaskCounterService.reconcile_all() == 0
+
+
+async def test_delta_in_flight_during_reconciliation_is_not_counted_twice(mock_db):
+    user_id = ObjectId()
+    await add_tasks(mock_db, user_id, "pending")
+    await TaskCounterService.apply(str(user_id), {"pending": 1})
+
+    # A create has stored its task but not yet applied its delta when the sweep counts
+    await add_tasks(mock_db, user_id, "pending")
+    in_flight = asyncio.ensure_future(TaskCounterService.apply(str(user_id), {"pending": 1}))
+    assert await TaskCounterService.reconcile_all() == 0
+    await in_flight
+
+    counters = await mock_db.task_counters.find_one({"_id": user_id})
+    assert counters["counts"]["pending"] == 2
+
+
+async def test_reconciler_lease_admits_one_sweep_per_interval(mock_db):
+    assert await task_counter_service.claim_reconciler_lease(60)
+    assert not await task_counter_service.claim_reconciler_lease(60)
+
+    await mock_db.job_leases.update_one(
+        {"_id": task_counter_service.RECONCILER_LEASE},
+        {"$set": {"lease_until": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+    assert await task_counter_service.claim_reconciler_lease(60)
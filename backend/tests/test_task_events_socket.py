@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from app.core.security import create_access_token
+from app.main import app
+from app.services.user_service import principal_cache
+
+
+@pytest.fixture
+def token(mock_db):
+    user_id = ObjectId()
+    asyncio.run(mock_db.users.insert_one({"_id": user_id, "email": "events@example.com", "is_active": True}))
+    principal_cache.clear()
+    return create_access_token({"sub": str(user_id)})
+
+
+def test_token_is_taken_from_the_subprotocol(token):
+    with TestClient(app).websocket_connect("/api/tasks/events", subprotocols=["task-events", f"bearer.{token}"]) as socket:
+        assert socket.accepted_subprotocol == "task-events"
+
+
+@pytest.mark.parametrize("protocols", [[], ["task-events"], ["bearer.{token}"], ["task-events", "bearer.invalid"]])
+def test_connections_without_a_valid_token_are_refused(token, protocols):
+    protocols = [protocol.format(token=token) for protocol in protocols]
+    with pytest.raises(WebSocketDisconnect) as refused:
+        with TestClient(app).websocket_connect("/api/tasks/events", subprotocols=protocols):
+            pass
+    assert refused.value.code == 1008
+
+
+def test_token_in_the_url_is_not_accepted(token):
+    with pytest.raises(WebSocketDisconnect):
+        with TestClient(app).websocket_connect(f"/api/tasks/events?token={token}"):
+            pass
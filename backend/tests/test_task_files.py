@@ -0,0 +1,99 @@
+import csv
+import io
+from datetime import datetime
+import pytest
+from app.core import task_files
+from app.core.task_files import CSV_COLUMNS, ImportFileError, csv_chunks, csv_records, ndjson_records
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data: bytes, size: int = 3):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(records) -> list:
+    return [record async for record in records]
+
+
+async def test_ndjson_records_are_numbered_by_line():
+    data = b'{"title": "a"}\n\n[1]\n{"title": \n{"title": "b"}'
+    records = await collect(ndjson_records(chunked(data), 1000))
+
+    assert records[0] == (1, {"title": "a"})
+    assert records[1] == (3, "Expected a JSON object")
+    assert records[2][0] == 4 and records[2][1].startswith("Invalid JSON")
+    assert records[3] == (5, {"title": "b"})
+
+
+async def test_lines_split_across_multibyte_characters_and_skip_bom():
+    data = '﻿{"title": "café ✓"}\n'.encode()
+    assert await collect(ndjson_records(chunked(data, 1), 1000)) == [(1, {"title": "café ✓"})]
+
+
+async def test_invalid_utf8_is_an_import_error():
+    with pytest.raises(ImportFileError, match="UTF-8"):
+        await collect(ndjson_records(chunked(b'{"title": "\xff"}\n'), 1000))
+
+
+async def test_oversized_line_is_an_import_error():
+    with pytest.raises(ImportFileError, match="Line longer than 10"):
+        await collect(ndjson_records(chunked(b'{"title": "' + b"x" * 50), 10))
+
+
+async def test_csv_records_map_header_to_fields():
+    data = b"title, status ,due_date\r\nFirst,pending,\r\n\r\nSecond,,2030-01-01\r\n"
+    assert await collect(csv_records(chunked(data), 1000)) == [
+        (1, {"title": "First", "status": "pending"}),
+        (2, {"title": "Second", "due_date": "2030-01-01"}),
+    ]
+
+
+async def test_csv_quoted_fields_may_span_lines():
+    data = b'title,description\n"Multi","line one\nline ""two"""\nNext,\n'
+    assert await collect(csv_records(chunked(data), 1000)) == [
+        (1, {"title": "Multi", "description": 'line one\nline "two"'}),
+        (2, {"title": "Next"}),
+    ]
+
+
+async def test_csv_row_errors_are_reported_per_row():
+    data = b'title\na,b\nok\n"open'
+    assert await collect(csv_records(chunked(data), 1000)) == [
+        (1, "Expected at most 1 columns, got 2"),
+        (2, {"title": "ok"}),
+        (3, "Unterminated quoted field"),
+    ]
+
+
+async def test_csv_without_header_is_an_import_error():
+    with pytest.raises(ImportFileError, match="no header"):
+        await collect(csv_records(chunked(b"\n\n"), 1000))
+
+
+async def test_csv_oversized_quoted_row_is_an_import_error():
+    data = b'title\n"' + b"x\n" * 20
+    with pytest.raises(ImportFileError, match="Row longer than 10"):
+        await collect(csv_records(chunked(data), 10))
+
+
+async def test_csv_chunks_round_trip(monkeypatch):
+    monkeypatch.setattr(task_files, "CSV_ROWS_PER_CHUNK", 2)
+    due = datetime(2030, 1, 1, 12, 0)
+
+    async def tasks():
+        for number in range(5):
+            yield {"_id": f"id{number}", "title": f"Task, {number}", "description": None, "due_date": due}
+
+    chunks = await collect(csv_chunks(tasks()))
+    assert len(chunks) == 3
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == CSV_COLUMNS
+    assert rows[1] == ["id0", "Task, 0", "", "", due.isoformat(), "", "", ""]
+    assert len(rows) == 6
+
+    # What is exported can be imported again
+    records = await collect(csv_records(chunked(b"".join(chunks)), 1000))
+    assert records[4] == (5, {"_id": "id4", "title": "Task, 4", "due_date": due.isoformat()})
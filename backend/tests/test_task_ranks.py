@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from pydantic import TypeAdapter
+from app.schemas.task import BulkTaskOperation, TaskCreate, TaskUpdate
+from app.services.task_counter_service import TaskCounterService
+from app.services.task_service import TASK_RANK_SORT, TaskService
+
+pytestmark = pytest.mark.anyio
+
+OPERATIONS = TypeAdapter(list[BulkTaskOperation])
+
+
+async def column(mock_db, user_id: str, status: str) -> list:
+    cursor = mock_db.tasks.find({"user_id": ObjectId(user_id), "status": status}).sort(TASK_RANK_SORT)
+    return [task["title"] async for task in cursor]
+
+
+async def board(mock_db, user_id: str) -> dict:
+    return {
+        "pending": await column(mock_db, user_id, "pending"),
+        "completed": await column(mock_db, user_id, "completed"),
+    }
+
+
+async def create(user_id: str, title: str, status: str) -> str:
+    task = await TaskService.create_task(user_id, TaskCreate(title=title, status=status))
+    return str(task["_id"])
+
+
+async def test_status_change_puts_the_task_on_top_of_its_new_column(mock_db):
+    user_id = str(ObjectId())
+    moved = await create(user_id, "moved", "pending")
+    for title in ("done 1", "done 2"):
+        await create(user_id, title, "completed")
+
+    task = await TaskService.update_task(moved, user_id, TaskUpdate(status="completed"))
+
+    assert await board(mock_db, user_id) == {"pending": [], "completed": ["moved", "done 2", "done 1"]}
+    assert task["rank"] == (await mock_db.tasks.find_one({"_id": ObjectId(moved)}))["rank"]
+
+
+async def test_update_within_a_column_keeps_the_rank(mock_db):
+    user_id = str(ObjectId())
+    kept = await create(user_id, "kept", "pending")
+    await create(user_id, "newer", "pending")
+    rank = (await mock_db.tasks.find_one({"_id": ObjectId(kept)}))["rank"]
+
+    task = await TaskService.update_task(kept, user_id, TaskUpdate(status="pending", title="$kept"))
+
+    stored = await mock_db.tasks.find_one({"_id": ObjectId(kept)})
+    assert stored["rank"] == task["rank"] == rank
+    assert stored["title"] == "$kept"
+
+
+async def test_bulk_moves_and_creates_stack_on_top_of_their_column(mock_db):
+    user_id = str(ObjectId())
+    first = await create(user_id, "first", "pending")
+    second = await create(user_id, "second", "pending")
+    await create(user_id, "done", "completed")
+
+    results = await TaskService.bulk_write(user_id, OPERATIONS.validate_python([
+        {"op": "move", "task_id": first, "status": "completed"},
+        {"op": "create", "task": {"title": "created", "status": "completed"}},
+        {"op": "update", "task_id": second, "changes": {"status": "completed"}},
+    ]))
+
+    assert all(result["ok"] for result in results)
+    assert await board(mock_db, user_id) == {"pending": [], "completed": ["second", "created", "first", "done"]}
+
+
+async def test_bulk_move_to_the_same_column_keeps_the_rank(mock_db):
+    user_id = str(ObjectId())
+    kept = await create(user_id, "kept", "pending")
+    await create(user_id, "newer", "pending")
+
+    await TaskService.bulk_write(user_id, OPERATIONS.validate_python([
+        {"op": "move", "task_id": kept, "status": "pending"},
+    ]))
+
+    assert await column(mock_db, user_id, "pending") == ["newer", "kept"]
+
+
+async def test_null_status_update_leaves_status_and_rank_alone(mock_db):
+    user_id = str(ObjectId())
+    kept = await create(user_id, "kept", "pending")
+    before = await mock_db.tasks.find_one({"_id": ObjectId(kept)})
+
+    task = await TaskService.update_task(kept, user_id, TaskUpdate(status=None, description="note"))
+
+    stored = await mock_db.tasks.find_one({"_id": ObjectId(kept)})
+    assert stored["status"] == task["status"] == "pending"
+    assert stored["rank"] == task["rank"] == before["rank"]
+    assert stored["description"] == "note"
+
+
+async def test_bulk_update_with_null_status_keeps_the_column(mock_db):
+    user_id = str(ObjectId())
+    kept = await create(user_id, "kept", "pending")
+    await create(user_id, "newer", "pending")
+
+    results = await TaskService.bulk_write(user_id, OPERATIONS.validate_python([
+        {"op": "update", "task_id": kept, "changes": {"status": None, "title": "renamed"}},
+    ]))
+
+    assert results[0]["ok"]
+    assert await column(mock_db, user_id, "pending") == ["newer", "renamed"]
+
+
+async def test_top_ranks_of_several_columns_in_one_read(mock_db):
+    user_id = str(ObjectId())
+    await create(user_id, "pending 1", "pending")
+    await create(user_id, "pending 2", "pending")
+    done = await create(user_id, "done", "completed")
+
+    ranks = await TaskService._top_ranks(user_id, {"pending", "completed", "in-progress"})
+
+    pending_top = await mock_db.tasks.find_one({"title": "pending 2"})
+    assert ranks == {
+        "pending": pending_top["rank"],
+        "completed": (await mock_db.tasks.find_one({"_id": ObjectId(done)}))["rank"],
+        "in-progress": None,
+    }
+
+
+async def test_saving_a_task_unchanged_writes_nothing(mock_db):
+    user_id = str(ObjectId())
+    task_id = await create(user_id, "kept", "pending")
+    before = await mock_db.tasks.find_one({"_id": ObjectId(task_id)})
+    version = await TaskCounterService.get_version(user_id)
+
+    task = await TaskService.update_task(task_id, user_id, TaskUpdate(title="kept", status="pending"))
+
+    assert await mock_db.tasks.find_one({"_id": ObjectId(task_id)}) == before
+    assert task["updated_at"] == before["updated_at"]
+    assert await TaskCounterService.get_version(user_id) == version
+
+
+async def test_new_due_date_rearms_the_reminder(mock_db):
+    user_id = str(ObjectId())
+    task_id = await create(user_id, "due", "pending")
+    due = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+    await TaskService.update_task(task_id, user_id, TaskUpdate(due_date=due))
+    await mock_db.tasks.update_one({"_id": ObjectId(task_id)}, {"$set": {"reminder_sent_at": datetime.utcnow()}})
+
+    await TaskService.update_task(task_id, user_id, TaskUpdate(due_date=due))
+    assert (await mock_db.tasks.find_one({"_id": ObjectId(task_id)}))["reminder_sent_at"] is not None
+
+    await TaskService.update_task(task_id, user_id, TaskUpdate(due_date=due + timedelta(hours=1)))
+    assert (await mock_db.tasks.find_one({"_id": ObjectId(task_id)}))["reminder_sent_at"] is None
@@ -11,9 +11,31 @@ import { arrayMove } from '@dnd-kit/sortable';
 import KanbanColumn from './KanbanColumn';
 import TaskCard from './TaskCard';
 import taskService from '../../services/taskService';
+import taskEvents from '../../services/taskEvents';
 import { getErrorMessage } from '../../utils/helpers';
 import { Loader2, AlertCircle } from 'lucide-react';
 
+const removeTask = (columns, taskId) =>
+  Object.fromEntries(
+    Object.entries(columns).map(([status, list]) => [
+      status,
+      list.filter((t) => t._id !== taskId),
+    ])
+  );
+
+// Insert or move a task into its column, keeping rank order
+const placeTask = (columns, task) => {
+  const next = removeTask(columns, task._id);
+  const column = next[task.status] || [];
+  const index = column.findIndex((t) => (t.rank ?? '') > (task.rank ?? ''));
+
+  next[task.status] =
+    index === -1
+      ? [...column, task]
+      : [...column.slice(0, index), task, ...column.slice(index)];
+  return next;
+};
+
 const KanbanBoard = ({ onEditTask, onDeleteTask, refreshTrigger }) => {
   const [tasks, setTasks] = useState({
     pending: [],
@@ -50,6 +72,22 @@ const KanbanBoard = ({ onEditTask, onDeleteTask, refreshTrigger }) => {
     loadTasks();
   }, [refreshTrigger]);
 
+  // Apply pushed task deltas instead of refetching the whole board
+  useEffect(() => {
+    const handleEvent = (event) => {
+      if (event.type === 'task.created' || event.type === 'task.updated') {
+        setTasks((prev) => placeTask(prev, event.task));
+      } else if (event.type === 'task.deleted') {
+        setTasks((prev) => removeTask(prev, event.task_id));
+      } else {
+        // tasks.changed / resync
+        loadTasks();
+      }
+    };
+
+    return taskEvents.connect(handleEvent);
+  }, []);
+
   const handleDragStart = (event) => {
     const { active } = event;
     // Find the task being dragged
@@ -128,11 +166,27 @@ const KanbanBoard = ({ onEditTask, onDeleteTask, refreshTrigger }) => {
 
     if (!newColumn) return;
 
-    // Update task status on backend
+    // Reorder within the column when dropped on another card
+    let columnTasks = tasks[newColumn];
+    const activeIndex = columnTasks.findIndex((t) => t._id === activeId);
+    const overIndex = columnTasks.findIndex((t) => t._id === overId);
+    if (activeIndex !== -1 && overIndex !== -1 && activeIndex !== overIndex) {
+      columnTasks = arrayMove(columnTasks, activeIndex, overIndex);
+      setTasks((prev) => ({ ...prev, [newColumn]: columnTasks }));
+    }
+
+    const position = columnTasks.findIndex((t) => t._id === activeId);
+    const prevId = position > 0 ? columnTasks[position - 1]._id : null;
+    const nextId =
+      position !== -1 && position < columnTasks.length - 1
+        ? columnTasks[position + 1]._id
+        : null;
+
+    // Save the new position on backend
     try {
-      await taskService.updateTask(activeId, { status: newColumn });
-      // Reload tasks to get fresh data
-      await loadTasks();
+      await taskService.moveTask(activeId, newColumn, prevId, nextId);
+      // Without live events, reload tasks to get fresh data
+      if (!taskEvents.connected) await loadTasks();
     } catch (err) {
       alert('Failed to update task: ' + getErrorMessage(err));
       // Reload tasks to revert the change
@@ -7,6 +7,7 @@ import { Plus, AlertCircle, Mail } from 'lucide-react';
 import { useAuth } from '../contexts/AuthContext';
 import authService from '../services/authService';
 import taskService from '../services/taskService';
+import taskEvents from '../services/taskEvents';
 import { getErrorMessage } from '../utils/helpers';
 
 const DashboardPage = () => {
@@ -18,12 +19,17 @@ const DashboardPage = () => {
   const [resendLoading, setResendLoading] = useState(false);
   const [showVerificationBanner, setShowVerificationBanner] = useState(true);
 
+  // With live events connected the board updates itself
+  const refreshBoard = () => {
+    if (!taskEvents.connected) setRefreshTrigger(prev => prev + 1);
+  };
+
   const handleTaskCreated = () => {
-    setRefreshTrigger(prev => prev + 1);
+    refreshBoard();
   };
 
   const handleTaskUpdated = () => {
-    setRefreshTrigger(prev => prev + 1);
+    refreshBoard();
   };
 
   const handleEditTask = (task) => {
@@ -35,7 +41,7 @@ const DashboardPage = () => {
     if (window.confirm(`Are you sure you want to delete "${task.title}"?`)) {
       try {
         await taskService.deleteTask(task._id);
-        setRefreshTrigger(prev => prev + 1);
+        refreshBoard();
       } catch (err) {
         alert('Failed to delete task: ' + getErrorMessage(err));
       }
@@ -0,0 +1,56 @@
+import { API_BASE_URL } from "./api";
+
+// Live task deltas pushed by the backend over /api/tasks/events
+const taskEvents = {
+  connected: false,
+
+  // Open the event socket; returns a function that closes it
+  connect: (onEvent) => {
+    const token = localStorage.getItem("access_token");
+    if (!token) return () => {};
+
+    const url = `${API_BASE_URL.replace(/^http/, "ws")}/tasks/events`;
+    // Browsers cannot set headers on a WebSocket, so the token travels as a
+    // subprotocol (kept out of URLs and access logs); the server answers
+    // with "task-events"
+    const protocols = ["task-events", `bearer.${token}`];
+    let socket = null;
+    let closed = false;
+    let retryDelay = 1000;
+    let hasConnected = false;
+
+    const open = () => {
+      socket = new WebSocket(url, protocols);
+
+      socket.onopen = () => {
+        taskEvents.connected = true;
+        retryDelay = 1000;
+        // Events may have been missed while disconnected
+        if (hasConnected) onEvent({ type: "resync" });
+        hasConnected = true;
+      };
+
+      socket.onmessage = (message) => {
+        const event = JSON.parse(message.data);
+        if (event.type !== "ping") onEvent(event);
+      };
+
+      socket.onclose = () => {
+        taskEvents.connected = false;
+        if (closed) return;
+        setTimeout(open, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    open();
+
+    return () => {
+      closed = true;
+      taskEvents.connected = false;
+      if (socket) socket.close();
+    };
+  },
+};
+
+export default taskEvents;
@@ -1,11 +1,22 @@
 import api from "./api";
 
 const taskService = {
-  // Get all tasks
-  getTasks: async (status = null) => {
-    const url = status ? `/tasks?status=${status}` : "/tasks";
-    const response = await api.get(url);
-    return response.data;
+  // Get all tasks, following next_cursor until the last page
+  getTasks: async (status = null, order = "created") => {
+    const tasks = [];
+    let cursor = null;
+
+    do {
+      const params = { limit: 500, order };
+      if (status) params.status = status;
+      if (cursor) params.cursor = cursor;
+
+      const response = await api.get("/tasks", { params });
+      tasks.push(...response.data.items);
+      cursor = response.data.next_cursor;
+    } while (cursor);
+
+    return tasks;
   },
 
   // Get single task by ID
@@ -26,20 +37,34 @@ const taskService = {
     return response.data;
   },
 
+  // Move task to a column position between two neighbouring tasks
+  moveTask: async (taskId, status, prevId = null, nextId = null) => {
+    const response = await api.put(`/tasks/${taskId}/move`, {
+      status,
+      prev_id: prevId,
+      next_id: nextId,
+    });
+    return response.data;
+  },
+
   // Delete task
   deleteTask: async (taskId) => {
     const response = await api.delete(`/tasks/${taskId}`);
     return response.data;
   },
 
-  // Get tasks grouped by status (for Kanban board)
+  // Get tasks grouped by status in column order (for Kanban board)
   getTasksGroupedByStatus: async () => {
-    const tasks = await taskService.getTasks();
+    const [pending, inProgress, completed] = await Promise.all([
+      taskService.getTasks("pending", "rank"),
+      taskService.getTasks("in-progress", "rank"),
+      taskService.getTasks("completed", "rank"),
+    ]);
 
     return {
-      pending: tasks.filter((task) => task.status === "pending"),
-      "in-progress": tasks.filter((task) => task.status === "in-progress"),
-      completed: tasks.filter((task) => task.status === "completed"),
+      pending,
+      "in-progress": inProgress,
+      completed,
     };
   },
 };